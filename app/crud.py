@@ -1,7 +1,11 @@
-from typing import List, Iterable, Dict, Any
+from typing import List, Iterable, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
 from . import models, schemas
+from .utils.pagination import decode_cursor, encode_cursor
+from .utils.search_index import SearchIndex
+from .utils.stream import iter_recipes
+from .utils.substitutions import SubstitutionGraph, get_graph
 import sys, pathlib
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -13,8 +17,44 @@ def get_recipe_by_slug(db: Session, slug: str) -> models.Recipe | None:
     return db.execute(select(models.Recipe).where(models.Recipe.slug == slug)).scalar_one_or_none()
 
 def get_recipes(db: Session, skip: int = 0, limit: int = 50) -> List[models.Recipe]:
+    """OFFSET paging (cost grows with `skip`); prefer get_recipes_page for deep paging."""
     return list(db.execute(select(models.Recipe).offset(skip).limit(limit)).scalars())
 
+# ---- keyset paging: order by id, or by (cuisine, slug) (see ix_recipes_cuisine_slug) ----
+def _keyset_select(cursor: Optional[str], limit: int, order: str):
+    R = models.Recipe
+    values = decode_cursor(cursor) if cursor else None
+    if order == "id":
+        stmt = select(R).order_by(R.id)
+        if values is not None:
+            if len(values) != 1 or not isinstance(values[0], int):
+                raise ValueError("invalid cursor")
+            stmt = stmt.where(R.id > values[0])
+    elif order == "cuisine":
+        # NULL cuisine sorts (and encodes in the cursor) as "" so those rows aren't skipped
+        cuisine = func.coalesce(R.cuisine, "")
+        stmt = select(R).order_by(cuisine, R.slug)
+        if values is not None:
+            if len(values) != 2 or not all(isinstance(v, str) for v in values):
+                raise ValueError("invalid cursor")
+            stmt = stmt.where(tuple_(cuisine, R.slug) > tuple_(*values))
+    else:
+        raise ValueError(f"unknown order {order!r} (use 'id' or 'cuisine')")
+    return stmt.limit(limit + 1)   # one extra row says whether there is a next page
+
+def _keyset_page(rows: List[models.Recipe], limit: int, order: str) -> Tuple[List[models.Recipe], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.id) if order == "id" else encode_cursor(last.cuisine or "", last.slug)
+
+def get_recipes_page(db: Session, cursor: Optional[str] = None, limit: int = 50,
+                     order: str = "id") -> Tuple[List[models.Recipe], Optional[str]]:
+    """One keyset page plus the opaque cursor for the next (None on the last page)."""
+    rows = list(db.execute(_keyset_select(cursor, limit, order)).scalars())
+    return _keyset_page(rows, limit, order)
+
 def create_recipe(db: Session, data: schemas.RecipeCreate) -> models.Recipe:
     obj = models.Recipe(**data.dict())
     db.add(obj)
@@ -44,7 +84,10 @@ def delete_recipe(db: Session, slug: str) -> bool:
 def _norm(s: str) -> str:
     return s.lower().strip()
 
-def search_in_memory(recipes: Iterable[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+def search_in_memory(recipes: Iterable[Dict[str, Any]] | SearchIndex, query: str) -> List[Dict[str, Any]]:
+    """Pass a SearchIndex (e.g. loader.get_snapshot().index) to skip the linear scan."""
+    if isinstance(recipes, SearchIndex):
+        return recipes.search_records(query)
     q = _norm(query)
     hits = []
     for r in recipes:
@@ -67,6 +110,35 @@ def ingredients_missing(recipe: Dict[str, Any], pantry: Iterable[str]) -> List[s
         if not any(p in ing_norm for p in pset):
             missing.append(ing)
     return missing
+
+def ingredients_missing_batch(recipes: Iterable[Dict[str, Any]], pantry: Iterable[str],
+                              graph: Optional[SubstitutionGraph] = None) -> List[Dict[str, Any]]:
+    """
+    ingredients_missing for many recipes at once, plus which missing lines the
+    pantry covers by substitution: [{"slug", "missing", "substitutes": {line: item}}].
+    Each distinct line is checked once per batch; substitutes come from the
+    precomputed closure (utils/substitutions.py), never a graph walk.
+    """
+    graph = graph if graph is not None else get_graph()
+    pantry = list(pantry)
+    pset = {_norm(x) for x in pantry}
+    have = graph.pantry_bitmap(pantry)
+    checked: Dict[str, Tuple[bool, Optional[str]]] = {}   # line -> (covered, substitute)
+    out = []
+    for r in recipes:
+        missing, subs = [], {}
+        for ing in r.get("ingredients", []):
+            hit = checked.get(ing)
+            if hit is None:
+                ing_norm = _norm(ing)
+                covered = any(p in ing_norm for p in pset)
+                hit = checked[ing] = (covered, None if covered or not have else graph.substitute(ing, have))
+            if not hit[0]:
+                missing.append(ing)
+                if hit[1]:
+                    subs[ing] = hit[1]
+        out.append({"slug": r.get("slug"), "missing": missing, "substitutes": subs})
+    return out
 def dedupe_by_slug(items):
     seen, out = set(), []
     for r in items:
@@ -85,7 +157,8 @@ RECIPES_PATH = DATA_DIR / "seed_recipes.json"
 CUISINES_PATH = DATA_DIR / "cuisines.json"
 
 def load_recipes():
-    return json.loads(RECIPES_PATH.read_text(encoding="utf-8"))
+    # streamed: no full-file string in memory on top of the parsed records
+    return list(iter_recipes(RECIPES_PATH))
 
 def load_cuisines():
     return json.loads(CUISINES_PATH.read_text(encoding="utf-8"))
@@ -94,6 +167,14 @@ def index_by_slug(recipes):
     return {r["slug"]: r for r in recipes}
 
 def list_for_region(region_key: str, recipes=None, cuisines=None, idx=None):
+    """
+    Recipes cuisines.json lists for `region_key`, in file order. With no data
+    passed in this reads the live catalog's region map (built once per load)
+    instead of re-reading both JSON files.
+    """
+    if recipes is None and cuisines is None and idx is None:
+        from .utils.loader import get_snapshot
+        return get_snapshot().region(region_key)
     recipes = recipes or load_recipes()
     cuisines = cuisines or load_cuisines()
     idx = idx or index_by_slug(recipes)
@@ -0,0 +1,43 @@
+# async twins of the DB half of crud.py (use with database.get_async_db)
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, schemas
+from .crud import _keyset_page, _keyset_select
+
+# ---- DB CRUD ----
+async def get_recipe_by_slug(db: AsyncSession, slug: str) -> models.Recipe | None:
+    return (await db.execute(select(models.Recipe).where(models.Recipe.slug == slug))).scalar_one_or_none()
+
+async def get_recipes(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[models.Recipe]:
+    return list((await db.execute(select(models.Recipe).offset(skip).limit(limit))).scalars())
+
+async def get_recipes_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 50,
+                           order: str = "id") -> Tuple[List[models.Recipe], Optional[str]]:
+    rows = list((await db.execute(_keyset_select(cursor, limit, order))).scalars())
+    return _keyset_page(rows, limit, order)
+
+async def create_recipe(db: AsyncSession, data: schemas.RecipeCreate) -> models.Recipe:
+    obj = models.Recipe(**data.dict())
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
+async def update_recipe(db: AsyncSession, slug: str, data: schemas.RecipeUpdate) -> models.Recipe | None:
+    obj = await get_recipe_by_slug(db, slug)
+    if not obj:
+        return None
+    for k, v in data.dict(exclude_unset=True).items():
+        setattr(obj, k, v)
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
+async def delete_recipe(db: AsyncSession, slug: str) -> bool:
+    obj = await get_recipe_by_slug(db, slug)
+    if not obj:
+        return False
+    await db.delete(obj)
+    await db.commit()
+    return True
@@ -1,14 +1,55 @@
 import os
+from typing import Any, AsyncIterator, Dict, Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+    HAVE_ASYNC = True
+except Exception:
+    HAVE_ASYNC = False
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./recipes.db")
+# async driver URL; derived from DATABASE_URL when unset (sqlite -> aiosqlite, postgres -> asyncpg)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# ---- pool tuning (size/overflow/timeout only apply to server databases) ----
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # seconds; -1 = never
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def async_url(url: str) -> str:
+    """Swap a sync driver for its async counterpart (URLs that already name one pass through)."""
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    opts: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if url.startswith("sqlite"):
+        opts["connect_args"] = {"check_same_thread": False}
+    else:
+        opts.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return opts
+
 
 engine = create_engine(
     DATABASE_URL,
     future=True,
     echo=False,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    **engine_options(DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
@@ -20,3 +61,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---- async (created on first use, so the async driver stays optional) ----
+_async_engine: Optional["AsyncEngine"] = None
+_async_sessions: Optional["async_sessionmaker"] = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    global _async_engine, _async_sessions
+    if not HAVE_ASYNC:
+        raise RuntimeError("sqlalchemy.ext.asyncio is unavailable (install greenlet)")
+    if _async_engine is None:
+        url = ASYNC_DATABASE_URL or async_url(DATABASE_URL)
+        opts = engine_options(url)
+        opts.pop("connect_args", None)   # aiosqlite runs on its own thread
+        _async_engine = create_async_engine(url, echo=False, **opts)
+        _async_sessions = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> "AsyncSession":
+    get_async_engine()
+    return _async_sessions()
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """Async twin of get_db for `Depends(...)` in async routes."""
+    async with AsyncSessionLocal() as db:
+        yield db
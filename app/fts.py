@@ -0,0 +1,131 @@
+"""
+SQLite FTS5 search over the `recipes` table.
+
+`recipes_fts` is an external-content FTS5 table (title, cuisine, ingredients)
+over `recipes`, kept in sync by triggers, so every writer (crud, crud_async,
+seed upserts, raw SQL) updates it for free. Queries are ranked with BM25
+(title hits weigh most), every term is a prefix match, and the cuisine filter
+runs in the same statement, so only the requested page ever reaches Python.
+
+Turn it on for /search with DISHCOVERY_SEARCH_BACKEND=fts (SQLite DATABASE_URL only).
+"""
+import logging
+import os
+import re
+from typing import List, Optional
+
+from sqlalchemy import and_, column, exists, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, aliased
+
+from . import models
+from .database import Base, engine as default_engine
+from .utils.pagination import MAX_PAGE_SIZE, PAGE_SIZE
+
+log = logging.getLogger(__name__)
+
+SEARCH_BACKEND = os.getenv("DISHCOVERY_SEARCH_BACKEND", "memory").strip().lower()
+# bm25 column weights: title, cuisine, ingredients
+WEIGHTS = (10.0, 2.0, 1.0)
+
+FTS_TABLE = "recipes_fts"
+_fts = table(FTS_TABLE, column("rowid"))
+_TERM = re.compile(r"\w+", re.UNICODE)
+_ACTIVE = False   # set by setup() once the table and triggers exist
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, cuisine, ingredients,
+        content='recipes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, cuisine, ingredients)
+        VALUES (new.id, new.title, new.cuisine, new.ingredients);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, cuisine, ingredients)
+        VALUES ('delete', old.id, old.title, old.cuisine, old.ingredients);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE ON recipes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, cuisine, ingredients)
+        VALUES ('delete', old.id, old.title, old.cuisine, old.ingredients);
+        INSERT INTO {FTS_TABLE}(rowid, title, cuisine, ingredients)
+        VALUES (new.id, new.title, new.cuisine, new.ingredients);
+    END""",
+]
+
+
+def has_fts5(conn: Connection) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    opts = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in opts
+
+
+def install_fts(engine: Engine) -> bool:
+    """Create recipes, the FTS table and its triggers (idempotent); index existing rows once."""
+    Base.metadata.create_all(engine, tables=[models.Recipe.__table__])
+    with engine.begin() as conn:
+        if not has_fts5(conn):
+            log.warning("SQLite FTS5 unavailable for %s; search stays in memory", engine.url)
+            return False
+        fresh = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).first() is None
+        for ddl in _DDL:
+            conn.exec_driver_sql(ddl)
+        if fresh:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def setup(engine: Optional[Engine] = None) -> bool:
+    """Startup hook: install FTS when DISHCOVERY_SEARCH_BACKEND=fts; /search uses it if this succeeded."""
+    global _ACTIVE
+    if SEARCH_BACKEND == "fts":
+        _ACTIVE = install_fts(engine or default_engine)
+    return _ACTIVE
+
+
+def active() -> bool:
+    return _ACTIVE
+
+
+def match_expression(q: str) -> Optional[str]:
+    """'butter chick' -> '"butter"* "chick"*' (every term a quoted prefix, all required)."""
+    terms = _TERM.findall((q or "").lower())
+    return " ".join(f'"{t}"*' for t in terms) or None
+
+
+def _cuisine_filter(c: str):
+    """Same rule as CatalogSnapshot.cuisine_ids: exact (case/space-insensitive) if any recipe has it, else contains."""
+    def exact(model):
+        return func.lower(func.trim(model.cuisine)) == c
+    has_exact = exists().where(exact(aliased(models.Recipe)))
+    partial = func.lower(models.Recipe.cuisine).contains(c, autoescape=True)
+    return or_(and_(has_exact, exact(models.Recipe)), and_(~has_exact, partial))
+
+
+def search(db: Session, q: str, cuisine: Optional[str] = None, limit: int = PAGE_SIZE,
+           offset: int = 0) -> List[models.Recipe]:
+    """
+    One page of matches, best BM25 first; an empty query lists the (cuisine-filtered)
+    table in id order. `limit` is capped at MAX_PAGE_SIZE (+ 1, so a full page can
+    still probe for a next one), so no request loads the whole table.
+    """
+    stmt = select(models.Recipe)
+    c = (cuisine or "").strip().lower()
+    if c:
+        stmt = stmt.where(_cuisine_filter(c))
+    expr = match_expression(q)
+    if expr is None:
+        stmt = stmt.order_by(models.Recipe.id)
+    else:
+        rank = literal_column(f"bm25({FTS_TABLE}, {', '.join(map(str, WEIGHTS))})")
+        stmt = (stmt.join(_fts, _fts.c.rowid == models.Recipe.id)
+                .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=expr))
+                .order_by(rank, models.Recipe.id))
+    stmt = stmt.limit(max(0, min(limit, MAX_PAGE_SIZE + 1)))
+    if offset:
+        stmt = stmt.offset(offset)
+    return list(db.execute(stmt).scalars())
@@ -1,17 +1,43 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 
-from .routes import recipes, search
+from .routes import api, recipes, search
 try:
     from .routes import pantry
     HAS_PANTRY = True
 except Exception:
     HAS_PANTRY = False
 
-from .utils.loader import get_recipes_by_cuisine
+from .utils.loader import build_indexes, get_snapshot, initial_load, start_watcher, stop_watcher
+from .utils.startup import Startup, warm_paths
+from .templating import precompile_templates, templates
+from . import fts
+from .utils import metrics
+
+# catalog first (nothing is ready without it), then what the first requests would otherwise pay for
+STARTUP = Startup([
+    ("catalog", lambda: initial_load(indexes=False)),
+    ("indexes", lambda: build_indexes(get_snapshot())),
+    # compile every template once per worker (bytecode cache makes the later ones cheap)
+    ("templates", precompile_templates),
+    # optional SQLite FTS5 search backend (DISHCOVERY_SEARCH_BACKEND=fts)
+    ("search_backend", fts.setup),
+    ("warmup", warm_paths),
+    # pick up edits to data/*.json without hitting /recipes/__reload in every worker
+    ("watcher", start_watcher),
+])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # in the background by default: /healthz answers at once, /readyz once this finishes
+    STARTUP.start()
+    yield
+    stop_watcher()
 
 app = FastAPI(
     title="Dishcovery",
@@ -19,15 +45,18 @@ app = FastAPI(
     version="1.0.0",
     contact={"name": "Prajwal"},
     license_info={"name": "© 2025 Developed by Prajwal"},
+    lifespan=lifespan,
 )
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+# per-route latency/status + in-flight gauge, served on /metrics
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
-    north = get_recipes_by_cuisine("north indian")
-    south = get_recipes_by_cuisine("south indian")
+    snap = get_snapshot()
+    north = snap.in_cuisine("north indian")
+    south = snap.in_cuisine("south indian")
     return templates.TemplateResponse(
         "home.html",
         {
@@ -38,7 +67,26 @@ def home(request: Request):
         },
     )
 
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    """Liveness: the process is up and serving (the catalog may still be loading)."""
+    return JSONResponse({"status": "ok"})
+
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    """Readiness: 200 once the catalog and its indexes are built, 503 before (or if startup failed)."""
+    snap = get_snapshot()
+    body = {**STARTUP.as_dict(), "recipes": len(snap.recipes), "version": snap.version,
+            "similar_ready": snap.similar_ready}
+    return JSONResponse(body, status_code=200 if STARTUP.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition (formatted only when scraped)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(recipes.router, prefix="/recipes", tags=["recipes"])
 app.include_router(search.router,  prefix="/search",  tags=["search"])
+app.include_router(api.router,     prefix="/api/recipes", tags=["api"])
 if HAS_PANTRY:
     app.include_router(pantry.router, prefix="/pantry", tags=["pantry"])
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, func, text
 from sqlalchemy.types import JSON
 from .database import Base
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    # keyset paging by (cuisine, slug) with NULL cuisine as "", see crud.get_recipes_page
+    __table_args__ = (Index("ix_recipes_cuisine_slug", text("coalesce(cuisine, '')"), "slug"),)
 
     id = Column(Integer, primary_key=True, index=True)
     slug = Column(String(128), unique=True, index=True, nullable=False)
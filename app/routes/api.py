@@ -0,0 +1,146 @@
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from .. import schemas
+from ..utils.catalog import CatalogSnapshot
+from ..utils.loader import get_snapshot
+from ..utils.pagination import MAX_PAGE_SIZE, PAGE_SIZE, catalog_page, offset_page
+from ..utils.records import Recipe
+from ..utils.similar import SIMILAR_K
+from .search import ranked_ids
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except Exception:
+    HAVE_ORJSON = False
+
+router = APIRouter()
+
+# the public field names are the schema's (the DB-only `id` isn't part of the catalog)
+RECIPE_FIELDS: Tuple[str, ...] = tuple(schemas.RecipeBase.__fields__)
+LIST_FIELDS = ("slug", "title", "cuisine", "time_total", "servings")
+NDJSON_BATCH = 256
+
+
+# ---------- Encoding ----------
+
+def dumps(obj: Any) -> bytes:
+    if HAVE_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSONResponse without the stdlib encoder (orjson when installed)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _fields(fields: Optional[str], default: Sequence[str]) -> Tuple[str, ...]:
+    if not fields:
+        return tuple(default)
+    wanted = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in wanted if f not in RECIPE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+def _project(r: Recipe, fields: Sequence[str]) -> Dict[str, Any]:
+    # Recipe attributes are plain str/int/tuple; both encoders take tuples as arrays
+    return {f: getattr(r, f) for f in fields}
+
+
+def _listing(snap: CatalogSnapshot, ids: Optional[Sequence[int]], cursor: Optional[str], limit: int,
+             fields: Sequence[str]) -> FastJSONResponse:
+    try:
+        recipes, next_cursor, _ = catalog_page(snap, ids, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return FastJSONResponse({"items": [_project(r, fields) for r in recipes], "next_cursor": next_cursor})
+
+
+# ---------- Routes ----------
+
+@router.get("")
+def api_list(
+    cursor: Optional[str] = Query(None, description="opaque cursor from the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=f"comma-separated subset of {', '.join(RECIPE_FIELDS)}"),
+):
+    """One page of the catalog (summary fields unless `fields` says otherwise)."""
+    return _listing(get_snapshot(), None, cursor, limit, _fields(fields, LIST_FIELDS))
+
+
+@router.get("/cuisine/{cuisine}")
+def api_by_cuisine(
+    cuisine: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None),
+):
+    snap = get_snapshot()
+    return _listing(snap, snap.cuisine_ids(cuisine), cursor, limit, _fields(fields, LIST_FIELDS))
+
+
+@router.get("/search")
+def api_search(
+    q: str = Query("", description="search query"),
+    cuisine: str = Query("", description="optional cuisine filter"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None),
+):
+    """Same hits and order as /search, as JSON."""
+    snap = get_snapshot()
+    wanted = _fields(fields, LIST_FIELDS)
+    try:
+        ids, next_cursor = offset_page(ranked_ids(snap, q, cuisine), cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return FastJSONResponse({"items": [_project(r, wanted) for r in snap.take(ids)], "next_cursor": next_cursor})
+
+
+@router.get("/export.ndjson")
+def api_export(fields: Optional[str] = Query(None)):
+    """
+    The whole catalog as NDJSON, one recipe per line. Lines are encoded in small
+    batches as the client reads, from the snapshot current when the export began.
+    """
+    snap = get_snapshot()
+    wanted = _fields(fields, RECIPE_FIELDS)
+
+    def lines() -> Iterator[bytes]:
+        recipes = snap.recipes
+        for start in range(0, len(recipes), NDJSON_BATCH):
+            batch = [dumps(_project(recipes[i], wanted)) for i in range(start, min(start + NDJSON_BATCH, len(recipes)))]
+            yield b"\n".join(batch) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/{slug}/similar")
+def api_similar(slug: str, limit: int = Query(SIMILAR_K, ge=1, le=SIMILAR_K), fields: Optional[str] = Query(None)):
+    """Precomputed nearest recipes by ingredients and title (cosine score, best first)."""
+    snap = get_snapshot()
+    if snap.recipe(slug) is None:
+        raise HTTPException(status_code=404, detail="recipe not found")
+    wanted = _fields(fields, LIST_FIELDS)
+    return FastJSONResponse({
+        "items": [{**_project(r, wanted), "score": round(score, 4)} for r, score in snap.similar_to(slug, limit)],
+        "ready": snap.similar_ready,
+    })
+
+
+@router.get("/{slug}")
+def api_recipe(slug: str, fields: Optional[str] = Query(None)):
+    recipe = get_snapshot().recipe(slug)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="recipe not found")
+    return FastJSONResponse(_project(recipe, _fields(fields, RECIPE_FIELDS)))
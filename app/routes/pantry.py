@@ -1,7 +1,39 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import HTMLResponse
+from ..utils.loader import get_snapshot
+from ..templating import templates
 
 router = APIRouter()
 
+
+def _parse_items(items: str) -> list[str]:
+    # accept "onion, tomato" or one item per line
+    return [x.strip() for x in items.replace("\n", ",").split(",") if x.strip()]
+
+
+@router.get("", response_class=HTMLResponse)
+def pantry_page(
+    request: Request,
+    items: str = Query("", description="comma-separated pantry items"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Rank every recipe by how much of it the pantry covers (fewest missing first)."""
+    snap = get_snapshot()
+    pantry = _parse_items(items)
+    results = []
+    for m in snap.pantry.rank(pantry, limit) if pantry else []:
+        r = snap.recipes[m.id]
+        results.append({
+            "title": r["title"], "slug": r["slug"], "time": r["time_total"],
+            "covered": m.covered, "need": m.need, "coverage": round(m.coverage * 100),
+            "missing": m.missing, "substitutes": m.substitutes,
+        })
+    return templates.TemplateResponse(
+        "pantry.html",
+        {"request": request, "items": ", ".join(pantry), "results": results, "searched": bool(pantry)},
+    )
+
+
 @router.get("/ping")
 def ping():
-    return {"ok": True, "feature": "pantry-to-plate (stub)"}
+    return {"ok": True, "feature": "pantry-to-plate"}
@@ -1,71 +1,138 @@
-from fastapi import APIRouter, Request
+from typing import List, Optional, Sequence
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 
 # ✅ relative imports only
-from ..utils.loader import (
-    RECIPES,
-    get_all_recipes,
-    get_recipes_by_cuisine,
-    get_all_cuisines,
-    reload_data,
-    cuisine_counts,
-)
+from ..utils.loader import get_snapshot, last_reload, last_shard_load, reload_catalog
+from ..utils.catalog import CatalogSnapshot
+from ..utils.records import Recipe
+from ..utils.similar import SIMILAR_K
+from ..utils.cache import RESULTS, cache_stats
+from ..utils.facets import Filters, filters_key, normalize_filters, query_pairs, with_links
+from ..utils.page_cache import cached_page, page_response
+from ..utils.pagination import MAX_PAGE_SIZE, PAGE_SIZE, catalog_page
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+SIMILAR_SHOWN = min(6, SIMILAR_K)
 
 
 # ---------- Helpers ----------
 
-def _browse_context(request: Request, recipes: list[dict], heading: str) -> dict:
-    """Common context for browse pages."""
+def _browse_context(request: Request, snap: CatalogSnapshot, recipes: Sequence[Recipe], heading: str) -> dict:
+    """Common context for browse pages (everything from one snapshot)."""
     return {
         "request": request,
         "recipes": recipes,
-        "cuisines": get_all_cuisines(),
+        "cuisines": snap.cuisines,
         "heading": heading,
     }
 
 
+def _page(request: Request, key: tuple, name: str, context: dict):
+    """
+    Serve a template from the rendered-page cache (key must carry the catalog version).
+    Pages don't read `request`, so one rendering serves every client; a matching
+    If-None-Match gets a 304 straight from the cache.
+    """
+    page = cached_page(key, lambda: templates.get_template(name).render(context))
+    return page_response(request, page)
+
+
+def _browse_page(request: Request, snap: CatalogSnapshot, ids: Optional[Sequence[int]], heading: str,
+                 key: tuple, cursor: Optional[str], limit: int, facets: Optional[dict] = None, query: str = ""):
+    """One keyset page of a browse grid; cost depends on `limit`, not the catalog size."""
+    try:
+        recipes, next_cursor, start = catalog_page(snap, ids, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    context = _browse_context(request, snap, recipes, heading)
+    context.update(next_cursor=next_cursor, limit=limit, facets=facets, facet_query=query)
+    return _page(request, key + (start, limit), "browse.html", context)
+
+
+def _facet_filter(snap: CatalogSnapshot, filters: Filters, max_time: Optional[int]):
+    """(matching ids or None when unfiltered, live facet counts), cached per catalog version."""
+    fi = snap.facets
+    key = filters_key(filters, max_time)
+    counts = RESULTS.get_or_set(("facet_counts", snap.version, key), lambda: fi.counts(filters, max_time))
+    if not filters and max_time is None:
+        return None, counts
+    ids = RESULTS.get_or_set(("facet_ids", snap.version, key), lambda: fi.ids(fi.select(filters, max_time)))
+    return ids, counts
+
+
 # ---------- Routes ----------
 
 @router.get("", response_class=HTMLResponse)
-def list_all(request: Request):
-    """Browse ALL recipes (grid)."""
-    recipes = get_all_recipes()
-    return templates.TemplateResponse("browse.html", _browse_context(request, recipes, "Browse All Recipes"))
+def list_all(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="opaque cursor from the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    region: List[str] = Query([], description="cuisines.json region key(s), e.g. south"),
+    cuisine: List[str] = Query([], description="cuisine name(s)"),
+    time: List[str] = Query([], description="time bucket(s): 15, 30, 60, 120, more"),
+    servings: List[str] = Query([], description="exact serving count(s)"),
+    max_time: Optional[int] = Query(None, ge=1, description="total time at most this many minutes"),
+):
+    """Browse ALL recipes (grid), one page at a time, optionally narrowed by facets."""
+    snap = get_snapshot()
+    filters = normalize_filters(region, cuisine, time, servings)
+    ids, counts = _facet_filter(snap, filters, max_time)
+    pairs = query_pairs(filters, max_time)
+    return _browse_page(request, snap, ids, "Browse All Recipes", ("browse", snap.version, filters_key(filters, max_time)),
+                        cursor, limit, facets=with_links(counts, filters, max_time),
+                        query=urlencode(pairs) + "&" if pairs else "")
 
 
 @router.get("/cuisine/{cuisine}", response_class=HTMLResponse)
-def list_by_cuisine(cuisine: str, request: Request):
+def list_by_cuisine(
+    cuisine: str,
+    request: Request,
+    cursor: Optional[str] = Query(None, description="opaque cursor from the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     """
     Browse by cuisine/region (e.g. 'north indian', 'south indian').
     Loader does exact-match first, then partial fallback (so 'indian' still shows stuff).
     """
-    recipes = get_recipes_by_cuisine(cuisine)
-    heading = f"{cuisine.title()} Recipes"
-    return templates.TemplateResponse("browse.html", _browse_context(request, recipes, heading))
+    snap = get_snapshot()
+    return _browse_page(request, snap, snap.cuisine_ids(cuisine), f"{cuisine.title()} Recipes",
+                        ("cuisine", cuisine, snap.version), cursor, limit)
 
 
 @router.get("/__reload")
 def dev_reload():
-    """Hot-reload JSON from disk without restarting uvicorn (dev QoL)."""
-    count = reload_data()
-    return JSONResponse({"reloaded": count})
+    """Hot-reload JSON from disk without restarting uvicorn; only changed recipes are re-indexed."""
+    report = reload_catalog()
+    return JSONResponse({"reloaded": report.total, **report.as_dict()})
 
 
 @router.get("/__stats")
 def stats():
-    """Quick counts per cuisine for sanity checks."""
-    counts = cuisine_counts()
-    return JSONResponse({"cuisines": counts, "total": sum(counts.values())})
+    """Quick counts per cuisine (plus result-cache counters) for sanity checks."""
+    snap = get_snapshot()
+    counts = dict(snap.counts)
+    last = last_reload()
+    shards = last_shard_load()
+    return JSONResponse({
+        "cuisines": counts,
+        "total": sum(counts.values()),
+        "version": snap.version,
+        "cache": cache_stats(),
+        "last_reload": last.as_dict() if last else None,
+        "shards": shards.as_dict() if shards else None,
+    })
 
 
 @router.get("/{slug}", response_class=HTMLResponse)
 def recipe_detail(slug: str, request: Request):
     """Single recipe page."""
-    recipe = RECIPES.get(slug)
+    snap = get_snapshot()
+    recipe = snap.recipe(slug)
     if not recipe:
         return templates.TemplateResponse(
             "recipe_detail.html",
@@ -82,13 +149,16 @@ def recipe_detail(slug: str, request: Request):
             },
             status_code=404,
         )
-    return templates.TemplateResponse("recipe_detail.html", {"request": request, "r": recipe})
+    similar = [r for r, _ in snap.similar_to(slug, SIMILAR_SHOWN)]
+    return _page(request, ("detail", slug, snap.version, snap.similar_ready), "recipe_detail.html",
+                 {"request": request, "r": recipe, "similar": similar})
 
 
 @router.get("/{slug}/cook", response_class=HTMLResponse)
 def recipe_cook(slug: str, request: Request):
     """Fullscreen Cook Mode (stepper + timer)."""
-    recipe = RECIPES.get(slug)
+    snap = get_snapshot()
+    recipe = snap.recipe(slug)
     if not recipe:
         return templates.TemplateResponse("cook_mode.html", {"request": request, "r": None}, status_code=404)
-    return templates.TemplateResponse("cook_mode.html", {"request": request, "r": recipe})
+    return _page(request, ("cook", slug, snap.version), "cook_mode.html", {"request": request, "r": recipe})
@@ -1,46 +1,138 @@
-from fastapi import APIRouter, Request, Query
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from ..utils.loader import basic_search
+from typing import List, Optional
+from urllib.parse import urlencode
 
-try:
-    from rapidfuzz import fuzz
-    HAVE_FUZZ = True
-except Exception:
-    HAVE_FUZZ = False
+from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import HTMLResponse, JSONResponse
+from .. import fts
+from ..database import SessionLocal
+from ..utils.cache import RESULTS
+from ..utils.facets import filters_key, normalize_filters, query_pairs, with_links
+from ..utils.loader import get_snapshot
+from ..utils.metrics import FUZZY_SECONDS, SEARCH_CANDIDATES, SEARCH_RESULTS
+from ..utils.pagination import MAX_PAGE_SIZE, PAGE_SIZE, decode_offset, encode_cursor, offset_page
+from ..utils.ranking import HAVE_FUZZ, rank
+from ..utils.records import Recipe
+from ..utils.suggest import SUGGEST_LIMIT, SUGGEST_MAX
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+
+def _card(r: Recipe) -> dict:
+    # attribute access: works for catalog records and models.Recipe rows alike
+    return {"title": r.title, "slug": r.slug, "time": r.time_total,
+            "tags": [r.cuisine, f"{r.servings} servings"]}
+
+
+def ranked_ids(snap, q: str, cuisine: str) -> tuple:
+    """
+    Every hit for `q`, fuzzy-ranked best first when rapidfuzz is around. The whole
+    ordering is cached per catalog version and pages are slices of it, so cursors
+    reach the last hit.
+    """
+    def run():
+        # get coarse hits first
+        ids = snap.search(q, cuisine if cuisine else None)
+        SEARCH_CANDIDATES.observe(len(ids))
+        out = tuple(ids)
+        # fuzzy rank (best effort if rapidfuzz installed)
+        if HAVE_FUZZ and q:
+            with FUZZY_SECONDS.time():
+                ranked = [i for _, i in rank(snap, q, ids)]
+            # fallback if all filtered out by threshold
+            if ranked:
+                out = tuple(ranked)
+        SEARCH_RESULTS.observe(len(out))
+        return out
+    return RESULTS.get_or_set(("ranked_ids", snap.version, q.lower().strip(), cuisine.lower().strip()), run)
+
+
+def _hits_bitmap(snap, q: str, cuisine: str) -> int:
+    """Every ranked hit for `q` as a facet bitmap: the pool facet filters and counts work within."""
+    key = ("ranked_bitmap", snap.version, q.lower().strip(), cuisine.lower().strip())
+    return RESULTS.get_or_set(key, lambda: snap.facets.bitmap(ranked_ids(snap, q, cuisine)))
+
+
+def _filtered_ids(snap, q: str, cuisine: str, filters, max_time: Optional[int]) -> tuple:
+    """All of ranked_ids that pass the facet filters, ranking order kept."""
+    ids = ranked_ids(snap, q, cuisine)
+    if not filters and max_time is None:
+        return ids
+    fi = snap.facets
+
+    def run():
+        return fi.keep(ids, fi.select(filters, max_time, within=_hits_bitmap(snap, q, cuisine)))
+    key = ("ranked_facets", snap.version, q.lower().strip(), cuisine.lower().strip(), filters_key(filters, max_time))
+    return RESULTS.get_or_set(key, run)
+
+
+def _facet_counts(snap, q: str, cuisine: str, filters, max_time: Optional[int]) -> dict:
+    """
+    Live counts over all of this query's hits. The cuisine facet is counted over
+    the hits *without* the cuisine filter, so the other cuisines stay pickable.
+    """
+    def run():
+        fi = snap.facets
+        counts = fi.counts(filters, max_time, within=_hits_bitmap(snap, q, cuisine))
+        if cuisine:
+            any_cuisine = fi.counts(filters, max_time, within=_hits_bitmap(snap, q, ""))
+            c = " ".join(cuisine.lower().split())
+            counts["cuisine"] = [{**row, "selected": row["value"] == c} for row in any_cuisine["cuisine"]]
+        return counts
+    key = ("search_facets", snap.version, q.lower().strip(), cuisine.lower().strip(), filters_key(filters, max_time))
+    return RESULTS.get_or_set(key, run)
+
+
+def _db_page(q: str, cuisine: str, cursor: Optional[str], limit: int) -> tuple[list[dict], Optional[str]]:
+    # FTS5 backend: ranking, prefix match, cuisine filter and paging all happen in SQLite
+    offset = decode_offset(cursor)
+    with SessionLocal() as db:
+        rows = fts.search(db, q, cuisine or None, limit=limit + 1, offset=offset)
+    more = len(rows) > limit
+    return [_card(r) for r in rows[:limit]], (encode_cursor(offset + limit) if more else None)
+
+
+@router.get("/suggest")
+def suggest(
+    q: str = Query("", description="what has been typed so far"),
+    limit: int = Query(SUGGEST_LIMIT, ge=1, le=SUGGEST_MAX),
+):
+    """As-you-type completions over titles, cuisines and ingredients (most recipes first)."""
+    return JSONResponse({"q": q, "suggestions": get_snapshot().suggester.complete(q, limit)},
+                        headers={"Cache-Control": "public, max-age=60"})
+
 
 @router.get("", response_class=HTMLResponse)
 def search(
     request: Request,
     q: str = Query("", description="search query"),
-    cuisine: str = Query("", description="optional cuisine filter")
+    cuisine: str = Query("", description="optional cuisine filter"),
+    cursor: Optional[str] = Query(None, description="opaque cursor from the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    region: List[str] = Query([], description="cuisines.json region key(s), e.g. south"),
+    time: List[str] = Query([], description="time bucket(s): 15, 30, 60, 120, more"),
+    servings: List[str] = Query([], description="exact serving count(s)"),
+    max_time: Optional[int] = Query(None, ge=1, description="total time at most this many minutes"),
 ):
-    # get coarse hits first
-    pool = basic_search(q, cuisine if cuisine else None)
-
-    # fuzzy rank (best effort if rapidfuzz installed)
-    results = []
-    if HAVE_FUZZ and q:
-        scored = []
-        for r in pool:
-            text = " ".join([r["title"], r["cuisine"]] + r.get("ingredients", []))
-            score = max(
-                fuzz.partial_ratio(q, r["title"]),
-                fuzz.token_set_ratio(q, text)
-            )
-            scored.append((score, r))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        results = [ {"title": r["title"], "slug": r["slug"], "time": r["time_total"],
-                     "tags": [r["cuisine"], f"{r['servings']} servings"]} for score, r in scored if score >= 55 ]
-        # fallback if all filtered out by threshold
-        if not results:
-            results = [ {"title": r["title"], "slug": r["slug"], "time": r["time_total"],
-                         "tags": [r["cuisine"], f"{r['servings']} servings"]} for r in pool ]
-    else:
-        results = [ {"title": r["title"], "slug": r["slug"], "time": r["time_total"],
-                     "tags": [r["cuisine"], f"{r['servings']} servings"]} for r in pool ]
-
-    return templates.TemplateResponse("search_results.html", {"request": request, "q": q, "results": results})
+    # the cuisine facet reuses the `cuisine` param above (single-valued)
+    filters = normalize_filters(region, (), time, servings)
+    facets = None
+    try:
+        if fts.active():
+            # facets live on the in-memory catalog; the FTS backend pages in SQLite
+            results, next_cursor = _db_page(q, cuisine, cursor, limit)
+        else:
+            snap = get_snapshot()
+            ids, next_cursor = offset_page(_filtered_ids(snap, q, cuisine, filters, max_time), cursor, limit)
+            results = [_card(r) for r in snap.take(ids)]
+            selected = {**filters, "cuisine": (" ".join(cuisine.lower().split()),)} if cuisine.strip() else filters
+            facets = with_links(_facet_counts(snap, q, cuisine, filters, max_time), selected, max_time,
+                                params=[("q", q)], single=("cuisine",))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    pairs = query_pairs(filters, max_time)
+    return templates.TemplateResponse("search_results.html", {
+        "request": request, "q": q, "cuisine": cuisine, "results": results,
+        "next_cursor": next_cursor, "limit": limit, "facets": facets,
+        "facet_query": urlencode(pairs) + "&" if pairs else "",
+    })
@@ -0,0 +1,177 @@
+"""
+Bulk import of the recipe JSON into the `recipes` table.
+
+Records are streamed (utils/stream.py), normalized exactly like the in-memory
+catalog (loader._normalize_one) and upserted by slug in batches with the
+dialect's native INSERT ... ON CONFLICT. Rows whose content didn't change are
+left alone, so re-running an import is cheap and only bumps real edits.
+
+    python -m app.seed [--recipes data/seed_recipes.json | data/recipes/] [--batch 1000]
+"""
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Text, cast, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+from . import models
+from .database import Base, engine as default_engine
+from .utils.shards import ShardedCatalog
+from .utils.stream import iter_recipes
+
+BATCH_SIZE = 1000
+BATCHES_PER_TXN = 10
+
+_COLUMNS = ("slug", "title", "cuisine", "time_total", "servings", "ingredients", "steps")
+_JSON_COLUMNS = ("ingredients", "steps")
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0        # not a usable recipe (no slug, wrong types)
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows / self.seconds) if self.seconds else None,
+        }
+
+
+def _is_int(v: Any) -> bool:
+    return v is None or (isinstance(v, int) and not isinstance(v, bool))
+
+
+def _row(raw: Any) -> Optional[Dict[str, Any]]:
+    from .utils.loader import _normalize_one
+
+    r = _normalize_one(raw)
+    if r is None or not _is_int(r.get("time_total")) or not _is_int(r.get("servings")):
+        return None
+    row = {k: r.get(k) for k in _COLUMNS}
+    row["ingredients"], row["steps"] = list(r.ingredients), list(r.steps)
+    return row
+
+
+def _batches(rows: Iterable[Optional[Dict[str, Any]]], size: int, report: ImportReport) -> Iterator[List[Dict[str, Any]]]:
+    batch: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        if row is None:
+            report.skipped += 1
+            continue
+        # one statement can't touch a row twice: later duplicates win, like the loader
+        batch[row["slug"]] = row
+        if len(batch) >= size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+def _upsert_statement(dialect: str):
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"bulk import needs INSERT ... ON CONFLICT (sqlite or postgresql), not {dialect!r}")
+    table = models.Recipe.__table__
+    stmt = insert(table)
+    changed = [
+        cast(table.c[k], Text).is_distinct_from(cast(stmt.excluded[k], Text)) if k in _JSON_COLUMNS
+        else table.c[k].is_distinct_from(stmt.excluded[k])
+        for k in _COLUMNS if k != "slug"
+    ]
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.slug],
+        set_={**{k: stmt.excluded[k] for k in _COLUMNS if k != "slug"}, "updated_at": func.now()},
+        where=or_(*changed),   # unchanged rows aren't rewritten (and aren't RETURNed)
+    ).returning(table.c.slug)
+
+
+def _apply(conn: Connection, stmt, batch: List[Dict[str, Any]], report: ImportReport) -> None:
+    slug = models.Recipe.__table__.c.slug
+    slugs = [row["slug"] for row in batch]
+    existing = set(conn.execute(select(slug).where(slug.in_(slugs))).scalars())
+    written = set(conn.execute(stmt, batch).scalars())
+    report.inserted += len(written - existing)
+    report.updated += len(written & existing)
+    report.unchanged += len(batch) - len(written)
+
+
+def import_records(records: Iterable[Any], engine: Optional[Engine] = None, batch_size: int = BATCH_SIZE,
+                   batches_per_txn: int = BATCHES_PER_TXN) -> ImportReport:
+    """Upsert raw recipe dicts by slug; commits every `batches_per_txn` batches."""
+    engine = engine or default_engine
+    Base.metadata.create_all(engine, tables=[models.Recipe.__table__])
+    stmt = _upsert_statement(engine.dialect.name)
+    report = ImportReport()
+    start = time.perf_counter()
+    batches = _batches(map(_row, records), batch_size, report)
+    done = False
+    while not done:
+        with engine.begin() as conn:
+            for _ in range(batches_per_txn):
+                batch = next(batches, None)
+                if batch is None:
+                    done = True
+                    break
+                _apply(conn, stmt, batch, report)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def import_recipes(path: Optional[Path] = None, engine: Optional[Engine] = None,
+                   batch_size: int = BATCH_SIZE, batches_per_txn: int = BATCHES_PER_TXN) -> ImportReport:
+    """
+    Stream a recipe file (JSON array, {"recipes": [...]} or NDJSON) into the recipes
+    table. A shard directory goes through the loader's ShardedCatalog (validated,
+    merged by name); its invalid records count as skipped.
+    """
+    from .utils.loader import DATA_FILE, REGION_BY_SLUG
+
+    path = Path(path or DATA_FILE)
+    if not path.is_dir():
+        return import_records(iter_recipes(path), engine, batch_size, batches_per_txn)
+    loaded = ShardedCatalog(path, REGION_BY_SLUG).load()
+    report = import_records((r.to_dict() for r in loaded.records), engine, batch_size, batches_per_txn)
+    report.skipped += sum(s.invalid for s in loaded.shards)
+    return report
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    from sqlalchemy import create_engine
+
+    from .database import DATABASE_URL, engine_options
+    from .utils.loader import DATA_FILE
+
+    p = argparse.ArgumentParser(prog="python -m app.seed")
+    p.add_argument("--recipes", type=Path, default=DATA_FILE)
+    p.add_argument("--database-url", default=DATABASE_URL)
+    p.add_argument("--batch", type=int, default=BATCH_SIZE)
+    p.add_argument("--batches-per-txn", type=int, default=BATCHES_PER_TXN)
+    args = p.parse_args(argv)
+
+    engine = create_engine(args.database_url, future=True, **engine_options(args.database_url))
+    report = import_recipes(args.recipes, engine, args.batch, args.batches_per_txn)
+    print(json.dumps(report.as_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
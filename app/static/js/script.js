@@ -1 +1,25 @@
 console.log("Dishcovery loaded");
+
+// typeahead for the header search box (fills its <datalist> from /search/suggest)
+document.querySelectorAll("input[data-suggest]").forEach((input) => {
+  const list = document.getElementById(input.getAttribute("list"));
+  let timer = null;
+  let last = "";
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(async () => {
+      const q = input.value.trim();
+      if (!q || q === last) return;
+      last = q;
+      const res = await fetch(`${input.dataset.suggest}?q=${encodeURIComponent(q)}`);
+      if (!res.ok || q !== input.value.trim()) return;
+      const { suggestions } = await res.json();
+      list.replaceChildren(...suggestions.map((s) => {
+        const opt = document.createElement("option");
+        opt.value = s.text;
+        opt.label = s.kind;
+        return opt;
+      }));
+    }, 80);
+  });
+});
@@ -0,0 +1,56 @@
+# app/templating.py
+# one Jinja environment for the whole app (main + every router share it)
+import logging
+import os
+import time
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, Template
+
+from .utils.metrics import RENDER_SECONDS
+
+log = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "app/templates"
+# dev mode re-stats template files on every render; production compiles each once
+DEBUG = os.getenv("DISHCOVERY_DEBUG", "0").lower() in ("1", "true", "yes")
+# compiled-template cache shared by workers (unset = a per-user temp dir, "off" = none)
+BYTECODE_DIR = os.getenv("DISHCOVERY_TEMPLATE_CACHE") or None
+
+
+def _bytecode_cache():
+    if BYTECODE_DIR == "off":
+        return None
+    if BYTECODE_DIR:
+        os.makedirs(BYTECODE_DIR, exist_ok=True)
+    return FileSystemBytecodeCache(BYTECODE_DIR)
+
+
+class TimedTemplate(Template):
+    """Template whose render() feeds dishcovery_template_render_seconds."""
+
+    def render(self, *args, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            RENDER_SECONDS.observe(time.perf_counter() - start, self.name or "<string>")
+
+
+templates = Jinja2Templates(
+    directory=TEMPLATE_DIR,
+    auto_reload=DEBUG,
+    bytecode_cache=_bytecode_cache(),
+)
+templates.env.template_class = TimedTemplate
+
+
+def precompile_templates() -> int:
+    """Compile (or load from the bytecode cache) every template before the first request."""
+    start = time.perf_counter()
+    env = templates.env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    log.info("precompiled %d templates in %.1f ms", len(names), (time.perf_counter() - start) * 1000)
+    return len(names)
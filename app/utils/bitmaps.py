@@ -0,0 +1,38 @@
+"""
+Recipe-id bitmaps: plain Python ints where bit i is recipe id i. AND/OR and
+bit_count() run in C over the whole catalog, which is what the pantry,
+facet and substitution indexes are built on.
+"""
+from typing import Iterable, Iterator, Tuple
+
+# set bit positions of every byte value, for decoding a byte at a time
+_BYTE_BITS = tuple(tuple(j for j in range(8) if b >> j & 1) for b in range(256))
+
+
+def to_bitmap(ids: Iterable[int], n: int) -> int:
+    """Bitmap of `ids` (all < n), built in a bytearray rather than by repeated big-int ORs."""
+    buf = bytearray((n + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Set bits, lowest first; O(hits) big-int ops, so best for sparse bitmaps or the first hit."""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+def bitmap_ids(bitmap: int, n: int) -> Tuple[int, ...]:
+    """Every set bit in ascending order; O(n / 8 + hits), for dense bitmaps."""
+    raw = bitmap.to_bytes((n + 7) // 8, "little")
+    table = _BYTE_BITS
+    return tuple(k * 8 + j for k, b in enumerate(raw) if b for j in table[b])
+
+
+def keep_ids(ids: Iterable[int], bitmap: int, n: int) -> Tuple[int, ...]:
+    """`ids` that are set in `bitmap`, order preserved (one bytes copy, then O(1) per id)."""
+    flags = bitmap.to_bytes((n + 7) // 8, "little")
+    return tuple(i for i in ids if flags[i >> 3] >> (i & 7) & 1)
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+from .metrics import COLLECTORS
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU with an optional TTL, plus counters for sizing.
+    Keys should carry the catalog version so a reload never serves stale results.
+    With register=True the cache joins CACHES (clear_all, /recipes/__stats,
+    /metrics); names must be unique there.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None, register: bool = False):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        if register:
+            if name in CACHES:
+                raise ValueError(f"a cache named {name!r} is already registered")
+            CACHES[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value or compute + store it (compute runs outside the lock)."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+CACHES: Dict[str, LRUCache] = {}
+
+
+def clear_all() -> None:
+    for c in CACHES.values():
+        c.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: c.stats() for name, c in CACHES.items()}
+
+
+def _metric_lines() -> Iterator[str]:
+    # read at scrape time, so lookups don't pay for a second set of counters
+    stats = cache_stats()
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                        ("expirations", "counter"), ("size", "gauge")):
+        name = f"dishcovery_cache_{field}" + ("_total" if kind == "counter" else "")
+        yield f"# TYPE {name} {kind}"
+        for cache, s in stats.items():
+            yield f'{name}{{cache="{cache}"}} {s[field]}'
+
+
+COLLECTORS.append(_metric_lines)
+
+
+# query results for search + browse; size/TTL from the environment
+CACHE_SIZE = int(os.getenv("DISHCOVERY_CACHE_SIZE", "2048"))
+CACHE_TTL = float(os.getenv("DISHCOVERY_CACHE_TTL", "300")) or None
+
+RESULTS = LRUCache("results", maxsize=CACHE_SIZE, ttl=CACHE_TTL, register=True)
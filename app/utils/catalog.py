@@ -0,0 +1,183 @@
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .cache import RESULTS
+from .facets import FacetIndex
+from .pantry import PantryIndex
+from .records import Recipe
+from .search_index import SearchIndex
+from .similar import SIMILAR_SYNC_MAX, SimilarIndex
+from .substitutions import get_graph
+from .suggest import Suggester
+
+_VERSIONS = itertools.count(1)
+
+
+def next_version() -> int:
+    return next(_VERSIONS)
+
+
+@dataclass(frozen=True, eq=False)
+class CatalogSnapshot:
+    """
+    Everything the routes read, built once per load and never mutated.
+    The loader swaps the whole object in one assignment, so a request that
+    grabs a snapshot sees one consistent catalog even if a reload lands mid-request.
+    Recipe ids are positions in `recipes`. The sequences/mappings may be plain
+    tuples/dicts or read-only views over a mapped catalog file (catalog_file.map_catalog).
+    """
+    version: int
+    recipes: Sequence[Recipe]
+    by_slug: Mapping[str, Recipe]
+    by_cuisine: Mapping[str, Sequence[int]]     # cuisine_norm -> ids, catalog order
+    cuisines: Tuple[str, ...]                   # sorted display names
+    counts: Mapping[str, int]                   # display name -> recipe count
+    index: SearchIndex                          # index.texts doubles as the fuzzy corpus
+    titles: Sequence[str]                       # lowercase titles, for fuzzy ranking
+    regions: Mapping[str, Tuple[str, ...]] = field(default_factory=dict)  # cuisines.json dishes_by_region
+
+    @cached_property
+    def pantry(self) -> PantryIndex:
+        """Ingredient vocabulary for /pantry matching (built on first use)."""
+        return PantryIndex(self.recipes, get_graph())
+
+    @cached_property
+    def facets(self) -> FacetIndex:
+        """Region/cuisine/time/servings bitmaps plus the region map (built by the loader on install)."""
+        return FacetIndex(self.recipes, self.regions)
+
+    def region(self, key: str) -> List[Recipe]:
+        """Recipes listed for a cuisines.json region, in file order."""
+        return self.take(self.facets.region_ids.get((key or "").strip().lower(), ()))
+
+    @cached_property
+    def similar(self) -> SimilarIndex:
+        """Top-k "more like this" neighbours for every recipe (see utils/similar.py)."""
+        return SimilarIndex.build(self.recipes)
+
+    @property
+    def similar_ready(self) -> bool:
+        return "similar" in self.__dict__
+
+    def similar_to(self, slug: str, limit: Optional[int] = None) -> List[Tuple[Recipe, float]]:
+        """
+        (recipe, cosine) neighbours of `slug`, best first. Big catalogs are
+        scored in the background; until that lands this returns [] rather than
+        making a request wait for it.
+        """
+        if not self.similar_ready and len(self.recipes) > SIMILAR_SYNC_MAX:
+            return []
+        i = self.positions.get(slug)
+        if i is None:
+            return []
+        pairs = self.similar.neighbours(i)[:limit]
+        recipes = self.recipes
+        return [(recipes[j], score) for j, score in pairs]
+
+    @cached_property
+    def positions(self) -> Mapping[str, int]:
+        """slug -> recipe id."""
+        return {r.slug: i for i, r in enumerate(self.recipes)}
+
+    @cached_property
+    def suggester(self) -> Suggester:
+        """Prefix typeahead for /search/suggest (the loader builds it when it installs the snapshot)."""
+        return Suggester(self.recipes)
+
+    def take(self, ids: Iterable[int]) -> List[Recipe]:
+        recipes = self.recipes
+        return [recipes[i] for i in ids]
+
+    def recipe(self, slug: str) -> Optional[Recipe]:
+        return self.by_slug.get(slug)
+
+    def cuisine_ids(self, cuisine: str) -> Sequence[int]:
+        """Exact match first (case/space-insensitive), then partial contains as fallback."""
+        c = (cuisine or "").strip().lower()
+        exact = self.by_cuisine.get(c)
+        if exact is not None:
+            return exact
+        if not c:
+            return ()
+        return RESULTS.get_or_set(("cuisine_ids", self.version, c), lambda: self._partial_cuisine_ids(c))
+
+    def _partial_cuisine_ids(self, c: str) -> Tuple[int, ...]:
+        # partial contains (so 'north' or 'indian' still returns stuff)
+        parts = [ids for key, ids in self.by_cuisine.items() if c in key]
+        if len(parts) == 1:
+            return parts[0]
+        return tuple(sorted(itertools.chain.from_iterable(parts)))
+
+    def in_cuisine(self, cuisine: str) -> Sequence[Recipe]:
+        c = (cuisine or "").strip().lower()
+        return RESULTS.get_or_set(("cuisine", self.version, c), lambda: tuple(self.take(self.cuisine_ids(c))))
+
+    def search(self, q: str, cuisine: Optional[str] = None) -> Sequence[int]:
+        ql = (q or "").lower().strip()
+        c = (cuisine or "").strip().lower() or None
+
+        def run():
+            within = self.cuisine_ids(c) if c else None
+            return tuple(self.index.search(ql, within))
+        return RESULTS.get_or_set(("search", self.version, ql, c), run)
+
+
+def build_snapshot(recipes: Iterable[Recipe], index: Optional[SearchIndex] = None,
+                   by_cuisine: Optional[Mapping[str, Tuple[int, ...]]] = None,
+                   regions: Optional[Mapping[str, Iterable[str]]] = None) -> CatalogSnapshot:
+    """
+    `recipes` must already be normalized and deduped (see loader._normalize_list);
+    pass `index` / `by_cuisine` if they were prebuilt for exactly these recipes in this order.
+    """
+    recipes = tuple(recipes)
+    if index is None:
+        index = SearchIndex.build(recipes)
+    index.records = recipes
+    if by_cuisine is None:
+        buckets: Dict[str, List[int]] = {}
+        for i, r in enumerate(recipes):
+            buckets.setdefault(r.get("cuisine_norm", ""), []).append(i)
+        by_cuisine = {k: tuple(v) for k, v in buckets.items()}
+    return CatalogSnapshot(
+        version=next_version(),
+        recipes=recipes,
+        by_slug=MappingProxyType({r["slug"]: r for r in recipes}),
+        by_cuisine=MappingProxyType(dict(by_cuisine)),
+        cuisines=tuple(sorted({r.get("cuisine", "") for r in recipes if r.get("cuisine")})),
+        counts=MappingProxyType(dict(Counter(r.get("cuisine", "") for r in recipes))),
+        index=index,
+        titles=tuple(r.get("title", "").lower() for r in recipes),
+        regions=MappingProxyType({k: tuple(v) for k, v in (regions or {}).items()}),
+    )
+
+
+class CatalogBuilder:
+    """
+    Collects normalized recipes one at a time (slug dedupe: the last record wins
+    but keeps the first one's position) and feeds the search index as it goes,
+    so a streamed load never holds the raw document.
+    """
+
+    def __init__(self):
+        self.recipes: List[Recipe] = []
+        self.slots: Dict[str, int] = {}
+        self.index = SearchIndex([], [], {})
+
+    def add(self, r: Recipe) -> None:
+        i = self.slots.get(r["slug"])
+        if i is None:
+            self.slots[r["slug"]] = self.index.add(r)
+            self.recipes.append(r)
+        else:
+            self.index.replace(i, r)
+            self.recipes[i] = r
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def build(self, regions: Optional[Mapping[str, Iterable[str]]] = None) -> CatalogSnapshot:
+        return build_snapshot(self.recipes, index=self.index, regions=regions)
@@ -0,0 +1,416 @@
+"""
+Precompiled binary catalog: the normalized recipes plus the search and cuisine
+indexes laid out as flat little-endian columns behind a small JSON header, so a
+worker can mmap it and be serving in a fraction of a JSON parse + index build.
+
+Layout:
+    MAGIC (8 bytes) | header length (u32) | header JSON | pad to 8 | sections...
+
+The header records the format version, the source files' size/mtime/sha256
+and each section as [offset, nbytes, typecode] relative to the first section.
+Strings (slugs, titles, ingredient lines, steps, grams...) live once in a
+UTF-8 blob addressed by byte offsets; every other column stores string ids.
+
+Opening a catalog parses only the header: records, haystacks, titles, the
+slug map and postings all decode from the mapping on access. open_catalog()
+keeps each record once it has been decoded (per-process objects for the hot
+path); map_catalog() keeps nothing, so worker processes mapping the same file
+share one copy through the page cache.
+
+    python -m app.utils.catalog_file build [--out data/catalog.snap]
+    python -m app.utils.catalog_file info data/catalog.snap
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+from .catalog import CatalogSnapshot, next_version
+from .records import Recipe
+from .search_index import SearchIndex
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"DSHCAT\x00\x01"
+FORMAT = 2
+_ALIGN = 8
+
+
+# ---- source fingerprints ----
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {"path": str(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(path)}
+
+
+def is_fresh(recorded: Optional[Dict[str, Any]], path: Path) -> bool:
+    """Cheap size/mtime check first; on mismatch fall back to comparing content hashes."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return recorded is None
+    if recorded is None:
+        return False
+    if st.st_size == recorded["size"] and st.st_mtime_ns == recorded["mtime_ns"]:
+        return True
+    return st.st_size == recorded["size"] and _sha256(path) == recorded["sha256"]
+
+
+def sources_fresh(recorded: Mapping[str, Any], sources: Mapping[str, Path]) -> bool:
+    """Same source names as recorded (a shard added or removed counts) and each one unchanged."""
+    return set(recorded) == set(sources) and all(is_fresh(recorded.get(n), p) for n, p in sources.items())
+
+
+# ---- writing ----
+
+class _Strings:
+    def __init__(self):
+        self.ids: Dict[str, int] = {"": 0}
+        self.items = [""]
+
+    def __call__(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+
+def _columns(snap: CatalogSnapshot) -> Dict[str, array]:
+    sid = _Strings()
+    cols = {
+        "slug": array("I"), "title": array("I"), "cuisine": array("I"), "cuisine_norm": array("I"),
+        "time_total": array("q"), "servings": array("q"), "extra": array("I"),
+        "text": array("I"), "title_lower": array("I"),
+        "ing_off": array("Q", [0]), "ing_ids": array("I"),
+        "step_off": array("Q", [0]), "step_ids": array("I"),
+    }
+    for r in snap.recipes:
+        for k in ("slug", "title", "cuisine", "cuisine_norm"):
+            cols[k].append(sid(getattr(r, k)))
+        for k in ("time_total", "servings"):
+            v = getattr(r, k)
+            if type(v) is not int:
+                raise ValueError(f"{r.slug}: {k} must be an int to compile the catalog")
+            cols[k].append(v)
+        cols["extra"].append(sid(json.dumps(r.extra, ensure_ascii=False)) if r.extra else 0)
+        cols["text"].append(sid(snap.index.texts[len(cols["text"])]))
+        cols["title_lower"].append(sid(snap.titles[len(cols["title_lower"])]))
+        cols["ing_ids"].extend(sid(x) for x in r.ingredients)
+        cols["ing_off"].append(len(cols["ing_ids"]))
+        cols["step_ids"].extend(sid(x) for x in r.steps)
+        cols["step_off"].append(len(cols["step_ids"]))
+
+    # prebuilt indexes: n-gram postings and cuisine buckets
+    cols.update({"gram": array("I"), "post_off": array("Q", [0]), "post_ids": array("I")})
+    for g in sorted(snap.index.postings):
+        cols["gram"].append(sid(g))
+        cols["post_ids"].extend(snap.index.postings[g])
+        cols["post_off"].append(len(cols["post_ids"]))
+    cols.update({"bucket": array("I"), "bucket_off": array("Q", [0]), "bucket_ids": array("I")})
+    for key in sorted(snap.by_cuisine):
+        cols["bucket"].append(sid(key))
+        cols["bucket_ids"].extend(snap.by_cuisine[key])
+        cols["bucket_off"].append(len(cols["bucket_ids"]))
+
+    cols["slug_order"] = array("I", sorted(range(len(snap.recipes)), key=lambda i: snap.recipes[i].slug))
+
+    encoded = [s.encode("utf-8") for s in sid.items]
+    offsets, pos = array("Q", [0]), 0
+    for b in encoded:
+        pos += len(b)
+        offsets.append(pos)
+    cols["str_off"] = offsets
+    cols["str_blob"] = array("B", b"".join(encoded))
+    return cols
+
+
+def write_catalog(snap: CatalogSnapshot, path: Path, sources: Mapping[str, Path], salt: str = "") -> Dict[str, Any]:
+    """Compile `snap` to `path` atomically (temp file + rename); returns the header."""
+    if sys.byteorder != "little":
+        raise ValueError("binary catalogs are little-endian only")
+    cols = _columns(snap)
+    sections, pos = {}, 0
+    for name, col in cols.items():
+        nbytes = len(col) * col.itemsize
+        sections[name] = [pos, nbytes, col.typecode]
+        pos += -(-nbytes // _ALIGN) * _ALIGN
+    header = {
+        "format": FORMAT,
+        "count": len(snap.recipes),
+        "salt": salt,
+        "sources": {name: fingerprint(p) for name, p in sources.items()},
+        "regions": {k: list(v) for k, v in snap.regions.items()},
+        "cuisines": list(snap.cuisines),
+        "counts": dict(snap.counts),
+        "sections": sections,
+    }
+    raw = json.dumps(header).encode("utf-8")
+    lead = len(MAGIC) + 4 + len(raw)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+            f.write(b"\0" * (-lead % _ALIGN))
+            for name, col in cols.items():
+                data = col.tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % _ALIGN))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return header
+
+
+# ---- reading ----
+
+def read_header(path: Path) -> Tuple[Dict[str, Any], int]:
+    """(header, offset of the first section); ValueError if this isn't a catalog we can read."""
+    with open(path, "rb") as f:
+        lead = f.read(len(MAGIC) + 4)
+        if len(lead) < len(MAGIC) + 4 or lead[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a compiled catalog")
+        (n,) = struct.unpack("<I", lead[len(MAGIC):])
+        header = json.loads(f.read(n))
+    if header.get("format") != FORMAT:
+        raise ValueError(f"{path} has catalog format {header.get('format')}, expected {FORMAT}")
+    base = len(MAGIC) + 4 + n
+    return header, base + (-base % _ALIGN)
+
+
+class _Mapped:
+    """Typed views over one mapped catalog file."""
+
+    def __init__(self, path: Path):
+        self.header, base = read_header(path)
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mm)
+        self.cols = {
+            name: view[base + off: base + off + nbytes].cast(code)
+            for name, (off, nbytes, code) in self.header["sections"].items()
+        }
+        self.blob, self.str_off = self.cols["str_blob"], self.cols["str_off"]
+
+    def string(self, k: int) -> str:
+        return str(self.blob[self.str_off[k]:self.str_off[k + 1]], "utf-8")
+
+    def recipe(self, i: int) -> Recipe:
+        s = self.string
+        c = self.cols
+        a, b = c["ing_off"][i], c["ing_off"][i + 1]
+        x, y = c["step_off"][i], c["step_off"][i + 1]
+        extra = c["extra"][i]
+        return Recipe(
+            s(c["slug"][i]), s(c["title"][i]), s(c["cuisine"][i]), s(c["cuisine_norm"][i]),
+            c["time_total"][i], c["servings"][i],
+            [s(j) for j in c["ing_ids"][a:b]],
+            [s(j) for j in c["step_ids"][x:y]],
+            json.loads(s(extra)) if extra else None,
+        )
+
+    def buckets(self) -> Dict[str, Sequence[int]]:
+        c = self.cols
+        bucket, off, ids = c["bucket"], c["bucket_off"], c["bucket_ids"]
+        return {self.string(bucket[k]): ids[off[k]:off[k + 1]] for k in range(len(bucket))}
+
+
+# ---- mapped snapshots (nothing decoded up front) ----
+
+class _StringColumn(Sequence[str]):
+    def __init__(self, m: _Mapped, ids: Sequence[int]):
+        self.m, self.ids = m, ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.m.string(k) for k in self.ids[i]]
+        return self.m.string(self.ids[i])
+
+
+class _MappedRecipes(Sequence[Recipe]):
+    def __init__(self, m: _Mapped, keep: bool = False):
+        self.m, self.n = m, m.header["count"]
+        self._kept: Optional[list] = [None] * self.n if keep else None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        if self._kept is None:
+            return self.m.recipe(i)
+        r = self._kept[i]
+        if r is None:
+            r = self._kept[i] = self.m.recipe(i)
+        return r
+
+
+class _Permuted(Sequence[int]):
+    def __init__(self, values: Sequence[int], order: Sequence[int]):
+        self.values, self.order = values, order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, k: int) -> int:
+        return self.values[self.order[k]]
+
+
+class _SortedLookup(Mapping):
+    """Read-only map over a sorted key column: get() is a bisect, not a hash."""
+
+    def __init__(self, keys: Sequence[str], value: Callable[[int], Any]):
+        self._keys, self.value = keys, value
+
+    def _find(self, key: str) -> int:
+        k = bisect_left(self._keys, key)
+        if k < len(self._keys) and self._keys[k] == key:
+            return k
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.value(self._find(key))
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self._find(key)  # type: ignore[arg-type]
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _snapshot(m: _Mapped, keep: bool) -> CatalogSnapshot:
+    c = m.cols
+    recipes = _MappedRecipes(m, keep)
+    order = c["slug_order"]
+    slug_keys = _StringColumn(m, _Permuted(c["slug"], order))
+    by_slug = _SortedLookup(slug_keys, lambda k: recipes[order[k]])
+    post_off, post_ids = c["post_off"], c["post_ids"]
+    postings = _SortedLookup(_StringColumn(m, c["gram"]), lambda k: post_ids[post_off[k]:post_off[k + 1]])
+    index = SearchIndex(recipes, _StringColumn(m, c["text"]), postings)
+    h = m.header
+    return CatalogSnapshot(
+        version=next_version(),
+        recipes=recipes,
+        by_slug=by_slug,
+        by_cuisine=MappingProxyType(m.buckets()),
+        cuisines=tuple(h["cuisines"]),
+        counts=MappingProxyType(h["counts"]),
+        index=index,
+        titles=_StringColumn(m, c["title_lower"]),
+        regions=MappingProxyType({k: tuple(v) for k, v in h.get("regions", {}).items()}),
+    )
+
+
+def open_catalog(path: Path) -> Tuple[Dict[str, Any], CatalogSnapshot]:
+    """
+    (header, snapshot) for a compiled catalog. Only the header is parsed here;
+    each record is decoded on first access and then kept for this process.
+    """
+    m = _Mapped(path)
+    return m.header, _snapshot(m, keep=True)
+
+
+def map_catalog(path: Path) -> CatalogSnapshot:
+    """
+    A snapshot whose records, haystacks, titles, slug map and postings all
+    decode straight from the read-only mapping on every access. Per-process
+    memory stays small and flat no matter how many workers map the same file.
+    """
+    return _snapshot(_Mapped(path), keep=False)
+
+
+def load_or_build(path: Path, sources: Mapping[str, Path], build: Callable[[], CatalogSnapshot],
+                  salt: str = "") -> CatalogSnapshot:
+    """
+    Open the compiled catalog at `path` if it still matches `sources` (and `salt`,
+    which callers use for normalization rules baked into the build); otherwise
+    call `build()` (the JSON path) and rewrite the compiled file for next time.
+    """
+    path = Path(path)
+    try:
+        header, _ = read_header(path)
+        recorded = header.get("sources", {})
+        if header.get("salt") == salt and sources_fresh(recorded, sources):
+            return open_catalog(path)[1]
+        log.info("compiled catalog %s is stale; rebuilding from JSON", path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("ignoring unreadable compiled catalog %s: %s", path, e)
+    snap = build()
+    try:
+        write_catalog(snap, path, sources, salt)
+    except (OSError, ValueError) as e:
+        log.warning("could not write compiled catalog %s: %s", path, e)
+    return snap
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    from . import loader
+
+    p = argparse.ArgumentParser(prog="python -m app.utils.catalog_file")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="compile the JSON catalog into a binary snapshot")
+    b.add_argument("--recipes", type=Path, default=loader.DATA_FILE)
+    b.add_argument("--cuisines", type=Path, default=loader.CUISINES_FILE)
+    b.add_argument("--out", type=Path, default=loader.SNAPSHOT_FILE or Path("data/catalog.snap"))
+    i = sub.add_parser("info", help="print a compiled catalog's header")
+    i.add_argument("path", type=Path)
+    args = p.parse_args(argv)
+
+    if args.cmd == "build":
+        snap = loader.load_catalog(args.recipes, args.cuisines)
+        sources = loader.data_sources(args.recipes, args.cuisines)
+        write_catalog(snap, args.out, sources, loader.normalizer_salt())
+        print(f"wrote {args.out} ({len(snap.recipes)} recipes, {args.out.stat().st_size} bytes)")
+    else:
+        header, _ = read_header(args.path)
+        print(json.dumps({k: v for k, v in header.items() if k != "sections"}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
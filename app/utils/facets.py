@@ -0,0 +1,184 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from .bitmaps import bitmap_ids, keep_ids, to_bitmap
+
+FIELDS = ("region", "cuisine", "time", "servings")
+# (upper bound in minutes, facet value, label); a recipe lands in the first bucket that fits
+TIME_BUCKETS: Tuple[Tuple[Optional[int], str, str], ...] = (
+    (15, "15", "Under 15 min"),
+    (30, "30", "15–30 min"),
+    (60, "60", "30–60 min"),
+    (120, "120", "1–2 hours"),
+    (None, "more", "Over 2 hours"),
+)
+
+Filters = Mapping[str, Sequence[str]]
+
+
+def _time_bucket(minutes: int) -> Optional[str]:
+    if minutes <= 0:
+        return None     # unknown
+    for bound, value, _ in TIME_BUCKETS:
+        if bound is None or minutes <= bound:
+            return value
+    return None
+
+
+class FacetIndex:
+    """
+    Per-value recipe bitmaps (Python ints, bit i = recipe id i) for region,
+    cuisine, time bucket and servings, built once per catalog. Values of one
+    field are OR'ed, fields are AND'ed, and a value's live count is the
+    popcount of its bitmap against everything the *other* fields select, so a
+    filter never hides its own alternatives.
+
+    `region_ids` is the region map from cuisines.json (ids in file order), and
+    `max_time` filters come from recipe ids sorted by time_total.
+    """
+
+    def __init__(self, recipes: Sequence, regions: Mapping[str, Iterable[str]]):
+        n = self.size = len(recipes)
+        self.full = (1 << n) - 1
+        pos = {r.slug: i for i, r in enumerate(recipes)}
+        self.region_ids: Dict[str, Tuple[int, ...]] = {
+            key.strip().lower(): tuple(pos[s] for s in slugs if s in pos) for key, slugs in regions.items()
+        }
+
+        lists: Dict[str, Dict[str, List[int]]] = {f: {} for f in FIELDS}
+        self.labels: Dict[str, Dict[str, str]] = {f: {} for f in FIELDS}
+        for key, ids in self.region_ids.items():
+            lists["region"][key] = sorted(set(ids))
+            self.labels["region"][key] = key.title()
+        self.labels["time"] = {value: label for _, value, label in TIME_BUCKETS}
+        for i, r in enumerate(recipes):
+            if r.cuisine_norm:
+                lists["cuisine"].setdefault(r.cuisine_norm, []).append(i)
+                self.labels["cuisine"].setdefault(r.cuisine_norm, r.cuisine)
+            bucket = _time_bucket(r.time_total)
+            if bucket:
+                lists["time"].setdefault(bucket, []).append(i)
+            if r.servings > 0:
+                lists["servings"].setdefault(str(r.servings), []).append(i)
+                self.labels["servings"].setdefault(str(r.servings), f"Serves {r.servings}")
+
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            f: {v: to_bitmap(ids, n) for v, ids in values.items()} for f, values in lists.items()
+        }
+        timed = sorted((r.time_total, i) for i, r in enumerate(recipes) if r.time_total > 0)
+        self._times = array("i", (t for t, _ in timed))
+        self._by_time = array("I", (i for _, i in timed))
+        self._time_cut: Dict[int, int] = {}     # prefix length of _by_time -> bitmap
+
+    # ---- selecting ----
+
+    def _field(self, field: str, values: Sequence[str]) -> int:
+        bitmaps = self.bitmaps[field]
+        out = 0
+        for v in values:
+            out |= bitmaps.get(v, 0)
+        return out
+
+    def _max_time(self, minutes: int) -> int:
+        # one bitmap per distinct cut point, so arbitrary minute values can't grow this unboundedly
+        k = bisect_right(self._times, minutes)
+        bm = self._time_cut.get(k)
+        if bm is None:
+            bm = self._time_cut[k] = to_bitmap(self._by_time[:k], self.size)
+        return bm
+
+    def select(self, filters: Filters, max_time: Optional[int] = None, within: Optional[int] = None,
+               skip: Optional[str] = None) -> int:
+        """Bitmap of recipes matching every filtered field (except `skip`), optionally inside `within`."""
+        out = self.full if within is None else within
+        for field in FIELDS:
+            values = filters.get(field)
+            if values and field != skip:
+                out &= self._field(field, values)
+        if max_time is not None and skip != "time":
+            out &= self._max_time(max_time)
+        return out
+
+    def counts(self, filters: Filters, max_time: Optional[int] = None,
+               within: Optional[int] = None) -> Dict[str, List[Dict[str, object]]]:
+        """Every facet value with its live count (largest first; time buckets in order)."""
+        out = {}
+        for field in FIELDS:
+            base = self.select(filters, max_time, within, skip=field)
+            chosen = set(filters.get(field) or ())
+            rows = [
+                {"value": v, "label": self.labels[field].get(v, v), "count": (bm & base).bit_count(),
+                 "selected": v in chosen}
+                for v, bm in self.bitmaps[field].items()
+            ]
+            if field == "time":
+                order = [v for _, v, _ in TIME_BUCKETS]
+                rows.sort(key=lambda row: order.index(row["value"]))
+            elif field == "servings":
+                rows.sort(key=lambda row: int(row["value"]))
+            else:
+                rows.sort(key=lambda row: (-row["count"], row["label"]))
+            out[field] = rows
+        return out
+
+    # ---- bitmap <-> ids ----
+
+    def ids(self, bitmap: int) -> Tuple[int, ...]:
+        """Set bits in ascending order (catalog order); O(size / 8 + hits)."""
+        return bitmap_ids(bitmap, self.size)
+
+    def keep(self, ids: Iterable[int], bitmap: int) -> Tuple[int, ...]:
+        """`ids` that are in `bitmap`, order preserved."""
+        return keep_ids(ids, bitmap, self.size)
+
+    def bitmap(self, ids: Iterable[int]) -> int:
+        return to_bitmap(ids, self.size)
+
+
+# ---- query-string helpers (routes) ----
+
+def normalize_filters(region: Iterable[str] = (), cuisine: Iterable[str] = (), time: Iterable[str] = (),
+                      servings: Iterable[str] = ()) -> Dict[str, Tuple[str, ...]]:
+    """Lowercased, deduped, sorted values per field; empty fields dropped (so equal filters share cache keys)."""
+    out = {}
+    for field, values in zip(FIELDS, (region, cuisine, time, servings)):
+        clean = tuple(sorted({" ".join(v.lower().split()) for v in values or () if v and v.strip()}))
+        if clean:
+            out[field] = clean
+    return out
+
+
+def filters_key(filters: Filters, max_time: Optional[int] = None) -> tuple:
+    return tuple(sorted((f, tuple(v)) for f, v in filters.items())), max_time
+
+
+def query_pairs(filters: Filters, max_time: Optional[int] = None) -> List[Tuple[str, str]]:
+    pairs = [(f, v) for f in FIELDS for v in filters.get(f, ())]
+    if max_time is not None:
+        pairs.append(("max_time", str(max_time)))
+    return pairs
+
+
+def with_links(counts: Mapping[str, List[Dict[str, object]]], filters: Filters, max_time: Optional[int] = None,
+               params: Sequence[Tuple[str, str]] = (), single: Sequence[str] = ()) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Copy of `counts` where each row gets an "href" that toggles it (fields in
+    `single` are radio-style: picking a value replaces the current one).
+    `params` are carried along as-is (e.g. the search query).
+    """
+    out = {}
+    for field, rows in counts.items():
+        linked = []
+        for row in rows:
+            current = tuple(filters.get(field, ()))
+            v = row["value"]
+            if row["selected"]:
+                picked = tuple(x for x in current if x != v)
+            else:
+                picked = (v,) if field in single else current + (v,)
+            toggled = {**filters, field: picked}
+            linked.append({**row, "href": "?" + urlencode(list(params) + query_pairs(toggled, max_time))})
+        out[field] = linked
+    return out
@@ -0,0 +1,178 @@
+"""
+Incremental catalog reloads.
+
+A reload parses the recipe file again, diffs it against the live snapshot by
+slug and record content, and patches only the added / changed / removed
+recipes into a copy-on-write fork of the search index. An unchanged file
+keeps the current snapshot (same version, so cached results stay valid).
+
+Patching keeps catalog order: changed recipes stay where they are, removed
+ones are dropped in place (later ids shift down, nobody changes places) and
+new ones are appended, so a reader paging the catalog across a reload picks
+up right after the last recipe it saw (pagination resolves the cursor's slug).
+New recipes sit at the end rather than at their file position until the next
+full build (a restart, or a diff touching more than REBUILD_RATIO of the catalog).
+"""
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .catalog import CatalogSnapshot, build_snapshot
+from .records import Recipe
+
+log = logging.getLogger(__name__)
+
+# past this share of the catalog a patch isn't worth it (and a rebuild restores file order)
+REBUILD_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class CatalogDiff:
+    added: Tuple[str, ...] = ()
+    changed: Tuple[str, ...] = ()
+    removed: Tuple[str, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+
+@dataclass(frozen=True)
+class ReloadReport:
+    mode: str                  # unchanged | patched | rebuilt | shared
+    total: int
+    version: int
+    ms: float
+    diff: CatalogDiff = field(default_factory=CatalogDiff)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "total": self.total,
+            "version": self.version,
+            "added": len(self.diff.added),
+            "changed": len(self.diff.changed),
+            "removed": len(self.diff.removed),
+            "ms": round(self.ms, 2),
+        }
+
+
+def diff_catalog(old: CatalogSnapshot, records: Sequence[Recipe]) -> CatalogDiff:
+    """Slugs added / changed / removed going from `old` to `records` (deduped, normalized)."""
+    by_slug = old.by_slug
+    added: List[str] = []
+    changed: List[str] = []
+    seen = set()
+    for r in records:
+        seen.add(r.slug)
+        cur = by_slug.get(r.slug)
+        if cur is None:
+            added.append(r.slug)
+        elif cur != r:
+            changed.append(r.slug)
+    removed = [r.slug for r in old.recipes if r.slug not in seen]
+    return CatalogDiff(tuple(added), tuple(changed), tuple(removed))
+
+
+def patch_snapshot(old: CatalogSnapshot, records: Sequence[Recipe],
+                   regions: Optional[Mapping[str, Iterable[str]]] = None
+                   ) -> Tuple[Optional[CatalogSnapshot], CatalogDiff, str]:
+    """
+    Snapshot for `records`, built from `old` by applying only the diff.
+    Returns (None, diff, "unchanged") when there is nothing to apply; `old` is never mutated.
+    """
+    diff = diff_catalog(old, records)
+    regions = {k: tuple(v) for k, v in (regions or {}).items()}
+    if not diff and regions == dict(old.regions):
+        return None, diff, "unchanged"
+    # mapped catalogs have no mutable texts to fork; big diffs are cheaper to rebuild
+    if not isinstance(old.index.texts, list) or len(diff) > REBUILD_RATIO * max(len(old.recipes), 1):
+        return build_snapshot(records, regions=regions), diff, "rebuilt"
+
+    new = {r.slug: r for r in records}
+    recipes = list(old.recipes)
+    slot = {r.slug: i for i, r in enumerate(recipes)}
+    index = old.index.fork()
+    for slug in diff.changed:
+        i = slot[slug]
+        index.replace(i, new[slug])
+        recipes[i] = new[slug]
+    if diff.removed:
+        gone = {slot[s] for s in diff.removed}
+        index.remove(gone)
+        recipes = [r for i, r in enumerate(recipes) if i not in gone]
+    for slug in diff.added:
+        index.add(new[slug])
+        recipes.append(new[slug])
+    snap = build_snapshot(recipes, index=index, regions=regions)
+    if old.similar_ready:
+        # cached_property slot: hand over patched neighbour lists instead of rescoring all pairs
+        vars(snap)["similar"] = old.similar.patched(old.recipes, snap.recipes, diff.changed, diff.removed)
+    return snap, diff, "patched"
+
+
+# ---- watching ----
+
+class CatalogWatcher:
+    """
+    Polls the data files' size/mtime from a daemon thread and calls `on_change`
+    once a new stamp has held still for one interval (editors write in bursts).
+    A failing `on_change` (say, a half-saved file) is retried on the next tick.
+    """
+
+    def __init__(self, paths: Iterable[Path], on_change: Callable[[], object], interval: float = 2.0):
+        self.paths = [Path(p) for p in paths]
+        self.on_change = on_change
+        self.interval = interval
+        self._last = self._stamp()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stamp(self) -> tuple:
+        out = []
+        for p in self.paths:
+            try:
+                if p.is_dir():
+                    # shard directory: a file edited, added or removed all change the stamp
+                    out.append(tuple(sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                                            for e in os.scandir(p) if e.is_file() and not e.name.startswith("."))))
+                else:
+                    st = os.stat(p)
+                    out.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                out.append(None)
+        return tuple(out)
+
+    def check(self) -> bool:
+        """One poll; True if `on_change` ran."""
+        stamp = self._stamp()
+        if stamp == self._last:
+            self._pending = None
+            return False
+        if stamp != self._pending:
+            self._pending = stamp   # let the write settle for one more tick
+            return False
+        self.on_change()
+        self._last, self._pending = stamp, None
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                log.exception("catalog reload failed; will retry")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
@@ -1,9 +1,34 @@
+import hashlib
 import json
+import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
-from collections import Counter
+from typing import Dict, List, Mapping, Optional, Sequence
 
-DATA_FILE = Path("data/seed_recipes.json")
+from .cache import clear_all as _clear_caches
+from .catalog import CatalogBuilder, CatalogSnapshot, build_snapshot
+from .catalog_file import load_or_build, write_catalog
+from .metrics import CATALOG_RECIPES, RELOAD_SECONDS, RELOADS
+from .hot_reload import REBUILD_RATIO, CatalogDiff, CatalogWatcher, ReloadReport, diff_catalog, patch_snapshot
+from .shared_catalog import SharedCatalog
+from .similar import SIMILAR_SYNC_MAX
+from .records import Recipe
+from .shards import ShardedCatalog, ShardLoad, shard_files
+from .stream import iter_recipes
+
+log = logging.getLogger(__name__)
+
+# one recipe file, or a directory of shard files merged by name (see utils/shards.py)
+DATA_FILE = Path(os.getenv("DISHCOVERY_DATA", "data/seed_recipes.json"))
+CUISINES_FILE = Path("data/cuisines.json")
+# compiled binary catalog (see utils/catalog_file.py); unset = parse the JSON on every load
+SNAPSHOT_FILE: Optional[Path] = Path(os.environ["DISHCOVERY_SNAPSHOT"]) if os.getenv("DISHCOVERY_SNAPSHOT") else None
+# directory of mmap-shared catalog generations (see utils/shared_catalog.py); wins over SNAPSHOT_FILE
+SHARED_DIR: Optional[Path] = Path(os.environ["DISHCOVERY_SHARED_CATALOG"]) if os.getenv("DISHCOVERY_SHARED_CATALOG") else None
+# seconds between data-file checks (utils/hot_reload.py); 0 turns the watcher off
+WATCH_INTERVAL = float(os.getenv("DISHCOVERY_WATCH_INTERVAL", "2"))
 
 # 🔥 one source of truth: region per slug (works even if JSON isn't updated)
 REGION_BY_SLUG: Dict[str, str] = {
@@ -28,77 +53,274 @@ REGION_BY_SLUG: Dict[str, str] = {
     "bhutte-ka-kees":"Central Indian","indian-thali":"Pan-Indian",
 }
 
-RECIPES_LIST: List[dict] = []
-RECIPES: Dict[str, dict] = {}
+_SNAPSHOT: CatalogSnapshot = build_snapshot([])
+_RELOAD_LOCK = threading.Lock()
+_SHARED: Optional[SharedCatalog] = None
+_WATCHER: Optional[CatalogWatcher] = None
+_LAST_RELOAD: Optional[ReloadReport] = None
+_SHARDS: Optional[ShardedCatalog] = None
+_LOADED = False     # initial_load() has run
+_LAST_SHARDS: Optional[ShardLoad] = None
+
+# legacy aliases, rebound on every swap; import get_snapshot() instead of these
+RECIPES_LIST: Sequence[Recipe] = _SNAPSHOT.recipes
+RECIPES: Mapping[str, Recipe] = _SNAPSHOT.by_slug
+
+def _normalize_one(r) -> Optional[Recipe]:
+    if not isinstance(r, dict):
+        return None
+    slug = (r.get("slug") or "").strip()
+    if not slug:
+        return None
+    # apply region override if present
+    cuisine = REGION_BY_SLUG.get(slug) or r.get("cuisine") or ""
+    # keep a normalized cuisine for matching
+    return Recipe.from_dict(r, slug=slug, cuisine=cuisine, cuisine_norm=cuisine.strip().lower())
 
-def _normalize_list(data) -> List[dict]:
+def _dedupe(raw) -> List[Recipe]:
+    # last record wins, first position kept (same as CatalogBuilder)
+    uniq: Dict[str, Recipe] = {}
+    for r in raw:
+        r = _normalize_one(r)
+        if r is not None:
+            uniq[r["slug"]] = r
+    return list(uniq.values())
+
+def _normalize_list(data) -> List[Recipe]:
     # allow {"recipes":[...]} or [...]
     if isinstance(data, dict) and "recipes" in data:
         data = data["recipes"]
     if not isinstance(data, list):
         raise ValueError("seed_recipes.json must be a JSON array or an object with a 'recipes' array")
-    uniq: Dict[str, dict] = {}
-    for r in data:
-        if not isinstance(r, dict):
-            continue
-        slug = (r.get("slug") or "").strip()
-        if not slug:
-            continue
-        # apply region override if present
-        region = REGION_BY_SLUG.get(slug)
-        if region:
-            r["cuisine"] = region
-        # store a normalized copy for matching
-        r["slug"] = slug
-        r["cuisine_norm"] = (r.get("cuisine") or "").strip().lower()
-        uniq[slug] = r
-    return list(uniq.values())
+    return _dedupe(data)
+
+def _load_regions(path: Optional[Path]) -> Dict[str, List[str]]:
+    if path is None or not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("dishes_by_region", {})
+
+def _read_shards(directory: Path) -> List[Recipe]:
+    """Validated, merged records of a shard directory; re-parses only shards that changed."""
+    global _SHARDS, _LAST_SHARDS
+    if _SHARDS is None or _SHARDS.directory != Path(directory):
+        _SHARDS = ShardedCatalog(directory, REGION_BY_SLUG)
+    result = _SHARDS.load()
+    _LAST_SHARDS = result
+    for slug, kept, dropped in result.conflicts:
+        log.debug("slug %s in %s replaces the one in %s", slug, kept, dropped)
+    invalid = sum(s.invalid for s in result.shards)
+    log.info("loaded %d recipes from %d shards in %.0f ms (%d invalid, %d slug conflicts)",
+             len(result.records), len(result.shards), result.ms, invalid, len(result.conflicts))
+    return result.records
+
+def _read_records(path: Path) -> List[Recipe]:
+    return _read_shards(path) if Path(path).is_dir() else _dedupe(iter_recipes(path))
+
+def load_catalog(path: Path, cuisines_path: Optional[Path] = CUISINES_FILE) -> CatalogSnapshot:
+    """
+    Stream + normalize a recipe file (JSON array, {"recipes": [...]} or NDJSON)
+    into a snapshot; a directory is loaded as shards (validated, in parallel).
+    """
+    if Path(path).is_dir():
+        return build_snapshot(_read_shards(path), regions=_load_regions(cuisines_path))
+    builder = CatalogBuilder()
+    for raw in iter_recipes(path):
+        r = _normalize_one(raw)
+        if r is not None:
+            builder.add(r)
+    return builder.build(regions=_load_regions(cuisines_path))
+
+def normalizer_salt() -> str:
+    """Changes whenever normalization rules baked into a compiled catalog change."""
+    return hashlib.sha256(json.dumps(REGION_BY_SLUG, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def _install(snapshot: CatalogSnapshot, indexes: bool = True) -> None:
+    global _SNAPSHOT, RECIPES_LIST, RECIPES
+    _SNAPSHOT = snapshot
+    RECIPES_LIST, RECIPES = snapshot.recipes, snapshot.by_slug
+    CATALOG_RECIPES.set(len(snapshot.recipes))
+    if indexes:
+        build_indexes(snapshot)
+    # keys carry the version, so this only frees memory held by the old catalog
+    _clear_caches()
+
+def build_indexes(snapshot: CatalogSnapshot) -> None:
+    """Facets and typeahead now, not on the first request that needs them; similar recipes maybe later."""
+    snapshot.facets
+    snapshot.suggester
+    _score_similar(snapshot)
 
-def _refresh() -> None:
-    global RECIPES_LIST, RECIPES
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-    RECIPES_LIST = _normalize_list(raw)
-    RECIPES = {r["slug"]: r for r in RECIPES_LIST}
+# similar recipes for big catalogs: one scorer thread, and the newest snapshot wins
+_SIMILAR_LOCK = threading.Lock()
+_SIMILAR_WANTED = threading.Event()
+_SIMILAR_NEXT: Optional[CatalogSnapshot] = None      # waiting to be scored (a newer one replaces it)
+_SIMILAR_THREAD: Optional[threading.Thread] = None
+# newest snapshot whose neighbour lists are built; later ones are patched from it
+_LAST_SIMILAR: Optional[CatalogSnapshot] = None
+
+def _score_similar(snapshot: CatalogSnapshot) -> None:
+    """All-pairs "more like this" scoring: inline for small catalogs, on the scorer thread otherwise."""
+    global _LAST_SIMILAR, _SIMILAR_NEXT, _SIMILAR_THREAD
+    if snapshot.similar_ready:
+        _LAST_SIMILAR = snapshot    # carried over by a hot-reload patch
+        return
+    if len(snapshot.recipes) <= SIMILAR_SYNC_MAX:
+        snapshot.similar
+        _LAST_SIMILAR = snapshot
+        return
+    with _SIMILAR_LOCK:
+        _SIMILAR_NEXT = snapshot
+        if _SIMILAR_THREAD is None:
+            _SIMILAR_THREAD = threading.Thread(target=_similar_worker, name="dishcovery-similar", daemon=True)
+            _SIMILAR_THREAD.start()
+    _SIMILAR_WANTED.set()
+
+def _similar_worker() -> None:
+    global _SIMILAR_NEXT
+    while True:
+        _SIMILAR_WANTED.wait()
+        with _SIMILAR_LOCK:
+            snapshot, _SIMILAR_NEXT = _SIMILAR_NEXT, None
+            _SIMILAR_WANTED.clear()
+        if snapshot is None or snapshot is not _SNAPSHOT:
+            continue    # superseded while it waited
+        try:
+            _build_similar(snapshot)
+        except Exception:
+            log.exception("scoring similar recipes failed")
+
+def _build_similar(snapshot: CatalogSnapshot) -> None:
+    """Patch the newest finished neighbour lists when the catalogs differ little; score all pairs otherwise."""
+    global _LAST_SIMILAR
+    start, how = time.perf_counter(), "scored"
+    last = _LAST_SIMILAR
+    if last is not None and last is not snapshot:
+        diff = diff_catalog(last, snapshot.recipes)
+        if len(diff) <= REBUILD_RATIO * max(len(last.recipes), 1):
+            # cached_property slot, as in hot_reload.patch_snapshot
+            vars(snapshot)["similar"] = last.similar.patched(last.recipes, snapshot.recipes, diff.changed, diff.removed)
+            how = "patched"
+    snapshot.similar
+    _LAST_SIMILAR = snapshot
+    log.info("similar recipes for %d recipes %s in %.1f s", len(snapshot.recipes), how, time.perf_counter() - start)
+
+def data_sources(recipes: Path, cuisines: Optional[Path]) -> Dict[str, Path]:
+    """Source files a compiled catalog is checked against: the recipe file, or each shard as recipes/<name>."""
+    recipes = Path(recipes)
+    if recipes.is_dir():
+        shards = {f"recipes/{p.name}": p for p in shard_files(recipes)}
+        return {**shards, "cuisines": cuisines}
+    return {"recipes": recipes, "cuisines": cuisines}
+
+def _sources() -> Dict[str, Path]:
+    return data_sources(DATA_FILE, CUISINES_FILE)
+
+def _build() -> CatalogSnapshot:
+    return load_catalog(DATA_FILE)
+
+def initial_load(indexes: bool = True) -> CatalogSnapshot:
+    """
+    First catalog load; called by the app's startup pipeline (utils/startup.py),
+    not at import. With indexes=False the caller runs build_indexes() itself
+    (to time it as its own phase).
+    """
+    global _SHARED, _LOADED
+    with _RELOAD_LOCK, RELOAD_SECONDS.time("initial"):
+        if SHARED_DIR is not None:
+            # map the live generation (building it only if nobody has)
+            _SHARED = SharedCatalog(SHARED_DIR, _sources(), _build, normalizer_salt())
+            _install(_SHARED.open(), indexes)
+        elif SNAPSHOT_FILE is not None:
+            _install(load_or_build(SNAPSHOT_FILE, _sources(), _build, normalizer_salt()), indexes)
+        else:
+            _install(_build(), indexes)
+        _LOADED = True
+    return _SNAPSHOT
+
+def is_loaded() -> bool:
+    return _LOADED
+
+def reload_catalog() -> ReloadReport:
+    """
+    Re-read the data files and apply only what changed (see utils/hot_reload.py).
+    An unchanged file keeps the current snapshot and its cached results. In shared
+    mode the first worker to notice publishes a generation and the rest map it.
+    """
+    global _LAST_RELOAD
+    start = time.perf_counter()
+    with _RELOAD_LOCK:
+        if _SHARED is not None:
+            _SHARED.sources = _sources()    # shards may have come or gone
+            snap = _SHARED.refresh()
+            diff, mode = CatalogDiff(), "shared" if snap is not None else "unchanged"
+        else:
+            snap, diff, mode = patch_snapshot(_SNAPSHOT, _read_records(DATA_FILE), _load_regions(CUISINES_FILE))
+            if snap is not None and SNAPSHOT_FILE is not None:
+                try:
+                    write_catalog(snap, SNAPSHOT_FILE, _sources(), normalizer_salt())
+                except (OSError, ValueError) as e:
+                    log.warning("could not rewrite compiled catalog %s: %s", SNAPSHOT_FILE, e)
+        if snap is not None:
+            _install(snap)
+        report = ReloadReport(mode, len(_SNAPSHOT.recipes), _SNAPSHOT.version,
+                              (time.perf_counter() - start) * 1000, diff)
+    _LAST_RELOAD = report
+    RELOADS.inc(report.mode)
+    RELOAD_SECONDS.observe(report.ms / 1000, report.mode)
+    log.info("catalog reload: %s", report.as_dict())
+    return report
 
 def reload_data() -> int:
-    _refresh()
-    return len(RECIPES_LIST)
+    return reload_catalog().total
+
+def last_reload() -> Optional[ReloadReport]:
+    return _LAST_RELOAD
+
+def last_shard_load() -> Optional[ShardLoad]:
+    """Per-shard report of the last directory load (None when DATA_FILE is a single file)."""
+    return _LAST_SHARDS
 
-# initial load
-_refresh()
+def start_watcher(interval: float = WATCH_INTERVAL) -> Optional[CatalogWatcher]:
+    """Reload automatically when the data files change (no-op if interval <= 0)."""
+    global _WATCHER
+    if _WATCHER is None and interval > 0:
+        _WATCHER = CatalogWatcher([DATA_FILE, CUISINES_FILE], reload_catalog, interval)
+        _WATCHER.start()
+    return _WATCHER
 
-def _dedupe(items: List[dict]) -> List[dict]:
-    return list({r["slug"]: r for r in items}.values())
+def stop_watcher() -> None:
+    global _WATCHER
+    if _WATCHER is not None:
+        _WATCHER.stop()
+        _WATCHER = None
 
-def get_all_recipes() -> List[dict]:
-    return RECIPES_LIST
+def get_snapshot() -> CatalogSnapshot:
+    """Current catalog; hold on to the returned object for the whole request."""
+    if _SHARED is not None:
+        newer = _SHARED.poll()
+        if newer is not None:
+            _install(newer)
+    return _SNAPSHOT
 
-def get_recipes_by_cuisine(cuisine: str) -> List[dict]:
+def get_all_recipes() -> Sequence[Recipe]:
+    return get_snapshot().recipes
+
+def get_recipe(slug: str) -> Optional[Recipe]:
+    return get_snapshot().recipe(slug)
+
+def get_recipes_by_cuisine(cuisine: str) -> Sequence[Recipe]:
     """Exact match first (case/space-insensitive), then partial contains as fallback."""
-    c = (cuisine or "").strip().lower()
-    exact = [r for r in RECIPES_LIST if r.get("cuisine_norm","") == c]
-    if exact:
-        return _dedupe(exact)
-    # partial contains (so 'north' or 'indian' still returns stuff)
-    part = [r for r in RECIPES_LIST if c and c in r.get("cuisine_norm","")]
-    return _dedupe(part)
+    return get_snapshot().in_cuisine(cuisine)
 
 def get_all_cuisines() -> List[str]:
-    return sorted({r.get("cuisine","") for r in RECIPES_LIST if r.get("cuisine")})
-
-def basic_search(q: str, cuisine: Optional[str] = None) -> List[dict]:
-    ql = (q or "").lower().strip()
-    pool = get_recipes_by_cuisine(cuisine) if cuisine else RECIPES_LIST
-    if not ql:
-        return pool
-    hits = []
-    for r in pool:
-        hay = " ".join([r.get("title",""), r.get("cuisine","")] + r.get("ingredients", [])).lower()
-        if ql in hay:
-            hits.append(r)
-    return _dedupe(hits)
+    return list(get_snapshot().cuisines)
+
+def basic_search(q: str, cuisine: Optional[str] = None) -> List[Recipe]:
+    """Substring match over title + cuisine + ingredients, answered from the search index."""
+    snap = get_snapshot()
+    return snap.take(snap.search(q, cuisine))
 
 # handy stats (used by /recipes/__stats)
 def cuisine_counts() -> Dict[str, int]:
-    return dict(Counter([r.get("cuisine","") for r in RECIPES_LIST]))
+    return dict(get_snapshot().counts)
@@ -0,0 +1,206 @@
+"""
+Tiny in-process metrics registry with Prometheus text exposition.
+
+Recording is a dict lookup plus an add under a per-metric lock (histograms
+also bisect into their buckets); nothing is formatted until /metrics is
+scraped, so an unscraped app pays next to nothing. Per-process, like every
+other cache here: with several workers, scrape each one.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000)
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labels, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        k = bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(labels)
+            if v is None:
+                v = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            v[0][k] += 1
+            v[1] += value
+            v[2] += 1
+
+    def count(self, *labels: str) -> int:
+        v = self._values.get(labels)
+        return v[2] if v else 0
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        out = self._header()
+        for k, (counts, total, n) in items:
+            running = 0
+            for le, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                bound = 'le="' + _fmt(le) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labels, k, bound)} {running}")
+            out.append(f"{self.name}_sum{_labels(self.labels, k)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.labels, k)} {n}")
+        return out
+
+
+REGISTRY: List[_Metric] = []
+# callbacks that return already-formatted lines at scrape time (e.g. cache counters)
+COLLECTORS: List[Callable[[], Iterable[str]]] = []
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    for collect in COLLECTORS:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+# ---- the app's metrics ----
+HTTP_REQUESTS = Counter("dishcovery_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("dishcovery_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+# by method only: the route isn't known until the router has dispatched
+HTTP_IN_FLIGHT = Gauge("dishcovery_http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+
+RELOADS = Counter("dishcovery_catalog_reloads_total", "Catalog loads/reloads by outcome.", ("mode",))
+RELOAD_SECONDS = Histogram("dishcovery_catalog_reload_seconds", "Catalog load/reload duration.", ("mode",))
+CATALOG_RECIPES = Gauge("dishcovery_catalog_recipes", "Recipes in the live catalog.")
+
+SEARCH_CANDIDATES = Histogram("dishcovery_search_candidates", "Index hits per search before ranking.",
+                              buckets=SIZE_BUCKETS)
+SEARCH_RESULTS = Histogram("dishcovery_search_results", "Results per search after ranking.", buckets=SIZE_BUCKETS)
+FUZZY_SECONDS = Histogram("dishcovery_fuzzy_rank_seconds", "rapidfuzz ranking time per search.")
+RENDER_SECONDS = Histogram("dishcovery_template_render_seconds", "Jinja render time by template.", ("template",))
+
+
+# ---- ASGI middleware ----
+
+class MetricsMiddleware:
+    """
+    Pure ASGI (BaseHTTPMiddleware would buffer streaming responses). Finished
+    requests are labelled by route template ("/recipes/{slug}"), never the raw
+    path, so label cardinality stays bounded; anything the router didn't match is
+    "unmatched". The in-flight gauge is per method only.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: Dict[object, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._paths.get(endpoint)
+        if path is None:
+            router = scope.get("router")
+            for r in getattr(router, "routes", ()):
+                self._paths[getattr(r, "endpoint", None) or r.app] = r.path
+            path = self._paths.get(endpoint, "unmatched")
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        HTTP_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method)
+            route = self._route(scope)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status))
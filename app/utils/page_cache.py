@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .cache import LRUCache
+
+# rendered HTML per (route, arg, catalog version); the version in the key retires
+# old pages on reload, so no TTL. Sizes/headers from the environment.
+PAGE_CACHE_SIZE = int(os.getenv("DISHCOVERY_PAGE_CACHE_SIZE", "512"))
+PAGE_MAX_AGE = int(os.getenv("DISHCOVERY_PAGE_MAX_AGE", "60"))
+PAGE_GZIP = os.getenv("DISHCOVERY_PAGE_GZIP", "1") not in ("0", "false", "no")
+GZIP_MIN_BYTES = 1024
+
+PAGES = LRUCache("pages", maxsize=PAGE_CACHE_SIZE, register=True)
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    body: bytes
+    etag: str                       # strong, from the content (same in every worker)
+    gzipped: Optional[bytes] = None
+
+    @property
+    def gzip_etag(self) -> str:
+        # a different representation needs its own strong tag
+        return self.etag[:-1] + '-gz"'
+
+
+def render_page(html: str) -> RenderedPage:
+    body = html.encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    gz = gzip.compress(body, 6, mtime=0) if PAGE_GZIP and len(body) >= GZIP_MIN_BYTES else None
+    return RenderedPage(body, etag, gz)
+
+
+def cached_page(key: Hashable, render: Callable[[], str]) -> RenderedPage:
+    """Rendered page for `key` (which must include the catalog version); renders on a miss."""
+    return PAGES.get_or_set(key, lambda: render_page(render()))
+
+
+def _not_modified(request: Request, *etags: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return "*" in tags or any(e in tags for e in etags)
+
+
+def page_response(request: Request, page: RenderedPage, max_age: int = PAGE_MAX_AGE) -> Response:
+    """200 (gzipped when the client accepts it) or 304 if the client's ETag still matches."""
+    use_gzip = page.gzipped is not None and "gzip" in request.headers.get("accept-encoding", "")
+    etag = page.gzip_etag if use_gzip else page.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, page.etag, page.gzip_etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(page.gzipped, media_type="text/html", headers=headers)
+    return Response(page.body, media_type="text/html", headers=headers)
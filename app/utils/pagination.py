@@ -0,0 +1,80 @@
+import base64
+import json
+from bisect import bisect_left
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .catalog import CatalogSnapshot
+from .records import Recipe
+
+PAGE_SIZE = 48
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+# ---- in-memory catalog (keyset on recipe id, i.e. catalog position) ----
+
+def _resume_id(snap: CatalogSnapshot, cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    values = decode_cursor(cursor)
+    if len(values) != 2 or not isinstance(values[0], int) or values[0] < 0:
+        raise ValueError("invalid cursor")
+    i, slug = values
+    if i < len(snap.recipes) and snap.recipes[i].slug == slug:
+        return i + 1
+    # the catalog was reloaded under the reader (removals shift later ids down):
+    # carry on after the same recipe, or from its old position if it was removed
+    j = snap.positions.get(slug) if isinstance(slug, str) else None
+    return j + 1 if j is not None else min(i, len(snap.recipes))
+
+
+def catalog_page(snap: CatalogSnapshot, ids: Optional[Sequence[int]], cursor: Optional[str],
+                 limit: int = PAGE_SIZE) -> Tuple[List[Recipe], Optional[str], int]:
+    """
+    One page of `ids` (ascending; None = whole catalog) after `cursor`.
+    Returns (recipes, next cursor or None, resume id); cost is O(log n + limit).
+    """
+    start = _resume_id(snap, cursor)
+    if ids is None:
+        page = range(start, min(start + limit, len(snap.recipes)))
+        more = start + limit < len(snap.recipes)
+    else:
+        k = bisect_left(ids, start)
+        page = ids[k:k + limit]
+        more = k + limit < len(ids)
+    recipes = snap.take(page)
+    nxt = encode_cursor(page[-1], recipes[-1].slug) if more and recipes else None
+    return recipes, nxt, start
+
+
+# ---- ranked lists (search results): position in the cached ranking ----
+
+def decode_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+        raise ValueError("invalid cursor")
+    return values[0]
+
+
+def offset_page(items: Sequence[Any], cursor: Optional[str], limit: int = PAGE_SIZE) -> Tuple[Sequence[Any], Optional[str]]:
+    offset = decode_offset(cursor)
+    end = offset + limit
+    return items[offset:end], (encode_cursor(end) if end < len(items) else None)
@@ -0,0 +1,239 @@
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from .bitmaps import iter_bits, to_bitmap
+
+# ---- Ingredient normalization ----
+# "2 onions (sliced)" -> "onion", "2 tbsp oil or ghee" -> "oil ghee",
+# "Dal tadka (toor dal, turmeric, ghee)" -> "dal tadka toor turmeric ghee"
+_PARENS = re.compile(r"\(([^)]*)\)")
+_WORD = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+UNITS = {
+    "g", "gm", "gms", "gram", "grams", "kg", "ml", "l", "litre", "liter", "cup", "cups",
+    "tbsp", "tsp", "tablespoon", "tablespoons", "teaspoon", "teaspoons", "pinch",
+    "handful", "piece", "pieces", "pcs", "clove", "cloves", "inch", "sprig", "sprigs",
+    "bunch", "can", "pack", "packet", "slice", "slices", "dash", "drop", "drops",
+}
+FILLER = {
+    "a", "an", "and", "or", "of", "to", "for", "as", "per", "needed", "taste", "optional",
+    "fresh", "freshly", "some", "few", "little", "more", "about", "approx", "whole",
+    "chopped", "sliced", "diced", "minced", "grated", "finely", "roughly", "small",
+    "medium", "large", "big",
+}
+# -ves plurals that don't just drop the "s" (olives, chives and cloves do)
+_VES_F = ("eaves", "oaves", "alves", "elves", "arves")      # leaves, loaves, halves, shelves, scarves
+_IRREGULAR = {"knives": "knife", "wives": "wife"}
+
+
+def _singular(w: str) -> str:
+    if len(w) <= 3 or w.endswith("ss"):
+        return w
+    if w in _IRREGULAR:
+        return _IRREGULAR[w]
+    if w.endswith("ies"):
+        # chilies/chillies -> chili/chilli; curries -> curry
+        return w[:-2] if w[:-2].endswith("li") else w[:-3] + "y"
+    if w.endswith(_VES_F):
+        return w[:-3] + "f"
+    if w.endswith("oes"):
+        return w[:-2]
+    if w.endswith("s"):
+        return w[:-1]
+    return w
+
+
+def _parens(m: "re.Match") -> str:
+    # "(sliced)" is a note; "(toor dal, turmeric, ghee)" is what's in it
+    inner = m.group(1)
+    return f" {inner} " if "," in inner else " "
+
+
+def _kept_words(line: str) -> List[Tuple[str, str]]:
+    """(word as written, singular) for each word that names the ingredient."""
+    text = _PARENS.sub(_parens, (line or "").lower())
+    out: List[Tuple[str, str]] = []
+    seen = set()
+    for w in _WORD.findall(text):
+        if w in UNITS or w in FILLER:
+            continue
+        s = _singular(w)
+        if s not in seen:
+            seen.add(s)
+            out.append((w, s))
+    return out
+
+
+def ingredient_words(line: str) -> Tuple[str, ...]:
+    return tuple(s for _, s in _kept_words(line))
+
+
+def normalize_ingredient(line: str) -> str:
+    return " ".join(ingredient_words(line))
+
+
+def ingredient_spellings(line: str) -> Tuple[str, str]:
+    """(normalize_ingredient(line), the same words as the line spells them): ("curry leaf", "curry leaves")."""
+    kept = _kept_words(line)
+    return " ".join(s for _, s in kept), " ".join(w for w, _ in kept)
+
+
+# ---- Bit-sliced counters ----
+# Recipes are bit positions. planes[j] holds bit j of every recipe's counter, so
+# adding a 0/1 bitmap to all counters at once is a ripple-carry over a few ints.
+
+def _add(planes: List[int], bitmap: int) -> None:
+    carry = bitmap
+    for j in range(len(planes)):
+        if not carry:
+            return
+        planes[j], carry = planes[j] ^ carry, planes[j] & carry
+    if carry:
+        planes.append(carry)
+
+
+def _equals(planes: List[int], value: int, full: int) -> int:
+    if value >> len(planes):
+        return 0
+    out = full
+    for j, plane in enumerate(planes):
+        out &= plane if (value >> j) & 1 else ~plane
+    return out & full
+
+
+@dataclass(frozen=True)
+class PantryMatch:
+    id: int                      # recipe id in the snapshot
+    covered: int
+    need: int
+    missing: Tuple[str, ...]     # original ingredient lines not covered
+    substitutes: Tuple[Tuple[str, str], ...] = ()   # (missing line, pantry item that can replace it)
+
+    @property
+    def coverage(self) -> float:
+        return self.covered / self.need if self.need else 0.0
+
+
+class PantryIndex:
+    """
+    Interned ingredient vocabulary plus per-recipe ingredient-id sets, built once
+    per catalog. Each vocabulary entry's recipe list is a bitmap (an int) when it
+    is dense and a sorted id array otherwise; ranking a pantry adds those into
+    bit-sliced per-recipe counters, so the cost tracks the pantry, not recipes x lines.
+    """
+
+    def __init__(self, recipes: Sequence, subs=None):
+        self.recipes = recipes
+        self.subs = subs
+        n = self.size = len(recipes)
+        self.full = (1 << n) - 1
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.by_word: Dict[str, Set[int]] = {}
+        self.lines: List[Tuple[int, ...]] = []      # per recipe, per ingredient line (-1 = nothing to match)
+        postings: List[List[int]] = []
+        need_lists: Dict[int, List[int]] = {}
+        by_line: Dict[str, int] = {}    # catalogs repeat lines ("Salt") a lot; normalize each once
+        for rid, r in enumerate(recipes):
+            line_ids = []
+            for line in r.get("ingredients", []):
+                v = by_line.get(line)
+                if v is None:
+                    v = by_line[line] = self._intern(line, postings)
+                line_ids.append(v)
+            line_ids = tuple(line_ids)
+            self.lines.append(line_ids)
+            distinct = {v for v in line_ids if v >= 0}
+            for v in distinct:
+                postings[v].append(rid)
+            need_lists.setdefault(len(distinct), []).append(rid)
+        self.need = {k: to_bitmap(v, n) for k, v in need_lists.items() if k}
+        self.recipe_ids: List[object] = [
+            to_bitmap(p, n) if len(p) * 32 >= n else array("I", p) for p in postings
+        ]
+        # per vocabulary entry: substitution-graph nodes that can stand in for it (see utils/substitutions.py)
+        self.alternatives: List[int] = [subs.alternatives(name) for name in self.names] if subs else []
+
+    def _intern(self, line: str, postings: List[List[int]]) -> int:
+        words = ingredient_words(line)
+        if not words:
+            return -1
+        name = " ".join(words)
+        v = self.ids.get(name)
+        if v is None:
+            v = self.ids[name] = len(self.names)
+            self.names.append(name)
+            postings.append([])
+            for w in words:
+                self.by_word.setdefault(w, set()).add(v)
+        return v
+
+    def resolve(self, pantry: Iterable[str]) -> Set[int]:
+        """Vocabulary ids covered by the pantry: every word of an item must appear in the ingredient."""
+        have: Set[int] = set()
+        for item in pantry:
+            sets = [self.by_word.get(w) for w in ingredient_words(item)]
+            if sets and all(sets):
+                have |= set.intersection(*sorted(sets, key=len))
+        return have
+
+    def rank(self, pantry: Iterable[str], limit: int = 20) -> List[PantryMatch]:
+        """
+        Top `limit` recipes using at least one pantry item: fewest missing, then best
+        coverage. Missing lines the pantry can cover by substitution are listed too
+        (they don't change the ranking).
+        """
+        pantry = list(pantry)
+        have = self.resolve(pantry)
+        if not have or not self.need:
+            return []
+        planes: List[int] = []
+        sparse: Dict[int, int] = {}
+        for v in have:
+            ids = self.recipe_ids[v]
+            if isinstance(ids, int):
+                _add(planes, ids)
+            else:
+                for rid in ids:
+                    sparse[rid] = sparse.get(rid, 0) + 1
+        # fold sparse hits in one layer at a time (layer k = recipes with >= k sparse hits)
+        layer = list(sparse)
+        while layer:
+            _add(planes, to_bitmap(layer, self.size))
+            for rid in layer:
+                sparse[rid] -= 1
+            layer = [rid for rid in layer if sparse[rid]]
+
+        out: List[PantryMatch] = []
+        eq_cache: Dict[int, int] = {}
+        needs = sorted(self.need, reverse=True)
+        for missing in range(max(needs)):
+            for need in needs:
+                covered = need - missing
+                if covered < 1:
+                    continue
+                if covered not in eq_cache:
+                    eq_cache[covered] = _equals(planes, covered, self.full)
+                for rid in iter_bits(self.need[need] & eq_cache[covered]):
+                    out.append(PantryMatch(rid, covered, need, ()))
+                    if len(out) >= limit:
+                        return self._with_missing(out, have, pantry)
+        return self._with_missing(out, have, pantry)
+
+    def _with_missing(self, matches: List[PantryMatch], have: Set[int], pantry: Sequence[str]) -> List[PantryMatch]:
+        on_hand = self.subs.pantry_bitmap(pantry) if self.subs is not None and self.alternatives else 0
+        out = []
+        for m in matches:
+            missing = self._missing_lines(m.id, have)
+            subs = tuple(
+                (line, self.subs.names[next(iter_bits(hit))])
+                for line, v in missing if on_hand and (hit := self.alternatives[v] & on_hand)
+            )
+            out.append(PantryMatch(m.id, m.covered, m.need, tuple(line for line, _ in missing), subs))
+        return out
+
+    def _missing_lines(self, rid: int, have: Set[int]) -> List[Tuple[str, int]]:
+        lines = self.recipes[rid].get("ingredients", [])
+        return [(lines[i], v) for i, v in enumerate(self.lines[rid]) if v >= 0 and v not in have]
@@ -0,0 +1,71 @@
+import heapq
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from .catalog import CatalogSnapshot
+
+try:
+    from rapidfuzz import fuzz, process
+    HAVE_FUZZ = True
+except Exception:
+    HAVE_FUZZ = False
+
+try:
+    import numpy as np  # process.cdist hands back a numpy matrix
+    HAVE_NUMPY = True
+except Exception:
+    HAVE_NUMPY = False
+
+SCORE_CUTOFF = 55
+# spinning up rapidfuzz worker threads only pays off on big pools
+PARALLEL_MIN_POOL = 5000
+WORKERS = int(os.getenv("DISHCOVERY_FUZZ_WORKERS", "-1"))
+
+
+def _scores_cdist(ql: str, titles: List[str], texts: List[str], cutoff: int, workers: int):
+    best = np.maximum(
+        process.cdist([ql], titles, scorer=fuzz.partial_ratio, score_cutoff=cutoff, workers=workers)[0],
+        process.cdist([ql], texts, scorer=fuzz.token_set_ratio, score_cutoff=cutoff, workers=workers)[0],
+    )
+    hit = np.flatnonzero(best >= cutoff)
+    return hit.tolist(), best[hit].tolist()
+
+
+def _scores_extract(ql: str, titles: List[str], texts: List[str], cutoff: int):
+    best = {}
+    for choices, scorer in ((titles, fuzz.partial_ratio), (texts, fuzz.token_set_ratio)):
+        for _, score, j in process.extract(ql, choices, scorer=scorer, score_cutoff=cutoff, limit=None):
+            if score > best.get(j, -1):
+                best[j] = score
+    hit = sorted(best)
+    return hit, [best[j] for j in hit]
+
+
+def _best_first(pair: Tuple[float, int]) -> Tuple[float, int]:
+    return -pair[0], pair[1]
+
+
+def rank(snap: CatalogSnapshot, q: str, ids: Sequence[int],
+         limit: Optional[int] = None, cutoff: int = SCORE_CUTOFF) -> List[Tuple[float, int]]:
+    """
+    Score `ids` against `q` as max(partial_ratio on title, token_set_ratio on the
+    full search text), drop anything under `cutoff`, and return every remaining
+    (score, id) pair best-first; ties keep catalog order. With `limit` only the
+    top `limit` are kept (a heap, for callers that need one page).
+    Scoring runs as one batched rapidfuzz call per scorer over the snapshot's
+    precomputed lowercase strings.
+    """
+    ql = (q or "").lower().strip()
+    if not (HAVE_FUZZ and ql and ids):
+        return []
+    titles = [snap.titles[i] for i in ids]
+    texts = [snap.index.texts[i] for i in ids]
+    if HAVE_NUMPY:
+        workers = WORKERS if len(ids) >= PARALLEL_MIN_POOL else 1
+        hit, scores = _scores_cdist(ql, titles, texts, cutoff, workers)
+    else:
+        hit, scores = _scores_extract(ql, titles, texts, cutoff)
+    scored = zip(scores, (ids[j] for j in hit))
+    if limit is None:
+        return sorted(scored, key=_best_first)
+    return heapq.nsmallest(limit, scored, key=_best_first)
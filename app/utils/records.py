@@ -0,0 +1,100 @@
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_STR_FIELDS = ("slug", "title", "cuisine", "cuisine_norm")
+_INT_FIELDS = ("time_total", "servings")
+_SEQ_FIELDS = ("ingredients", "steps")
+
+
+def _intern(s: Any) -> Any:
+    return sys.intern(s) if type(s) is str else s
+
+
+class Recipe:
+    """
+    Immutable catalog record with __slots__ instead of a per-recipe dict.
+    Cuisine names and ingredient lines are interned (they repeat across the
+    catalog), ingredients/steps are tuples, and unknown JSON keys go to `extra`.
+    It still reads like the old dicts (r["title"], r.get("steps")), so templates
+    and search helpers don't care which one they get.
+    """
+    __slots__ = _STR_FIELDS + _INT_FIELDS + _SEQ_FIELDS + ("extra",)
+    FIELDS = _STR_FIELDS + _INT_FIELDS + _SEQ_FIELDS
+
+    slug: str
+    title: str
+    cuisine: str
+    cuisine_norm: str
+    time_total: int
+    servings: int
+    ingredients: Tuple[str, ...]
+    steps: Tuple[str, ...]
+    extra: Optional[Dict[str, Any]]
+
+    def __init__(self, slug: str, title: str = "", cuisine: str = "", cuisine_norm: str = "",
+                 time_total: int = 0, servings: int = 0, ingredients=(), steps=(),
+                 extra: Optional[Dict[str, Any]] = None):
+        init = object.__setattr__
+        init(self, "slug", slug)
+        init(self, "title", title)
+        init(self, "cuisine", _intern(cuisine))
+        init(self, "cuisine_norm", _intern(cuisine_norm))
+        init(self, "time_total", time_total)
+        init(self, "servings", servings)
+        init(self, "ingredients", tuple(_intern(i) for i in ingredients))
+        init(self, "steps", tuple(steps))
+        init(self, "extra", extra or None)
+
+    @classmethod
+    def from_dict(cls, r: Dict[str, Any], **overrides: Any) -> "Recipe":
+        data = {**r, **overrides}
+        known = {k: data.pop(k) for k in cls.FIELDS if k in data}
+        return cls(extra=data, **{k: v for k, v in known.items() if v is not None})
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("Recipe records are immutable")
+
+    __delattr__ = __setattr__
+
+    # ---- dict-style reads ----
+    def __getitem__(self, key: str) -> Any:
+        if key in Recipe.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in Recipe.FIELDS or bool(self.extra and key in self.extra)
+
+    def keys(self) -> Iterator[str]:
+        yield from Recipe.FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {k: getattr(self, k) for k in Recipe.FIELDS}
+        out["ingredients"], out["steps"] = list(self.ingredients), list(self.steps)
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def _key(self) -> tuple:
+        return tuple(getattr(self, k) for k in Recipe.FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Recipe):
+            return NotImplemented
+        return self._key() == other._key() and self.extra == other.extra
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"Recipe(slug={self.slug!r}, title={self.title!r}, cuisine={self.cuisine!r})"
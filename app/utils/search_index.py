@@ -0,0 +1,160 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# every 1-, 2- and 3-char substring of a haystack gets a posting list, so
+# short queries are answered straight from one list and longer ones by
+# intersecting the lists of their trigrams (then a substring check).
+GRAM = 3
+
+_EMPTY = array("I")
+
+
+def search_text(r) -> str:
+    """The lowercase haystack basic_search has always matched against."""
+    return " ".join([r.get("title", ""), r.get("cuisine", "")] + list(r.get("ingredients", []))).lower()
+
+
+def _grams(text: str) -> set:
+    out = set()
+    for n in range(1, GRAM + 1):
+        for j in range(len(text) - n + 1):
+            out.add(text[j:j + n])
+    return out
+
+
+def intersect(lists: Iterable[Sequence[int]]) -> List[int]:
+    """Intersect ascending id sequences, probing the longer ones with bisect."""
+    lists = sorted(lists, key=len)
+    if not lists:
+        return []
+    out = list(lists[0])
+    for other in lists[1:]:
+        keep, lo, n = [], 0, len(other)
+        for i in out:
+            lo = bisect_left(other, i, lo)
+            if lo == n:
+                break
+            if other[lo] == i:
+                keep.append(i)
+        out = keep
+        if not out:
+            break
+    return out
+
+
+class SearchIndex:
+    """Inverted n-gram index over `search_text` of each record (ids = list positions)."""
+
+    def __init__(self, records: Sequence, texts: List[str], postings: Dict[str, Sequence[int]]):
+        self.records = records
+        self.texts = texts
+        self.postings = postings
+        # grams whose lists this index may mutate; None = all of them (not a fork)
+        self._owned: Optional[set] = None
+
+    @classmethod
+    def build(cls, records: Sequence) -> "SearchIndex":
+        index = cls(records, [], {})
+        for r in records:
+            index.add(r)
+        return index
+
+    # ---- incremental building (loader streams records in one at a time) ----
+    def add(self, r) -> int:
+        """Append a record's text; its id is the next position."""
+        i = len(self.texts)
+        text = search_text(r)
+        self.texts.append(text)
+        postings = self.postings
+        if self._owned is not None:
+            for g in _grams(text):
+                self._posting(g).append(i)
+            return i
+        for g in _grams(text):
+            p = postings.get(g)
+            if p is None:
+                p = postings[g] = array("I")
+            p.append(i)
+        return i
+
+    def replace(self, i: int, r) -> None:
+        """Re-index id `i` with a new record (e.g. a later duplicate slug)."""
+        text = search_text(r)
+        old, new = _grams(self.texts[i]), _grams(text)
+        postings = self.postings
+        for g in old - new:
+            p = self._posting(g)
+            del p[bisect_left(p, i)]
+            if not p:
+                del postings[g]
+        for g in new - old:
+            insort(self._posting(g), i)
+        self.texts[i] = text
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """
+        Drop ids and close the gaps, keeping everyone else's order: later ids
+        shift down. Only lists holding an id past the first removed one are rewritten.
+        """
+        gone = sorted(set(ids))
+        if not gone:
+            return
+        first, dropped = gone[0], set(gone)
+        postings = self.postings
+        for g in list(postings):
+            p = postings[g]
+            if not p or p[-1] < first:
+                continue
+            k = bisect_left(p, first)
+            kept = array("I", p[:k])
+            for i in p[k:]:
+                if i not in dropped:
+                    kept.append(i - bisect_left(gone, i))
+            if kept:
+                postings[g] = kept
+                if self._owned is not None:
+                    self._owned.add(g)
+            else:
+                del postings[g]
+        self.texts = [t for i, t in enumerate(self.texts) if i not in dropped]
+
+    # ---- copy-on-write forks (hot reload patches a copy while requests read the original) ----
+    def fork(self) -> "SearchIndex":
+        """
+        A copy that shares every posting list with this index until it writes to
+        one; only the lists a patch touches get copied.
+        """
+        index = SearchIndex(self.records, list(self.texts), dict(self.postings))
+        index._owned = set()
+        return index
+
+    def _posting(self, g: str):
+        p = self.postings.get(g)
+        owned = self._owned
+        if p is None or (owned is not None and g not in owned):
+            p = self.postings[g] = array("I", p if p is not None else ())
+            if owned is not None:
+                owned.add(g)
+        return p
+
+    def search(self, q: str, within: Optional[Sequence[int]] = None) -> List[int]:
+        """Ids (ascending) whose haystack contains `q` as a substring."""
+        ql = (q or "").lower().strip()
+        if not ql:
+            return list(within) if within is not None else list(range(len(self.texts)))
+        if len(ql) <= GRAM:
+            lists = [self.postings.get(ql, _EMPTY)]
+        else:
+            lists = [self.postings.get(ql[j:j + GRAM], _EMPTY) for j in range(len(ql) - GRAM + 1)]
+        if within is not None:
+            lists.append(within)
+        ids = intersect(lists)
+        if len(ql) > GRAM:
+            texts = self.texts
+            ids = [i for i in ids if ql in texts[i]]
+        return ids
+
+    def search_records(self, q: str) -> List:
+        records = self.records
+        return [records[i] for i in self.search(q)]
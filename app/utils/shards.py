@@ -0,0 +1,196 @@
+"""
+Sharded catalogs: a directory of recipe files (JSON array, {"recipes": [...]}
+or NDJSON), e.g. one per region or per editor, instead of one big seed file.
+
+Each shard is parsed, validated against schemas.RecipeBase (slug regex
+included), region-overridden and normalized on its own, so shards fan out
+over a process pool; workers send back plain field tuples and the parent
+only builds the Recipe objects. Shards merge in file-name order: a slug seen
+again in a later shard replaces the earlier record but keeps its position
+(same rule as a single file), and every replacement is reported.
+
+Invalid records are skipped and listed in the shard's report; a shard that
+isn't readable JSON fails the whole load, so a half-saved file never drops a
+region from the live catalog (the watcher just retries).
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+from pydantic import ValidationError
+
+from .. import schemas
+from .records import Recipe
+from .stream import NDJSON_SUFFIXES, iter_recipes
+
+SHARD_SUFFIXES = {".json"} | NDJSON_SUFFIXES
+LOAD_WORKERS = int(os.getenv("DISHCOVERY_LOAD_WORKERS", "0")) or os.cpu_count() or 1
+# below this much JSON, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 4 << 20
+# fresh interpreters, never fork: loads also run from the startup thread and the
+# watcher while the event loop and other threads hold locks a forked child would inherit
+# (spawn re-imports __main__, so entry points need the usual `if __name__ == "__main__"`)
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+MAX_ERRORS = 20     # per shard; the count keeps going past it
+
+_SCHEMA_FIELDS = tuple(schemas.RecipeBase.__fields__)
+
+
+@dataclass
+class ShardReport:
+    path: str
+    loaded: int = 0
+    invalid: int = 0
+    duplicates: int = 0     # slug repeated inside this shard (last one kept)
+    overridden: int = 0     # records of this shard replaced by a later shard
+    ms: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["ms"] = round(self.ms, 1)
+        return out
+
+
+@dataclass
+class ShardLoad:
+    records: List[Recipe]
+    shards: List[ShardReport]
+    conflicts: List[Tuple[str, str, str]]   # (slug, shard kept, shard replaced)
+    ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.records),
+            "invalid": sum(s.invalid for s in self.shards),
+            "conflicts": len(self.conflicts),
+            "ms": round(self.ms, 1),
+            "shards": [s.as_dict() for s in self.shards],
+        }
+
+
+def shard_files(directory: Path) -> List[Path]:
+    """Recipe files in `directory`, in merge order (by name; dotfiles skipped)."""
+    return sorted(p for p in Path(directory).iterdir()
+                  if p.is_file() and p.suffix.lower() in SHARD_SUFFIXES and not p.name.startswith("."))
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+# ---- one shard (runs in a worker process) ----
+
+def _validate(raw: Any, overrides: Mapping[str, str]) -> tuple:
+    """Recipe constructor args for one raw record; raises ValueError/ValidationError."""
+    if not isinstance(raw, dict):
+        raise ValueError("record is not an object")
+    data = dict(raw)
+    if isinstance(data.get("slug"), str):
+        data["slug"] = data["slug"].strip()
+        override = overrides.get(data["slug"])
+        if override:
+            data["cuisine"] = override
+    m = schemas.RecipeBase(**data).dict()
+    slug, cuisine = m["slug"], m["cuisine"]
+    extra = {k: v for k, v in raw.items() if k not in _SCHEMA_FIELDS and k not in Recipe.FIELDS}
+    return (slug, m["title"], cuisine, cuisine.strip().lower(), m["time_total"], m["servings"],
+            tuple(m["ingredients"]), tuple(m["steps"]), extra or None)
+
+
+def _slug_of(raw: Any) -> str:
+    slug = raw.get("slug") if isinstance(raw, dict) else None
+    return slug if isinstance(slug, str) and slug else "no slug"
+
+
+def _describe(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+
+def parse_shard(path: str, overrides: Mapping[str, str]) -> Tuple[List[tuple], ShardReport]:
+    start = time.perf_counter()
+    report = ShardReport(path)
+    rows: Dict[str, tuple] = {}
+    records = enumerate(iter_recipes(path))
+    while True:
+        try:
+            n, raw = next(records)
+        except StopIteration:
+            break
+        except ValueError as e:     # broken JSON: fail the load, don't drop the shard
+            raise ValueError(f"{path}: {e}") from None
+        try:
+            row = _validate(raw, overrides)
+        except (ValueError, ValidationError) as e:
+            report.invalid += 1
+            if len(report.errors) < MAX_ERRORS:
+                report.errors.append(f"record {n} ({_slug_of(raw)}): {_describe(e)}")
+            continue
+        if row[0] in rows:
+            report.duplicates += 1
+        rows[row[0]] = row
+    report.loaded = len(rows)
+    report.ms = (time.perf_counter() - start) * 1000
+    return list(rows.values()), report
+
+
+# ---- the directory ----
+
+class ShardedCatalog:
+    """
+    Loads a shard directory, re-parsing only shards whose size/mtime changed
+    since the previous load (hot reloads of one edited shard stay cheap).
+    """
+
+    def __init__(self, directory: Path, overrides: Mapping[str, str], workers: int = LOAD_WORKERS):
+        self.directory = Path(directory)
+        self.overrides = dict(overrides)
+        self.workers = workers
+        self._parsed: Dict[str, Tuple[Tuple[int, int], List[tuple], ShardReport]] = {}
+
+    def files(self) -> List[Path]:
+        return shard_files(self.directory)
+
+    def _parse(self, paths: List[str]) -> List[Tuple[List[tuple], ShardReport]]:
+        size = sum(os.path.getsize(p) for p in paths)
+        workers = min(self.workers, len(paths))
+        if workers <= 1 or size < PARALLEL_MIN_BYTES:
+            return [parse_shard(p, self.overrides) for p in paths]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as pool:
+            return list(pool.map(parse_shard, paths, [self.overrides] * len(paths)))
+
+    def load(self) -> ShardLoad:
+        start = time.perf_counter()
+        files = self.files()
+        stamps = {str(p): _stamp(p) for p in files}
+        stale = [p for p, st in stamps.items() if p not in self._parsed or self._parsed[p][0] != st]
+        for p, (rows, report) in zip(stale, self._parse(stale)):
+            self._parsed[p] = (stamps[p], rows, report)
+        for p in list(self._parsed):
+            if p not in stamps:
+                del self._parsed[p]
+
+        merged: Dict[str, Recipe] = {}
+        owner: Dict[str, ShardReport] = {}
+        conflicts: List[Tuple[str, str, str]] = []
+        reports = []
+        for p in stamps:
+            _, rows, cached = self._parsed[p]
+            report = ShardReport(**{**cached.__dict__, "overridden": 0, "errors": list(cached.errors)})
+            reports.append(report)
+            for row in rows:
+                slug = row[0]
+                prev = owner.get(slug)
+                if prev is not None:
+                    prev.overridden += 1
+                    conflicts.append((slug, p, prev.path))
+                merged[slug] = Recipe(*row)
+                owner[slug] = report
+        return ShardLoad(list(merged.values()), reports, conflicts, (time.perf_counter() - start) * 1000)
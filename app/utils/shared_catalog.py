@@ -0,0 +1,140 @@
+"""
+One compiled catalog shared by every worker process on a host.
+
+The catalog directory holds numbered generations (gen-000001.snap, ...) and a
+CURRENT file naming the live one. Whoever holds the directory lock builds a
+generation from JSON, writes it next to the old ones and swaps CURRENT with an
+atomic rename. Workers map the current generation read-only
+(catalog_file.map_catalog) and, at most once per poll interval, re-read
+CURRENT to switch to a newer one. Only the newest KEEP_GENERATIONS files are
+kept; unlinking an old one doesn't disturb processes that still map it.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Mapping, Optional
+
+from .catalog import CatalogSnapshot
+from .catalog_file import map_catalog, read_header, sources_fresh, write_catalog
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except Exception:  # not POSIX: single-process use only
+    HAVE_FCNTL = False
+
+log = logging.getLogger(__name__)
+
+POINTER = "CURRENT"
+LOCK = "catalog.lock"
+KEEP_GENERATIONS = 3
+_GEN = re.compile(r"^gen-(\d+)\.snap$")
+
+
+class SharedCatalog:
+    def __init__(self, directory: Path, sources: Mapping[str, Path],
+                 build: Callable[[], CatalogSnapshot], salt: str = "", poll_interval: float = 1.0):
+        self.dir = Path(directory)
+        self.sources = dict(sources)
+        self.build = build
+        self.salt = salt
+        self.poll_interval = poll_interval
+        self.generation: Optional[str] = None
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._next_poll = 0.0
+        self._mutex = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / LOCK, "a") as f:
+            if HAVE_FCNTL:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if HAVE_FCNTL:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_pointer(self) -> Optional[str]:
+        try:
+            return (self.dir / POINTER).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _switch(self, name: str) -> CatalogSnapshot:
+        self.snapshot = map_catalog(self.dir / name)
+        self.generation = name
+        return self.snapshot
+
+    def _fresh(self, name: str) -> bool:
+        try:
+            header, _ = read_header(self.dir / name)
+        except (OSError, ValueError):
+            return False
+        recorded = header.get("sources", {})
+        return header.get("salt") == self.salt and sources_fresh(recorded, self.sources)
+
+    def _publish_locked(self) -> CatalogSnapshot:
+        numbers = [int(m.group(1)) for m in map(_GEN.match, os.listdir(self.dir)) if m]
+        name = f"gen-{max(numbers, default=0) + 1:06d}.snap"
+        write_catalog(self.build(), self.dir / name, self.sources, self.salt)
+        tmp = self.dir / f"{POINTER}.tmp"
+        tmp.write_text(name, encoding="utf-8")
+        os.replace(tmp, self.dir / POINTER)
+        self._prune(name)
+        log.info("published catalog generation %s", name)
+        return self._switch(name)
+
+    def _prune(self, current: str) -> None:
+        gens = sorted(f for f in os.listdir(self.dir) if _GEN.match(f) and f != current)
+        for old in gens[:max(0, len(gens) - (KEEP_GENERATIONS - 1))]:
+            try:
+                os.unlink(self.dir / old)   # mapped copies stay valid until unmapped
+            except FileNotFoundError:
+                pass
+
+    def open(self) -> CatalogSnapshot:
+        """Map the live generation, publishing one first if there is none or its sources changed."""
+        with self._mutex, self._locked():
+            name = self._read_pointer()
+            if name and self._fresh(name):
+                return self._switch(name)
+            return self._publish_locked()
+
+    def refresh(self) -> Optional[CatalogSnapshot]:
+        """
+        Like open(), but returns None when this process already maps the live
+        generation and it is still fresh; the first worker to notice a change publishes.
+        """
+        with self._mutex, self._locked():
+            name = self._read_pointer()
+            if name and self._fresh(name):
+                return None if name == self.generation else self._switch(name)
+            return self._publish_locked()
+
+    def publish(self) -> CatalogSnapshot:
+        """Rebuild from the sources and make that the live generation for every worker."""
+        with self._mutex, self._locked():
+            return self._publish_locked()
+
+    def poll(self) -> Optional[CatalogSnapshot]:
+        """Switch to a newer generation if another process published one; returns it if so."""
+        now = time.monotonic()
+        if now < self._next_poll:
+            return None
+        self._next_poll = now + self.poll_interval
+        name = self._read_pointer()
+        if not name or name == self.generation:
+            return None
+        with self._mutex:
+            if name == self.generation:
+                return None
+            try:
+                return self._switch(name)
+            except FileNotFoundError:   # already pruned; a newer pointer is on its way
+                return None
@@ -0,0 +1,299 @@
+"""
+"More like this": top-k cosine neighbours over TF-IDF vectors of each recipe's
+normalized ingredient names and title words, computed for the whole catalog
+up front so a detail page or the JSON endpoint only slices two arrays.
+
+The all-pairs pass runs in row blocks on a thread pool: a SciPy sparse
+product when SciPy is installed, a dense NumPy (BLAS) product when the
+vocabulary is small enough, and a pure-Python inverted-index pass otherwise.
+A hot reload patches the neighbour lists of the recipes it touched instead of
+recomputing everything (see SimilarIndex.patched).
+"""
+import math
+import os
+import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from .pantry import normalize_ingredient
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except Exception:
+    HAVE_NUMPY = False
+
+try:
+    from scipy import sparse
+    HAVE_SCIPY = True
+except Exception:
+    HAVE_SCIPY = False
+
+SIMILAR_K = int(os.getenv("DISHCOVERY_SIMILAR_K", "8"))
+# catalogs up to this size are done while the loader installs them; bigger ones in the background
+SIMILAR_SYNC_MAX = int(os.getenv("DISHCOVERY_SIMILAR_SYNC_MAX", "5000"))
+WORKERS = int(os.getenv("DISHCOVERY_SIMILAR_WORKERS", "0")) or os.cpu_count() or 1
+TITLE_WEIGHT = 0.5          # title words count for half an ingredient of the same rarity
+DENSE_MAX_CELLS = 25_000_000     # recipes x vocabulary for the dense path (100 MB of float32)
+BLOCK_CELLS = 8_000_000          # score-block size (rows x recipes)
+_WORD = re.compile(r"[a-z]{3,}")
+
+
+def _features(r, names: Dict[str, str]) -> Set[str]:
+    out = set()
+    for line in r.ingredients:
+        name = names.get(line)
+        if name is None:
+            name = names[line] = normalize_ingredient(line)
+        if name:
+            out.add("i:" + name)
+    out.update("t:" + w for w in _WORD.findall(r.title.lower()))
+    return out
+
+
+def _tie_order(pair: Tuple[float, int]) -> Tuple[float, int]:
+    return -round(pair[0], 5), pair[1]
+
+
+def _idf(n: int, df: int) -> float:
+    return math.log((1 + n) / (1 + df)) + 1.0
+
+
+class SimilarIndex:
+    """
+    Per-recipe TF-IDF rows in CSR form (indptr/indices/data) plus the answer:
+    recipe i's neighbours are ids[i*k : i*k + count[i]], best first, with
+    their cosine scores alongside.
+    """
+
+    def __init__(self, size: int, k: int, vocab: Dict[str, int], df: List[int], idf: List[float],
+                 indptr: array, indices: array, data: array):
+        self.size, self.k = size, k
+        self.vocab, self.df, self.idf = vocab, df, idf
+        self.indptr, self.indices, self.data = indptr, indices, data
+        self.ids = array("I", bytes(4 * size * k))
+        self.scores = array("f", bytes(4 * size * k))
+        self.count = array("B", bytes(size))
+
+    # ---- building ----
+
+    @classmethod
+    def build(cls, recipes: Sequence, k: int = SIMILAR_K) -> "SimilarIndex":
+        names: Dict[str, str] = {}
+        feats = [_features(r, names) for r in recipes]
+        vocab: Dict[str, int] = {}
+        df: List[int] = []
+        for fs in feats:
+            for f in fs:
+                t = vocab.get(f)
+                if t is None:
+                    t = vocab[f] = len(df)
+                    df.append(0)
+                df[t] += 1
+        n = len(recipes)
+        idf = [_idf(n, d) for d in df]
+        index = cls(n, k, vocab, df, idf, array("L", [0]), array("I"), array("f"))
+        for fs in feats:
+            index._append_row(fs)
+        index._neighbours_all()
+        return index
+
+    def _row_vector(self, fs: Iterable[str]) -> Tuple[List[int], List[float]]:
+        """Normalized TF-IDF row; unseen terms join the vocabulary (df/idf as of now)."""
+        terms, weights = [], []
+        for f in sorted(fs):
+            t = self.vocab.get(f)
+            if t is None:
+                t = self.vocab[f] = len(self.df)
+                self.df.append(0)
+                self.idf.append(_idf(self.size, 1))
+            terms.append(t)
+            weights.append(self.idf[t] * (TITLE_WEIGHT if f[0] == "t" else 1.0))
+        norm = math.sqrt(sum(w * w for w in weights)) or 1.0
+        return terms, [w / norm for w in weights]
+
+    def _append_row(self, fs: Iterable[str]) -> None:
+        terms, weights = self._row_vector(fs)
+        self.indices.extend(terms)
+        self.data.extend(weights)
+        self.indptr.append(len(self.indices))
+
+    def _row(self, i: int) -> Tuple[array, array]:
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return self.indices[a:b], self.data[a:b]
+
+    def _set(self, i: int, pairs: Sequence[Tuple[float, int]]) -> None:
+        base, k = i * self.k, self.k
+        # BLAS sums in its own order, so equal scores can differ in the last float32 bit;
+        # order on rounded scores so ties always go to the lower id, whichever path scored them
+        pairs = sorted((p for p in pairs if p[0] > 0), key=_tie_order)[:k]
+        for j, (score, nb) in enumerate(pairs):
+            self.ids[base + j] = nb
+            self.scores[base + j] = score
+        self.count[i] = len(pairs)
+
+    def _neighbours_all(self) -> None:
+        n = self.size
+        if n < 2:
+            return
+        if HAVE_NUMPY and (HAVE_SCIPY or n * len(self.df) <= DENSE_MAX_CELLS):
+            self._neighbours_matrix()
+        else:
+            postings = self._postings()
+            for i in range(n):
+                self._set(i, self._best(self._query(i, postings), i))
+
+    # ---- matrix path (NumPy / SciPy), row blocks in parallel ----
+
+    def _neighbours_matrix(self) -> None:
+        n, k = self.size, min(self.k, self.size - 1)
+        shape = (n, len(self.df))
+        indptr = np.frombuffer(self.indptr, dtype=f"u{self.indptr.itemsize}").astype(np.int64)
+        if HAVE_SCIPY:
+            X = sparse.csr_matrix((np.frombuffer(self.data, dtype=np.float32),
+                                   np.frombuffer(self.indices, dtype=np.uint32), indptr), shape=shape)
+            XT = X.T.tocsc()
+
+            def scores(lo: int, hi: int):
+                return (X[lo:hi] @ XT).toarray()
+        else:
+            X = np.zeros(shape, dtype=np.float32)
+            rows = np.repeat(np.arange(n), np.diff(indptr))
+            X[rows, np.frombuffer(self.indices, dtype=np.uint32)] = np.frombuffer(self.data, dtype=np.float32)
+
+            def scores(lo: int, hi: int):
+                return X[lo:hi] @ X.T
+
+        def block(lo: int) -> None:
+            hi = min(lo + step, n)
+            S = scores(lo, hi)
+            S[np.arange(hi - lo), np.arange(lo, hi)] = -1.0      # not your own neighbour
+            top = np.argpartition(-S, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(S, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+            for r in range(hi - lo):
+                self._set(lo + r, list(zip(top_scores[r].tolist(), top[r].tolist())))
+
+        step = max(1, BLOCK_CELLS // n)
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(block, range(0, n, step)))
+
+    # ---- inverted-index path (also answers single-row queries when patching) ----
+
+    def _postings(self):
+        """term -> (recipe ids, weights): the CSR rows transposed."""
+        if HAVE_NUMPY:
+            indptr = np.frombuffer(self.indptr, dtype=f"u{self.indptr.itemsize}").astype(np.int64)
+            terms = np.frombuffer(self.indices, dtype=np.uint32)
+            order = np.argsort(terms, kind="stable")
+            rows = np.repeat(np.arange(self.size, dtype=np.int64), np.diff(indptr))[order]
+            weights = np.frombuffer(self.data, dtype=np.float32)[order]
+            cuts = np.flatnonzero(np.diff(terms[order])) + 1
+            starts = [0] + cuts.tolist()
+            return {int(terms[order[a]]): (ids, ws) for a, ids, ws in
+                    zip(starts, np.split(rows, cuts), np.split(weights, cuts)) if len(ids)}
+        lists: Dict[int, Tuple[List[int], List[float]]] = {}
+        for i in range(self.size):
+            for t, w in zip(*self._row(i)):
+                ids, ws = lists.setdefault(t, ([], []))
+                ids.append(i)
+                ws.append(w)
+        return lists
+
+    def _query(self, i: int, postings):
+        """Dot product of row i with every row: a dense score array (NumPy) or a {id: score} dict."""
+        if HAVE_NUMPY:
+            acc = np.zeros(self.size, dtype=np.float32)
+            for t, w in zip(*self._row(i)):
+                ids, ws = postings[t]
+                acc[ids] += w * ws
+            return acc
+        acc: Dict[int, float] = {}
+        for t, w in zip(*self._row(i)):
+            for j, wj in zip(*postings[t]):
+                acc[j] = acc.get(j, 0.0) + w * wj
+        return acc
+
+    def _best(self, scores, i: int) -> List[Tuple[float, int]]:
+        if HAVE_NUMPY:
+            scores[i] = -1.0
+            k = min(self.k, self.size - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            return sorted(zip(scores[top].tolist(), top.tolist()), key=lambda p: (-p[0], p[1]))
+        scores.pop(i, None)
+        return sorted(((s, j) for j, s in scores.items()), key=lambda p: (-p[0], p[1]))[:self.k]
+
+    # ---- lookups ----
+
+    def neighbours(self, i: int) -> List[Tuple[int, float]]:
+        """(recipe id, cosine) best first; O(k)."""
+        if not 0 <= i < self.size:
+            return []
+        base = i * self.k
+        c = self.count[i]
+        return list(zip(self.ids[base:base + c], self.scores[base:base + c]))
+
+    # ---- hot reload ----
+
+    def patched(self, old_recipes: Sequence, new_recipes: Sequence, changed: Iterable[str],
+                removed: Iterable[str]) -> "SimilarIndex":
+        """
+        Neighbour lists for `new_recipes` (a patch of `old_recipes`) reusing this
+        index: only changed/added recipes and the recipes whose lists pointed at a
+        changed/removed one are recomputed; everyone else just considers the new
+        rows as candidates. IDF weights stay as they were until the next full build.
+        """
+        names: Dict[str, str] = {}
+        old_pos = {r.slug: i for i, r in enumerate(old_recipes)}
+        gone = {old_pos[s] for s in removed if s in old_pos} | {old_pos[s] for s in changed if s in old_pos}
+        changed = set(changed)
+
+        new = SimilarIndex(len(new_recipes), self.k, dict(self.vocab), list(self.df), list(self.idf),
+                           array("L", [0]), array("I"), array("f"))
+        for i in sorted(gone):
+            for t in self._row(i)[0]:
+                new.df[t] -= 1
+        remap: Dict[int, int] = {}
+        dirty: List[int] = []
+        for j, r in enumerate(new_recipes):
+            i = old_pos.get(r.slug)
+            if i is None or r.slug in changed:
+                fs = _features(r, names)
+                new._append_row(fs)
+                for t in new._row(j)[0]:
+                    new.df[t] += 1
+                dirty.append(j)
+            else:
+                terms, weights = self._row(i)
+                new.indices.extend(terms)
+                new.data.extend(weights)
+                new.indptr.append(len(new.indices))
+                remap[i] = j
+
+        postings = new._postings()
+        stale = []
+        for i, j in remap.items():
+            nbs = self.neighbours(i)
+            if any(nb in gone for nb, _ in nbs):
+                stale.append(j)
+            else:
+                new._set(j, [(s, remap[nb]) for nb, s in nbs])
+        fresh = set(dirty) | set(stale)
+        for j in stale:
+            new._set(j, new._best(new._query(j, postings), j))
+        for d in dirty:
+            scores = new._query(d, postings)
+            hits = (np.flatnonzero(scores > 0).tolist() if HAVE_NUMPY else [j for j, s in scores.items() if s > 0])
+            for j in hits:
+                if j == d or j in fresh:
+                    continue
+                nbs = new.neighbours(j)
+                s = float(scores[j])
+                if len(nbs) < new.k or s > nbs[-1][1]:
+                    new._set(j, sorted([(sc, nb) for nb, sc in nbs] + [(s, d)], key=lambda p: (-p[0], p[1])))
+            new._set(d, new._best(scores, d))
+        return new
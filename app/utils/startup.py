@@ -0,0 +1,112 @@
+"""
+Startup pipeline, run from the app's lifespan: load the catalog, build its
+indexes, compile templates, set up optional search backends and warm the
+lazy paths (rapidfuzz, pantry matching) before /readyz says yes.
+
+By default it runs on a background thread so the worker answers /healthz
+straight away and a rolling deploy just waits for /readyz;
+DISHCOVERY_BACKGROUND_STARTUP=0 runs it before the app accepts requests.
+Each phase is timed (/readyz, /metrics, log).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from .metrics import Gauge
+
+log = logging.getLogger(__name__)
+
+BACKGROUND = os.getenv("DISHCOVERY_BACKGROUND_STARTUP", "1").lower() not in ("0", "false", "no")
+
+STARTUP_SECONDS = Gauge("dishcovery_startup_phase_seconds", "Duration of each startup phase.", ("phase",))
+READY = Gauge("dishcovery_ready", "1 once the catalog and its indexes are built.")
+
+Phase = Tuple[str, Callable[[], Any]]
+
+
+class Startup:
+    """Runs `phases` in order once; state is "pending", "running", "ready" or "failed"."""
+
+    def __init__(self, phases: Sequence[Phase]):
+        self.phases = list(phases)
+        self.state = "pending"
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}     # phase -> ms
+        self.started: Optional[float] = None
+        self.ms: Optional[float] = None
+        self.done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def run(self) -> bool:
+        self.state, self.started = "running", time.perf_counter()
+        READY.set(0)
+        for name, fn in self.phases:
+            self.current = name
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.state, self.error = "failed", f"{name}: {e}"
+                log.exception("startup phase %s failed", name)
+                break
+            finally:
+                self.timings[name] = (time.perf_counter() - start) * 1000
+                STARTUP_SECONDS.set(self.timings[name] / 1000, name)
+        else:
+            self.state = "ready"
+            READY.set(1)
+        self.current = None
+        self.ms = (time.perf_counter() - self.started) * 1000
+        log.info("startup %s in %.0f ms: %s", self.state, self.ms,
+                 ", ".join(f"{k} {v:.0f} ms" for k, v in self.timings.items()))
+        self.done.set()
+        return self.ready
+
+    def start(self, background: bool = BACKGROUND) -> None:
+        if self.state != "pending":
+            return      # once per process, however many times the lifespan is entered
+        if background:
+            self._thread = threading.Thread(target=self.run, name="dishcovery-startup", daemon=True)
+            self._thread.start()
+        else:
+            self.run()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.done.wait(timeout)
+        return self.ready
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "status": self.state,
+            "phase": self.current,
+            "phases": {k: round(v, 1) for k, v in self.timings.items()},
+            "ms": round(self.ms, 1) if self.ms is not None else None,
+        }
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+# ---- warmup ----
+
+def warm_paths(queries: Sequence[str] = ("masala", "paneer butter")) -> None:
+    """One search + fuzzy rank and one pantry match, so lazy setup isn't paid by the first user."""
+    from .loader import get_snapshot
+    from .ranking import HAVE_FUZZ, rank
+
+    snap = get_snapshot()
+    snap.pantry
+    snap.positions
+    for q in queries:
+        ids = snap.search(q)
+        if HAVE_FUZZ and ids:
+            rank(snap, q, ids)
+    if snap.recipes:
+        snap.pantry.rank(list(snap.recipes[0].ingredients[:3]))
@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO, Union
+
+CHUNK_SIZE = 1 << 16
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+_WS = " \t\r\n"
+_SHAPE_ERROR = "seed_recipes.json must be a JSON array or an object with a 'recipes' array"
+
+
+class _Reader:
+    """Sliding text buffer over a file; values are decoded one at a time with raw_decode."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def take(self, expected: str) -> None:
+        if self.peek() != expected:
+            raise ValueError(_SHAPE_ERROR)
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2   # big values: grow reads so re-decoding stays linear-ish
+                continue
+            # a bare number/literal ending at the buffer edge might continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill(size):
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(rd: _Reader) -> Iterator[Any]:
+    rd.take("[")
+    if rd.peek() == "]":
+        rd.pos += 1
+        return
+    while True:
+        yield rd.value()
+        c = rd.peek()
+        rd.pos += 1
+        if c == "]":
+            return
+        if c != ",":
+            raise ValueError("malformed JSON array in recipe file")
+
+
+def _iter_wrapped(rd: _Reader) -> Iterator[Any]:
+    # {"recipes": [...], ...}: stream the recipes array, skip every other key
+    rd.take("{")
+    if rd.peek() == "}":
+        raise ValueError(_SHAPE_ERROR)
+    while True:
+        key = rd.value()
+        rd.take(":")
+        if key == "recipes":
+            if rd.peek() != "[":
+                raise ValueError(_SHAPE_ERROR)
+            yield from _iter_array(rd)
+            return
+        rd.value()
+        c = rd.peek()
+        rd.pos += 1
+        if c == "}":
+            raise ValueError(_SHAPE_ERROR)
+        if c != ",":
+            raise ValueError("malformed JSON object in recipe file")
+
+
+def iter_json_records(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array (or of its 'recipes' key) one by one."""
+    rd = _Reader(f, chunk_size)
+    c = rd.peek()
+    if c == "[":
+        yield from _iter_array(rd)
+    elif c == "{":
+        yield from _iter_wrapped(rd)
+    else:
+        raise ValueError(_SHAPE_ERROR)
+
+
+def iter_ndjson_records(f: TextIO) -> Iterator[Any]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_recipes(path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Stream raw recipe records from a JSON array, a {"recipes": [...]} object or
+    NDJSON (.ndjson/.jsonl), never holding more than one record plus a read buffer.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() in NDJSON_SUFFIXES:
+            yield from iter_ndjson_records(f)
+        else:
+            yield from iter_json_records(f, chunk_size)
@@ -0,0 +1,150 @@
+"""
+Ingredient substitution graph (data/substitutions.json).
+
+"equivalents" are groups that stand in for each other; "substitutes" maps an
+ingredient to what can replace it, one direction only. Chains count: if ghee
+can replace butter and oil can replace ghee, oil covers butter. The closure is
+worked out once when the file is loaded and kept as one bitmap per ingredient
+(bit j = node j can stand in), so checking a recipe line against a pantry is a
+single AND instead of a graph walk.
+
+Names go through the same normalization as pantry matching, and a node matches
+an ingredient line or pantry item when all of its words appear in it
+("butter" matches "unsalted butter").
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .bitmaps import iter_bits
+from .pantry import ingredient_words, normalize_ingredient
+
+SUBSTITUTIONS_FILE = Path(os.getenv("DISHCOVERY_SUBSTITUTIONS", "data/substitutions.json"))
+
+
+class SubstitutionGraph:
+    def __init__(self, equivalents: Iterable[Sequence[str]] = (), substitutes: Mapping[str, Iterable[str]] = None):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.by_word: Dict[str, Set[int]] = {}
+        edges: List[Set[int]] = []      # edges[a] = nodes that can replace a
+
+        def node(name: str) -> Optional[int]:
+            name = normalize_ingredient(name)
+            if not name:
+                return None
+            v = self.ids.get(name)
+            if v is None:
+                v = self.ids[name] = len(self.names)
+                self.names.append(name)
+                edges.append(set())
+                for w in name.split(" "):
+                    self.by_word.setdefault(w, set()).add(v)
+            return v
+
+        for group in equivalents:
+            members = [v for v in (node(x) for x in group) if v is not None]
+            for a in members:
+                edges[a].update(b for b in members if b != a)
+        for target, alts in (substitutes or {}).items():
+            a = node(target)
+            if a is None:
+                continue
+            edges[a].update(b for b in (node(x) for x in alts) if b is not None and b != a)
+
+        # transitive closure, one DFS per node (graphs here are tiny; requests never walk it)
+        self.closure: List[int] = []
+        for a in range(len(self.names)):
+            seen, stack = {a}, list(edges[a])
+            while stack:
+                b = stack.pop()
+                if b not in seen:
+                    seen.add(b)
+                    stack.extend(edges[b])
+            seen.discard(a)
+            self.closure.append(sum(1 << b for b in seen))
+        self._alternatives: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def load(cls, path: Path = SUBSTITUTIONS_FILE) -> "SubstitutionGraph":
+        if not path or not Path(path).exists():
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("equivalents", []), data.get("substitutes", {}))
+
+    # ---- matching ----
+
+    def nodes_in(self, text: str) -> Set[int]:
+        """Nodes whose every word appears in `text` (an ingredient line or pantry item)."""
+        words = set(ingredient_words(text))
+        out: Set[int] = set()
+        for w in words:
+            for v in self.by_word.get(w, ()):
+                if v not in out and all(x in words for x in self.names[v].split(" ")):
+                    out.add(v)
+        return out
+
+    def alternatives(self, line: str) -> int:
+        """Bitmap of nodes that can stand in for `line` (memoized per distinct line)."""
+        bm = self._alternatives.get(line)
+        if bm is None:
+            bm = 0
+            for v in self.nodes_in(line):
+                bm |= self.closure[v]
+            with self._lock:
+                self._alternatives[line] = bm
+        return bm
+
+    def pantry_bitmap(self, pantry: Iterable[str]) -> int:
+        """Nodes the pantry has; build once per request, then AND against alternatives()."""
+        bm = 0
+        for item in pantry:
+            for v in self.nodes_in(item):
+                bm |= 1 << v
+        return bm
+
+    def substitute(self, line: str, have: int) -> Optional[str]:
+        """A pantry ingredient that can replace `line`, or None."""
+        hit = self.alternatives(line) & have
+        return self.names[next(iter_bits(hit))] if hit else None
+
+    def substitutes_for(self, lines: Iterable[str], have: int) -> Tuple[Tuple[str, str], ...]:
+        """(line, substitute) for each line the pantry can cover by substitution."""
+        out = []
+        if have:
+            for line in lines:
+                sub = self.substitute(line, have)
+                if sub:
+                    out.append((line, sub))
+        return tuple(out)
+
+
+_GRAPH: Optional[SubstitutionGraph] = None
+_GRAPH_STAMP: Optional[Tuple[int, int]] = None
+_GRAPH_LOCK = threading.Lock()
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def get_graph() -> SubstitutionGraph:
+    """The graph for SUBSTITUTIONS_FILE, reloaded when the file changes."""
+    global _GRAPH, _GRAPH_STAMP
+    stamp = _stamp(SUBSTITUTIONS_FILE)
+    if _GRAPH is None or stamp != _GRAPH_STAMP:
+        with _GRAPH_LOCK:
+            if _GRAPH is None or stamp != _GRAPH_STAMP:
+                _GRAPH, _GRAPH_STAMP = SubstitutionGraph.load(SUBSTITUTIONS_FILE), stamp
+    return _GRAPH
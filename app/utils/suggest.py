@@ -0,0 +1,143 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from .pantry import ingredient_spellings
+
+SUGGEST_LIMIT = 8
+SUGGEST_MAX = 25        # largest `limit` /search/suggest takes
+# a prefix matching more keys than this gets its top SUGGEST_MAX worked out at
+# build time; any other prefix scans at most this many keys
+SCAN_MAX = 256
+_SPACE = re.compile(r"\s+")
+
+KIND_ORDER = {"title": 0, "cuisine": 1, "ingredient": 2}
+
+
+def _norm(text: str) -> str:
+    return _SPACE.sub(" ", (text or "").lower()).strip()
+
+
+class Suggester:
+    """
+    Typeahead over recipe titles, cuisine names and normalized ingredient names.
+
+    Every term is stored once (display text, kind, weight = recipes it covers);
+    the lookup side is one sorted list of lowercase keys with a parallel array of
+    term ids. Each word start inside a term is a key too, so "chi" finds
+    "Butter Chicken". A prefix maps to one contiguous run of keys (two bisects),
+    and since ids are handed out in weight order the answer is the run's
+    `limit` smallest ids. Runs longer than SCAN_MAX have that answer stored
+    per prefix, so no lookup scans more than SCAN_MAX keys.
+
+    Ingredients are merged by normalized name but shown the way recipes most
+    often spell them ("curry leaves", not "curry leaf").
+    """
+
+    def __init__(self, recipes: Sequence):
+        titles: Counter = Counter()
+        slugs: Dict[str, str] = {}
+        cuisines: Counter = Counter()
+        ingredients: Counter = Counter()
+        lines: Counter = Counter()
+        names: Dict[str, str] = {}      # raw line -> normalized (lines repeat a lot)
+        phrases: Dict[str, str] = {}    # raw line -> the same words as spelled
+        for r in recipes:
+            titles[r.title] += 1
+            slugs.setdefault(r.title, r.slug)
+            cuisines[r.cuisine] += 1
+            lines.update(r.ingredients)
+            seen = set()
+            for line in r.ingredients:
+                name = names.get(line)
+                if name is None:
+                    name, phrases[line] = ingredient_spellings(line)
+                    names[line] = name
+                seen.add(name)
+            ingredients.update(seen)
+        spellings: Dict[str, Counter] = {}
+        for line, n in lines.most_common():
+            spellings.setdefault(names[line], Counter())[phrases[line]] += n
+
+        # merge spellings that normalize alike, keeping the most common one for display
+        merged: Dict[Tuple[str, str], list] = {}
+        for kind, counts in (("title", titles), ("cuisine", cuisines), ("ingredient", ingredients)):
+            for text, n in counts.most_common():
+                key = (kind, _norm(text))
+                if not key[1]:
+                    continue
+                entry = merged.get(key)
+                if entry is None:
+                    shown = spellings[text].most_common(1)[0][0] if kind == "ingredient" else text
+                    merged[key] = [shown, n, slugs.get(text, "") if kind == "title" else ""]
+                else:
+                    entry[1] += n
+
+        # term ids are assigned best-first, so the smallest ids in a run are the answer
+        order = sorted(merged.items(), key=lambda kv: (-kv[1][1], KIND_ORDER[kv[0][0]], len(kv[0][1]), kv[0][1]))
+        self.texts: List[str] = [e[0] for _, e in order]
+        self.kinds: List[str] = [k[0] for k, _ in order]
+        self.weights: List[int] = [e[1] for _, e in order]
+        self.slugs: List[str] = [e[2] for _, e in order]    # titles only ("" otherwise)
+
+        pairs = []
+        for t, ((kind, norm), entry) in enumerate(order):
+            # both ingredient spellings are typeable: "curry leaf" and "curry leaves"
+            shown = _norm(entry[0]) if kind == "ingredient" else norm
+            for text in (norm, shown) if shown != norm else (norm,):
+                words = text.split(" ")
+                for k in range(len(words)):
+                    pairs.append((" ".join(words[k:]), t))
+        pairs.sort()
+        self.keys: List[str] = [k for k, _ in pairs]
+        self.terms = array("I", (t for _, t in pairs))
+        self._top = self._heavy_prefixes()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _scan(self, lo: int, hi: int, limit: int) -> Tuple[int, ...]:
+        return tuple(heapq.nsmallest(limit, set(self.terms[lo:hi])))
+
+    def _heavy_prefixes(self) -> Dict[str, Tuple[int, ...]]:
+        """Top SUGGEST_MAX term ids for every prefix whose run is longer than SCAN_MAX."""
+        keys, top = self.keys, {}
+        runs, depth = [(0, len(keys))], 1
+        while runs:
+            longer = []
+            for lo, hi in runs:
+                # the run shares depth - 1 chars; a key that is exactly those sorts first
+                while lo < hi and len(keys[lo]) < depth:
+                    lo += 1
+                while lo < hi:
+                    prefix = keys[lo][:depth]
+                    end = bisect_left(keys, prefix + "\uffff", lo, hi)
+                    if end - lo > SCAN_MAX:
+                        top[prefix] = self._scan(lo, end, SUGGEST_MAX)
+                        longer.append((lo, end))
+                    lo = end
+            runs, depth = longer, depth + 1
+        return top
+
+    def _best(self, prefix: str, limit: int) -> Tuple[int, ...]:
+        best = self._top.get(prefix)
+        if best is not None and limit <= SUGGEST_MAX:
+            return best[:limit]
+        lo = bisect_left(self.keys, prefix)
+        return self._scan(lo, bisect_left(self.keys, prefix + "\uffff", lo), limit)
+
+    def complete(self, q: str, limit: int = SUGGEST_LIMIT) -> List[Dict[str, object]]:
+        prefix = _norm(q)
+        if not prefix:
+            return []
+        best = self._best(prefix, limit)
+        out = []
+        for t in best:
+            item: Dict[str, object] = {"text": self.texts[t], "kind": self.kinds[t], "count": self.weights[t]}
+            if self.slugs[t]:
+                item["slug"] = self.slugs[t]
+            out.append(item)
+        return out
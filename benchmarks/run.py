@@ -0,0 +1,234 @@
+"""
+Performance benchmarks over synthetic catalogs (see benchmarks/synthetic.py).
+
+For each catalog size this times the loader (with peak traced memory), the
+loader/catalog lookups, search + fuzzy ranking, pantry matching,
+crud.list_for_region, facet counts, similar-recipe scoring, incremental
+reloads, and the main ASGI routes through the test client. Every timing
+reports p50/p95/p99/mean latency and throughput; results go to a JSON file
+that a later run can be compared against.
+
+    python -m benchmarks.run --sizes 1000,10000 --out benchmarks/results/today.json
+    python -m benchmarks.run --sizes 10000 --baseline benchmarks/results/today.json --max-regression 1.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.synthetic import CUISINES, write_json
+
+QUERIES = ["dal", "paneer", "chicken korma", "coconut milk", "spicy", "masala", "x", "royal mutton biryani", "kheer"]
+SIMILAR_BENCH_MAX = 20000
+PANTRIES = [["onion", "tomato", "paneer", "salt"], ["rice", "dal", "ghee"], ["chicken", "yogurt", "oil", "chili powder"]]
+
+
+# ---- measuring ----
+
+def stats(samples_ns: Sequence[int]) -> Dict[str, Any]:
+    s = sorted(samples_ns)
+    n = len(s)
+
+    def pct(p: float) -> float:
+        return round(s[min(n - 1, int(p * n))] / 1000, 1)
+
+    total = sum(s)
+    return {
+        "n": n,
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(s[-1] / 1000, 1),
+        "mean_us": round(total / n / 1000, 1),
+        "ops_per_sec": round(n / (total / 1e9), 1) if total else None,
+    }
+
+
+def bench(fn: Callable[[Any], Any], args: Sequence[Any], iterations: int,
+          before: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Call fn(arg) `iterations` times cycling through `args`; `before` runs untimed (e.g. clear caches)."""
+    samples = []
+    clock = time.perf_counter_ns
+    for k in range(iterations):
+        arg = args[k % len(args)]
+        if before is not None:
+            before()
+        t = clock()
+        fn(arg)
+        samples.append(clock() - t)
+    return stats(samples)
+
+
+def once(fn: Callable[[], Any], memory: bool = False) -> Dict[str, Any]:
+    if memory:
+        tracemalloc.start()
+    t = time.perf_counter()
+    fn()
+    out = {"seconds": round(time.perf_counter() - t, 4)}
+    if memory:
+        out["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    return out
+
+
+# ---- one catalog size ----
+
+def run_size(n: int, workdir: Path, iterations: int, route_iterations: int, memory: bool) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    from app import crud
+    from app.main import app
+    from app.utils import loader
+    from app.utils.cache import clear_all
+    from app.utils.facets import FacetIndex, normalize_filters
+    from app.utils.hot_reload import patch_snapshot
+    from app.utils.similar import SimilarIndex
+    from app.utils.ranking import HAVE_FUZZ, rank
+    from app.utils.stream import iter_recipes
+
+    path = workdir / f"catalog-{n}.json"
+    write_json(path, n)
+    out: Dict[str, Any] = {"file_mb": round(path.stat().st_size / 2**20, 2)}
+
+    # loader: timed on its own, then again under tracemalloc for the peak
+    out["load"] = once(lambda: loader.load_catalog(path, None))
+    if memory:
+        out["load_memory"] = once(lambda: loader.load_catalog(path, None), memory=True)
+    snap = loader.load_catalog(path, None)
+    # all-pairs similar-recipe scoring is quadratic: timed up to SIMILAR_BENCH_MAX, otherwise
+    # stubbed out so a background scoring thread doesn't skew every number below
+    if n <= SIMILAR_BENCH_MAX:
+        out["similar_build"] = once(lambda: snap.similar)
+    else:
+        vars(snap)["similar"] = SimilarIndex.build([])
+    loader._install(snap)
+
+    rnd = random.Random(n)
+    slugs = [snap.recipes[rnd.randrange(len(snap.recipes))].slug for _ in range(256)]
+    cuisines = [c.lower() for c in CUISINES] + ["indian", "south"]
+
+    out["get_recipe"] = bench(loader.get_recipe, slugs, iterations)
+    out["get_recipes_by_cuisine"] = bench(loader.get_recipes_by_cuisine, cuisines, iterations, before=clear_all)
+    out["basic_search"] = bench(loader.basic_search, QUERIES, iterations, before=clear_all)
+    if HAVE_FUZZ:
+        out["fuzzy_rank"] = bench(lambda q: rank(snap, q, snap.search(q)), QUERIES, iterations, before=clear_all)
+    out["pantry_build"] = once(lambda: snap.pantry)
+    out["pantry_rank"] = bench(lambda p: snap.pantry.rank(p), PANTRIES, iterations)
+
+    regions = {"dishes_by_region": {c: [r.slug for r in snap.take(snap.cuisine_ids(c.lower())[:50])] for c in CUISINES}}
+    out["list_for_region"] = bench(lambda c: crud.list_for_region(c, snap.recipes, regions), CUISINES,
+                                   max(1, iterations // 10))
+    out["facets_build"] = once(lambda: FacetIndex(snap.recipes, snap.regions))
+    facet_filters = [normalize_filters(cuisine=[c.lower()], servings=["4"]) for c in CUISINES]
+    out["facet_counts"] = bench(lambda f: snap.facets.counts(f, 30), facet_filters, iterations)
+
+    records = loader._dedupe(iter_recipes(path))
+    out["reload_parse"] = once(lambda: loader._dedupe(iter_recipes(path)))
+    out["reload_noop"] = once(lambda: patch_snapshot(snap, records))
+    edited = list(records)
+    edited[len(edited) // 2] = edited[len(edited) // 2].__class__.from_dict(
+        edited[len(edited) // 2].to_dict(), title="Benchmark Edit")
+    out["reload_one_edit"] = once(lambda: patch_snapshot(snap, edited))
+
+    # full ASGI round trips (page/result caches warm up as they would in production)
+    client = TestClient(app)
+    routes = {
+        "GET /recipes": lambda _: client.get("/recipes?limit=48"),
+        "GET /recipes/cuisine": lambda c: client.get(f"/recipes/cuisine/{c}?limit=48"),
+        "GET /recipes/{slug}": lambda s: client.get(f"/recipes/{s}"),
+        "GET /api/recipes/{slug}/similar": lambda s: client.get(f"/api/recipes/{s}/similar"),
+        "GET /search": lambda q: client.get("/search", params={"q": q}),
+        "GET /api/recipes": lambda _: client.get("/api/recipes?limit=100"),
+        "GET /api/recipes/search": lambda q: client.get("/api/recipes/search", params={"q": q}),
+        "GET /pantry": lambda p: client.get("/pantry", params={"items": ",".join(p)}),
+    }
+    args = {"GET /recipes/cuisine": cuisines, "GET /recipes/{slug}": slugs, "GET /api/recipes/{slug}/similar": slugs,
+            "GET /search": QUERIES,
+            "GET /api/recipes/search": QUERIES, "GET /pantry": PANTRIES}
+    for name, call in routes.items():
+        out[name] = bench(call, args.get(name, [None]), route_iterations)
+    return out
+
+
+# ---- reporting ----
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print p50 (or seconds) ratios vs the baseline; return the benchmarks slower than `max_regression`x."""
+    slow = []
+    for size, benches in current["results"].items():
+        base = baseline.get("results", {}).get(size, {})
+        for name, cur in benches.items():
+            old = base.get(name)
+            if not isinstance(cur, dict) or not isinstance(old, dict):
+                continue
+            key = "p50_us" if "p50_us" in cur else "seconds"
+            if not old.get(key):
+                continue
+            ratio = cur[key] / old[key]
+            flag = "  <-- slower" if ratio > max_regression else ""
+            print(f"{size:>8} {name:<28} {old[key]:>12} -> {cur[key]:>12} {key:<8} x{ratio:.2f}{flag}")
+            if flag:
+                slow.append(f"{size}:{name}")
+    return slow
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    p.add_argument("--sizes", default="1000,10000", help="comma-separated catalog sizes (e.g. 1000,10000,100000,1000000)")
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--route-iterations", type=int, default=100)
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc load pass")
+    p.add_argument("--out", type=Path, default=None)
+    p.add_argument("--baseline", type=Path, default=None)
+    p.add_argument("--max-regression", type=float, default=1.25)
+    args = p.parse_args(argv)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="dishcovery-bench-") as tmp:
+        for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+            print(f"== {n} recipes", file=sys.stderr)
+            report["results"][str(n)] = run_size(n, Path(tmp), args.iterations, args.route_iterations,
+                                                 not args.no_memory)
+    report["meta"]["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    out = args.out or Path("benchmarks/results") / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"wrote {out}", file=sys.stderr)
+
+    if args.baseline:
+        slow = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.max_regression)
+        if slow:
+            print(f"{len(slow)} regression(s) over x{args.max_regression}: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""
+Deterministic synthetic catalogs shaped like data/seed_recipes.json.
+
+Cuisines and ingredients follow Zipf-like weights (a handful of regions and
+staples - salt, oil, onion - dominate, with a long tail), ingredient lines
+carry quantities/units/notes like the real data, and the same (n, seed)
+always produces byte-identical output.
+
+    python -m benchmarks.synthetic 100000 > /tmp/catalog.json
+"""
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, TextIO, Union
+
+CUISINES = [
+    "North Indian", "South Indian", "West Indian", "East Indian", "Northeast Indian",
+    "Central Indian", "Pan-Indian", "Indo-Chinese", "Mughlai", "Goan", "Kashmiri",
+    "Chettinad", "Bengali", "Gujarati", "Rajasthani", "Punjabi",
+]
+STAPLES = ["salt", "oil", "onion", "tomato", "ginger-garlic paste", "turmeric", "chili powder",
+           "cumin seeds", "garam masala", "coriander leaves", "ghee", "green chili", "water"]
+LONG_TAIL = [
+    "basmati rice", "chicken", "mutton", "paneer", "potato", "cauliflower", "spinach", "chickpeas",
+    "kidney beans", "toor dal", "moong dal", "urad dal", "yogurt", "cream", "butter", "milk",
+    "coconut", "coconut milk", "curry leaves", "mustard seeds", "tamarind", "jaggery", "besan",
+    "wheat flour", "rice flour", "semolina", "poha", "fish", "prawns", "egg", "peas", "carrot",
+    "beans", "okra", "brinjal", "bottle gourd", "capsicum", "cashews", "raisins", "saffron",
+    "cardamom", "cloves", "cinnamon", "bay leaf", "fenugreek leaves", "asafoetida", "lemon",
+    "mint", "pav", "bamboo shoot", "pork", "ragi flour", "corn", "sugar", "vinegar",
+]
+UNITS = ["", "1 tsp ", "2 tsp ", "1 tbsp ", "2 tbsp ", "1 cup ", "2 cups ", "250g ", "500g ", "1 ", "2 ", "a pinch of "]
+NOTES = ["", "", "", " (chopped)", " (sliced)", " (optional)", " (to taste)", " (soaked)"]
+DISHES = ["Curry", "Masala", "Biryani", "Pulao", "Dal", "Sabzi", "Fry", "Korma", "Kebab", "Tikka",
+          "Paratha", "Dosa", "Idli", "Halwa", "Kheer", "Chaat", "Pakora", "Rasam", "Sambar", "Thali"]
+STYLES = ["Spicy", "Home-style", "Quick", "Smoky", "Royal", "Street", "Temple", "Village", "Festive", "Classic"]
+
+
+def _weights(n: int, s: float = 1.1) -> List[float]:
+    return [1.0 / (k + 1) ** s for k in range(n)]
+
+
+def generate(n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield `n` raw recipe dicts (unique slugs) without holding them all."""
+    rnd = random.Random(seed)
+    cw, tw = _weights(len(CUISINES)), _weights(len(LONG_TAIL), 0.9)
+    for i in range(n):
+        main = rnd.choices(LONG_TAIL, tw, k=rnd.randint(2, 6))
+        staples = rnd.sample(STAPLES, rnd.randint(3, 8))
+        lines = []
+        for name in dict.fromkeys(main + staples):   # unique, order kept
+            lines.append(f"{rnd.choice(UNITS)}{name}{rnd.choice(NOTES)}")
+        title = f"{rnd.choice(STYLES)} {main[0].title()} {rnd.choice(DISHES)}"
+        yield {
+            "slug": f"{title.lower().replace(' ', '-')}-{i}",
+            "title": title,
+            "cuisine": rnd.choices(CUISINES, cw)[0],
+            "time_total": rnd.choice([10, 15, 20, 30, 45, 60, 90, 120]),
+            "servings": rnd.choice([1, 2, 2, 3, 4, 4, 4, 6, 8]),
+            "ingredients": lines,
+            "steps": [f"Step {k + 1}: {rnd.choice(['prep', 'temper', 'simmer', 'fry', 'rest', 'garnish'])} "
+                      f"the {rnd.choice(lines).split('(')[0].strip()}." for k in range(rnd.randint(3, 8))],
+        }
+
+
+def write_json(out: Union[TextIO, str, Path], n: int, seed: int = 0) -> None:
+    """Write a JSON array one record at a time (1M recipes never sit in memory)."""
+    if not hasattr(out, "write"):
+        with open(out, "w", encoding="utf-8") as f:
+            return write_json(f, n, seed)
+    out.write("[")
+    for i, r in enumerate(generate(n, seed)):
+        out.write(",\n" if i else "\n")
+        out.write(json.dumps(r, ensure_ascii=False))
+    out.write("\n]\n")
+
+
+if __name__ == "__main__":
+    write_json(sys.stdout, int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
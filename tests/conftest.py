@@ -1,15 +1,17 @@
 # tests/conftest.py
-# makes project root importable (so we can do: from main import app, import utils.loader, etc.)
+# makes project root importable (so we can do: from app.main import app, import app.utils.loader, etc.)
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import pytest
 from fastapi.testclient import TestClient
 
-# ✅ no "app." prefix anywhere
-from main import app
-import utils.loader as loader_mod
-import routes.recipes as recipes_routes
+# ✅ import through the "app" package so relative imports inside it resolve
+from app.main import app
+import app.utils.loader as loader_mod
+import app.routes.recipes as recipes_routes
+from app.utils.catalog import build_snapshot
+from app.utils.hot_reload import ReloadReport
 
 
 @pytest.fixture(scope="session")
@@ -59,65 +61,26 @@ def fake_data():
 def monkeypatch_loader(monkeypatch, fake_data):
     """
     Patch loader + routes to use in-memory fake data (no disk, no CRUD).
-    We patch BOTH the loader module and the names already imported into routes.
+    Routes read everything through loader.get_snapshot(), so swapping in a
+    snapshot built from the fake data covers every page.
     """
-    # build maps from fake data
-    recipes_list = list(fake_data)
-    recipes_dict = {r["slug"]: r for r in recipes_list}
-
-    # ---- patch loader module (source of truth during tests) ----
-    monkeypatch.setattr(loader_mod, "RECIPES_LIST", recipes_list, raising=False)
-    monkeypatch.setattr(loader_mod, "RECIPES", recipes_dict, raising=False)
-
-    def _get_all():
-        return loader_mod.RECIPES_LIST
-
-    def _by_cuisine(c):
-        c = (c or "").lower()
-        seen = {}
-        for r in loader_mod.RECIPES_LIST:
-            if r.get("cuisine", "").lower() == c:
-                seen[r["slug"]] = r
-        return list(seen.values())
-
-    def _cuisines():
-        return sorted({r.get("cuisine", "") for r in loader_mod.RECIPES_LIST})
-
-    def _search(q, cuisine=None):
-        ql = (q or "").lower().strip()
-        pool = _by_cuisine(cuisine) if cuisine else loader_mod.RECIPES_LIST
-        if not ql:
-            return pool
-        hits = []
-        for r in pool:
-            hay = " ".join([r["title"], r["cuisine"]] + r.get("ingredients", [])).lower()
-            if ql in hay:
-                hits.append(r)
-        # de-dupe by slug
-        return list({r["slug"]: r for r in hits}.values())
+    regions = {"north": ["butter-chicken"], "south": ["ragi-ball", "masala-dosa"], "west": ["pav-bhaji"]}
+    snapshot = build_snapshot(loader_mod._normalize_list([dict(r) for r in fake_data]), regions=regions)
+    monkeypatch.setattr(loader_mod, "_SNAPSHOT", snapshot)
+    monkeypatch.setattr(loader_mod, "RECIPES_LIST", snapshot.recipes)
+    monkeypatch.setattr(loader_mod, "RECIPES", snapshot.by_slug)
 
     def _reload():
         # pretend reload succeeded; return count
-        return len(loader_mod.RECIPES_LIST)
-
-    def _counts():
-        from collections import Counter
-        return dict(Counter([r["cuisine"] for r in loader_mod.RECIPES_LIST]))
+        return len(loader_mod.get_snapshot().recipes)
 
-    monkeypatch.setattr(loader_mod, "get_all_recipes", _get_all, raising=False)
-    monkeypatch.setattr(loader_mod, "get_recipes_by_cuisine", _by_cuisine, raising=False)
-    monkeypatch.setattr(loader_mod, "get_all_cuisines", _cuisines, raising=False)
-    monkeypatch.setattr(loader_mod, "basic_search", _search, raising=False)
-    monkeypatch.setattr(loader_mod, "reload_data", _reload, raising=False)
-    monkeypatch.setattr(loader_mod, "cuisine_counts", _counts, raising=False)
+    def _reload_catalog():
+        snap = loader_mod.get_snapshot()
+        return ReloadReport("unchanged", len(snap.recipes), snap.version, 0.0)
 
-    # ---- patch attributes already imported inside routes.recipes ----
-    monkeypatch.setattr(recipes_routes, "RECIPES", recipes_dict, raising=False)
-    monkeypatch.setattr(recipes_routes, "get_all_recipes", _get_all, raising=False)
-    monkeypatch.setattr(recipes_routes, "get_recipes_by_cuisine", _by_cuisine, raising=False)
-    monkeypatch.setattr(recipes_routes, "get_all_cuisines", _cuisines, raising=False)
-    monkeypatch.setattr(recipes_routes, "reload_data", _reload, raising=False)
-    monkeypatch.setattr(recipes_routes, "cuisine_counts", _counts, raising=False)
+    monkeypatch.setattr(loader_mod, "reload_data", _reload)
+    monkeypatch.setattr(recipes_routes, "reload_catalog", _reload_catalog)
+    return snapshot
 
 
 @pytest.fixture()
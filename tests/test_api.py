@@ -0,0 +1,57 @@
+import json
+
+
+def test_api_list_projects_fields_and_pages(client):
+    r = client.get("/api/recipes", params={"limit": 3})
+    assert r.status_code == 200 and r.headers["content-type"].startswith("application/json")
+    data = r.json()
+    assert [x["slug"] for x in data["items"]] == ["butter-chicken", "masala-dosa", "ragi-ball"]
+    assert "steps" not in data["items"][0] and data["next_cursor"]
+
+    rest = client.get("/api/recipes", params={"limit": 3, "cursor": data["next_cursor"], "fields": "slug,steps"}).json()
+    assert rest == {"items": [{"slug": "pav-bhaji", "steps": ["s1", "s2", "s3"]}], "next_cursor": None}
+
+    assert client.get("/api/recipes", params={"fields": "slug,password"}).status_code == 400
+    assert client.get("/api/recipes", params={"cursor": "zzz"}).status_code == 400
+
+
+def test_api_detail_cuisine_and_search(client):
+    full = client.get("/api/recipes/masala-dosa").json()
+    assert full["ingredients"][0] == "dosa batter" and set(full) == {
+        "slug", "title", "cuisine", "time_total", "servings", "ingredients", "steps"}
+    assert client.get("/api/recipes/masala-dosa", params={"fields": "title"}).json() == {"title": "Masala Dosa"}
+    assert client.get("/api/recipes/nope").status_code == 404
+
+    south = client.get("/api/recipes/cuisine/south indian", params={"fields": "slug"}).json()
+    assert south["items"] == [{"slug": "masala-dosa"}, {"slug": "ragi-ball"}]
+    hits = client.get("/api/recipes/search", params={"q": "dosa", "fields": "slug"}).json()
+    assert hits["items"][0] == {"slug": "masala-dosa"}
+
+
+def test_api_export_streams_ndjson(client):
+    r = client.get("/api/recipes/export.ndjson", params={"fields": "slug,cuisine"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert rows[0] == {"slug": "butter-chicken", "cuisine": "North Indian"} and len(rows) == 4
+
+
+def test_api_search_cursors_reach_every_hit(client, monkeypatch):
+    import app.utils.loader as loader_mod
+    from app.utils.catalog import build_snapshot
+
+    raw = [{"slug": f"dal-{i}", "title": f"Dal {i}", "cuisine": "North Indian", "time_total": 10,
+            "servings": 2, "ingredients": ["toor dal"], "steps": ["s"]} for i in range(130)]
+    monkeypatch.setattr(loader_mod, "_SNAPSHOT", build_snapshot(loader_mod._normalize_list(raw)))
+
+    everything = client.get("/api/recipes/search", params={"q": "dal", "limit": 200, "fields": "slug"}).json()
+    assert len(everything["items"]) == 130 and everything["next_cursor"] is None
+
+    walked, cursor = [], None
+    while True:
+        params = {"q": "dal", "limit": 30, "fields": "slug", **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/recipes/search", params=params).json()
+        walked += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert walked == everything["items"]
@@ -0,0 +1,22 @@
+import io
+import json
+
+from benchmarks.run import stats
+from benchmarks.synthetic import generate, write_json
+
+
+def test_synthetic_catalog_is_deterministic_and_loadable():
+    buf = io.StringIO()
+    write_json(buf, 200, seed=7)
+    raw = json.loads(buf.getvalue())
+    assert raw == list(generate(200, seed=7)) != list(generate(200, seed=8))
+    assert len({r["slug"] for r in raw}) == 200
+
+    import app.utils.loader as loader_mod
+    assert len(loader_mod._normalize_list(raw)) == 200
+
+
+def test_stats_percentiles():
+    s = stats([i * 1000 for i in range(1, 101)])    # 1..100 us
+    assert (s["n"], s["p50_us"], s["p95_us"], s["p99_us"], s["max_us"]) == (100, 51.0, 96.0, 100.0, 100.0)
+    assert s["ops_per_sec"] == round(100 / (5050e3 / 1e9), 1)
@@ -0,0 +1,44 @@
+from app.utils.cache import LRUCache, RESULTS
+
+
+def test_lru_evicts_oldest_and_counts():
+    c = LRUCache("test-lru", maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1      # a is now most recent
+    c.set("c", 3)               # evicts b
+    assert c.get("b") is None
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["evictions"], s["size"]) == (1, 1, 1, 2)
+
+
+def test_ttl_expires(monkeypatch):
+    import app.utils.cache as cache_mod
+
+    now = [100.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    c = LRUCache("test-ttl", maxsize=4, ttl=10)
+    c.set("k", "v")
+    assert c.get("k") == "v"
+    now[0] += 11
+    assert c.get("k") is None
+    assert c.stats()["expirations"] == 1
+
+
+def test_search_results_are_cached_per_version(client, monkeypatch_loader):
+    before = RESULTS.hits
+    assert client.get("/search", params={"q": "dosa"}).status_code == 200
+    assert client.get("/search", params={"q": " DOSA "}).status_code == 200
+    assert RESULTS.hits > before
+    assert any(k[1] == monkeypatch_loader.version for k in list(RESULTS._data))
+
+
+def test_only_opted_in_caches_are_registered():
+    import pytest
+    from app.utils.cache import CACHES, cache_stats
+
+    LRUCache("test-private", maxsize=2)
+    assert "test-private" not in CACHES and set(cache_stats()) == {"results", "pages"}
+    with pytest.raises(ValueError):
+        LRUCache("results", register=True)
+    assert CACHES["results"] is RESULTS
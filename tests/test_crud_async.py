@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import crud_async, schemas
+from app.database import Base, async_url, engine_options
+
+
+def test_async_url_and_pool_options():
+    assert async_url("sqlite:///./recipes.db") == "sqlite+aiosqlite:///./recipes.db"
+    assert async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
+    opts = engine_options("postgresql+asyncpg://db/app")
+    assert {"pool_size", "max_overflow", "pool_pre_ping", "pool_recycle"} <= set(opts)
+    assert "pool_size" not in engine_options("sqlite+aiosqlite://")
+
+
+def test_async_crud_roundtrip(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'recipes.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            data = schemas.RecipeCreate(slug="poha", title="Poha", cuisine="West Indian", time_total=20,
+                                        servings=2, ingredients=["poha", "onion"], steps=["soak", "cook"])
+            created = await crud_async.create_recipe(db, data)
+            assert created.id and (await crud_async.get_recipe_by_slug(db, "poha")).title == "Poha"
+
+            updated = await crud_async.update_recipe(db, "poha", schemas.RecipeUpdate(servings=3))
+            assert updated.servings == 3 and updated.title == "Poha"
+            assert await crud_async.update_recipe(db, "nope", schemas.RecipeUpdate(servings=1)) is None
+            assert [r.slug for r in await crud_async.get_recipes(db)] == ["poha"]
+
+            assert await crud_async.delete_recipe(db, "poha") is True
+            assert await crud_async.delete_recipe(db, "poha") is False
+            assert await crud_async.get_recipes(db) == []
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,327 @@
+import io
+import json
+
+import app.utils.loader as loader_mod
+from app.utils.catalog import build_snapshot
+from app.utils.stream import iter_json_records, iter_recipes
+
+RAW = [
+    {"slug": "a", "title": "A", "cuisine": "X", "ingredients": ["salt"]},
+    {"slug": "b", "title": "B \"quoted\" [x]", "cuisine": "Y", "time_total": 12345},
+    "not a recipe",
+    {"slug": "a", "title": "A again", "cuisine": "X", "ingredients": ["pepper"]},
+]
+
+
+def test_stream_matches_json_load_at_any_chunk_size():
+    text = json.dumps(RAW, indent=1)
+    for chunk in (1, 3, 7, 64):
+        assert list(iter_json_records(io.StringIO(text), chunk)) == RAW
+        wrapped = json.dumps({"meta": {"n": [1, 2]}, "recipes": RAW})
+        assert list(iter_json_records(io.StringIO(wrapped), chunk)) == RAW
+
+
+def test_load_catalog_streams_json_and_ndjson(tmp_path):
+    as_json = tmp_path / "recipes.json"
+    as_json.write_text(json.dumps({"recipes": RAW}), encoding="utf-8")
+    as_ndjson = tmp_path / "recipes.ndjson"
+    as_ndjson.write_text("\n".join(json.dumps(r) for r in RAW), encoding="utf-8")
+    assert list(iter_recipes(as_ndjson)) == RAW
+
+    expected = build_snapshot(loader_mod._normalize_list(json.loads(json.dumps(RAW))))
+    for path in (as_json, as_ndjson):
+        snap = loader_mod.load_catalog(path)
+        # same dedupe as _normalize_list: last record wins, first position kept
+        assert [r["title"] for r in snap.recipes] == [r["title"] for r in expected.recipes] == ["A again", 'B "quoted" [x]']
+        assert snap.index.postings == expected.index.postings
+        assert [r["slug"] for r in snap.take(snap.search("pepper"))] == ["a"]
+        assert snap.search("salt") == ()
+
+
+def test_records_are_slotted_immutable_and_dict_compatible():
+    import pytest
+    from app.utils.records import Recipe
+
+    a = loader_mod._normalize_one({"slug": " masala-dosa ", "title": "Masala Dosa", "cuisine": "x",
+                                   "ingredients": ["Salt"], "steps": ["s1"], "image": "d.jpg"})
+    b = loader_mod._normalize_one({"slug": "idli", "cuisine": "South Indian", "ingredients": ["Salt"]})
+    assert isinstance(a, Recipe) and not hasattr(a, "__dict__")
+    assert a.cuisine == a["cuisine"] == "South Indian"   # REGION_BY_SLUG override
+    assert a.cuisine_norm == "south indian" and a.steps == ("s1",)
+    assert a.get("image") == "d.jpg" and a.get("nope", 1) == 1
+    assert a.ingredients[0] is b.ingredients[0] and a.cuisine is b.cuisine
+    with pytest.raises(AttributeError):
+        a.title = "x"
+    assert a.to_dict()["ingredients"] == ["Salt"]
+
+
+def test_compiled_catalog_round_trip_and_staleness(tmp_path):
+    from app.utils import catalog_file
+
+    src = tmp_path / "recipes.json"
+    src.write_text(json.dumps(RAW + [{"slug": "c", "title": "Chana", "cuisine": "Y", "time_total": 5,
+                                      "extra_note": "keep me"}]), encoding="utf-8")
+    out = tmp_path / "catalog.snap"
+    builds = []
+
+    def build():
+        builds.append(1)
+        return loader_mod.load_catalog(src, None)
+
+    first = catalog_file.load_or_build(out, {"recipes": src}, build)
+    second = catalog_file.load_or_build(out, {"recipes": src}, build)
+    assert len(builds) == 1
+    assert list(second.recipes) == list(first.recipes)
+    assert second.recipe("c").get("extra_note") == "keep me"
+    assert {g: list(p) for g, p in second.index.postings.items()} == {g: list(p) for g, p in first.index.postings.items()}
+    assert second.take(second.search("chana", "y")) == [second.recipe("c")]
+    header, opened = catalog_file.open_catalog(out)
+    assert header["count"] == 3 and opened.recipes._kept == [None] * 3     # nothing decoded on open
+    assert opened.recipe("c") is opened.recipes[2]
+
+    src.write_text(json.dumps(RAW), encoding="utf-8")   # content change -> rebuild
+    third = catalog_file.load_or_build(out, {"recipes": src}, build)
+    assert len(builds) == 2 and third.recipe("c") is None
+
+
+def test_shared_catalog_generations_are_mapped_and_switched(tmp_path):
+    from app.utils.shared_catalog import SharedCatalog
+
+    src = tmp_path / "recipes.json"
+    src.write_text(json.dumps(RAW), encoding="utf-8")
+    build = lambda: loader_mod.load_catalog(src, None)  # noqa: E731
+    worker_a = SharedCatalog(tmp_path / "shared", {"recipes": src}, build, poll_interval=0)
+    worker_b = SharedCatalog(tmp_path / "shared", {"recipes": src}, build, poll_interval=0)
+
+    a, b = worker_a.open(), worker_b.open()
+    assert worker_a.generation == worker_b.generation == "gen-000001.snap"
+    expected = build()
+    assert list(b.recipes) == list(expected.recipes)
+    assert b.recipe("b") == expected.recipe("b") and b.recipe("zzz") is None
+    assert b.take(b.search("pepper")) == expected.take(expected.search("pepper"))
+    assert b.titles[0] == "a again" and b.index.texts[1] == expected.index.texts[1]
+
+    src.write_text(json.dumps(RAW + [{"slug": "d", "title": "Dal"}]), encoding="utf-8")
+    worker_a.publish()
+    switched = worker_b.poll()
+    assert worker_b.generation == "gen-000002.snap"
+    assert switched.recipe("d").title == "Dal"
+    assert a.recipe("d") is None   # the old mapping is still readable
+
+
+def _recipes(n):
+    return [{"slug": f"r{i}", "title": f"Dish {i}", "cuisine": "X" if i % 2 else "Y",
+             "ingredients": [f"spice{i}", "salt"]} for i in range(n)]
+
+
+def test_patch_snapshot_applies_only_the_diff():
+    from app.utils.hot_reload import patch_snapshot
+    from app.utils.search_index import search_text
+
+    base = loader_mod._normalize_list(_recipes(10))
+    old = build_snapshot(base)
+    before = {q: old.take(old.search(q)) for q in ("spice", "dish 9", "salt")}
+
+    raw = _recipes(10)
+    raw[3]["title"] = "Tomato Rasam"
+    del raw[9], raw[5]
+    raw.append({"slug": "new", "title": "New Dal", "cuisine": "Z"})
+    records = loader_mod._normalize_list(raw)
+    new, diff, mode = patch_snapshot(old, records)
+
+    assert mode == "patched"
+    assert (diff.added, diff.changed, diff.removed) == (("new",), ("r3",), ("r5", "r9"))
+    full = build_snapshot(records)
+    assert sorted(new.recipes, key=lambda r: r.slug) == sorted(full.recipes, key=lambda r: r.slug)
+    assert new.index.texts == [search_text(r) for r in new.recipes]
+    for q in ("spice", "rasam", "dish 3", "dal", "salt", "s", "ish"):
+        assert {r.slug for r in new.take(new.search(q))} == {r.slug for r in full.take(full.search(q))}
+    assert {r.slug for r in new.in_cuisine("x")} == {r.slug for r in full.in_cuisine("x")}
+    # the live snapshot (and its posting lists) is untouched
+    assert {q: old.take(old.search(q)) for q in before} == before
+
+    assert patch_snapshot(new, records) == (None, diff.__class__(), "unchanged")
+
+
+def test_catalog_pages_across_a_removal():
+    from app.utils.hot_reload import patch_snapshot
+    from app.utils.pagination import catalog_page
+
+    old = build_snapshot(loader_mod._normalize_list(_recipes(12)))
+    first, cursor, _ = catalog_page(old, None, None, limit=5)
+    # one removal behind the reader, one ahead, one new recipe at the end
+    raw = [r for r in _recipes(12) if r["slug"] not in ("r1", "r8")] + [{"slug": "new", "title": "New Dal"}]
+    new, _, mode = patch_snapshot(old, loader_mod._normalize_list(raw))
+    assert mode == "patched"
+    assert [r.slug for r in new.recipes] == [r["slug"] for r in raw]
+    assert new.take(new.search("dish 9")) == [new.recipe("r9")]
+
+    seen = [r.slug for r in first]
+    while cursor:
+        page, cursor, _ = catalog_page(new, None, cursor, limit=5)
+        seen += [r.slug for r in page]
+    assert seen == [f"r{i}" for i in range(12) if i != 8] + ["new"]
+
+
+def test_similar_scorer_skips_superseded_snapshots_and_patches(monkeypatch):
+    import time
+
+    from app.utils import similar
+
+    monkeypatch.setattr(loader_mod, "SIMILAR_SYNC_MAX", 2)
+    monkeypatch.setattr(loader_mod, "_LAST_SIMILAR", None)
+    old = build_snapshot(loader_mod._normalize_list(_recipes(10)))
+    stale = build_snapshot(loader_mod._normalize_list(_recipes(10)))
+    raw = _recipes(10)
+    raw[4]["title"] = "Dish 4 Dal"
+    new = build_snapshot(loader_mod._normalize_list(raw))
+
+    loader_mod._build_similar(old)
+    builds = []
+    real = similar.SimilarIndex.build.__func__
+    monkeypatch.setattr(similar.SimilarIndex, "build", classmethod(lambda cls, *a, **kw: builds.append(1) or real(cls, *a, **kw)))
+    monkeypatch.setattr(loader_mod, "_SNAPSHOT", new)
+    loader_mod._score_similar(stale)    # replaced before the scorer gets to it
+    loader_mod._score_similar(new)
+    deadline = time.monotonic() + 10
+    while loader_mod._LAST_SIMILAR is not new and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert new.similar_ready and not stale.similar_ready
+    assert builds == []     # patched from `old`, no all-pairs scoring
+
+
+def test_reload_catalog_reports_and_keeps_version_when_unchanged(tmp_path, monkeypatch):
+    from app.utils.hot_reload import CatalogWatcher
+
+    data = tmp_path / "recipes.json"
+    data.write_text(json.dumps(_recipes(8)), encoding="utf-8")
+    monkeypatch.setattr(loader_mod, "DATA_FILE", data)
+    monkeypatch.setattr(loader_mod, "CUISINES_FILE", None)
+    monkeypatch.setattr(loader_mod, "_LAST_RELOAD", None)
+
+    first = loader_mod.reload_catalog()
+    assert (first.mode, first.total) == ("rebuilt", 8)
+    again = loader_mod.reload_catalog()
+    assert again.mode == "unchanged" and again.version == first.version
+
+    calls = []
+    watcher = CatalogWatcher([data], lambda: calls.append(loader_mod.reload_catalog()), interval=0)
+    assert watcher.check() is False
+    raw = _recipes(8)
+    raw[0]["ingredients"].append("ghee")
+    data.write_text(json.dumps(raw), encoding="utf-8")
+    assert watcher.check() is False     # waits one tick for the write to settle
+    assert watcher.check() is True
+    assert calls[0].mode == "patched" and calls[0].diff.changed == ("r0",)
+    assert loader_mod.get_snapshot().version > first.version
+    assert [r.slug for r in loader_mod.basic_search("ghee")] == ["r0"]
+    assert loader_mod.last_reload() is calls[0]
+
+
+def _shard(path, records, ndjson=False):
+    text = "\n".join(json.dumps(r) for r in records) if ndjson else json.dumps({"recipes": records})
+    path.write_text(text, encoding="utf-8")
+
+
+def test_shard_directory_validates_in_parallel_and_merges_deterministically(tmp_path, monkeypatch):
+    from app.utils import shards
+
+    full = {"cuisine": "X", "time_total": 10, "servings": 2, "ingredients": ["salt"], "steps": ["s"]}
+    _shard(tmp_path / "10-north.json", [
+        {**full, "slug": "a", "title": "A"},
+        {**full, "slug": "butter-chicken", "title": "BC", "cuisine": "Wrong"},
+        {**full, "slug": "Bad Slug", "title": "nope"},
+    ])
+    _shard(tmp_path / "20-editor.ndjson", [
+        {**full, "slug": "b", "title": "B", "image": "b.jpg"},
+        {**full, "slug": "a", "title": "A edited"},
+        {"slug": "c", "title": "C"},
+    ], ndjson=True)
+    (tmp_path / ".draft.json").write_text("[not json", encoding="utf-8")
+    monkeypatch.setattr(shards, "PARALLEL_MIN_BYTES", 0)     # go through the process pool
+
+    loaded = shards.ShardedCatalog(tmp_path, loader_mod.REGION_BY_SLUG, workers=2).load()
+    assert [(r.slug, r.title) for r in loaded.records] == [("a", "A edited"), ("butter-chicken", "BC"), ("b", "B")]
+    assert loaded.records[1].cuisine_norm == "north indian" and loaded.records[2].get("image") == "b.jpg"
+    assert loaded.conflicts == [("a", str(tmp_path / "20-editor.ndjson"), str(tmp_path / "10-north.json"))]
+    north, editor = loaded.as_dict()["shards"]
+    assert (north["loaded"], north["invalid"], north["overridden"]) == (2, 1, 1)
+    assert (editor["loaded"], editor["invalid"], editor["overridden"]) == (2, 1, 0)
+    assert "slug" in north["errors"][0] and "c" in editor["errors"][0]
+
+    snap = loader_mod.load_catalog(tmp_path, None)
+    assert [r.slug for r in snap.recipes] == ["a", "butter-chicken", "b"]
+
+
+def test_shard_directory_reload_reparses_only_changed_shards(tmp_path, monkeypatch):
+    import pytest
+    from app.utils import shards
+    from app.utils.hot_reload import CatalogWatcher
+
+    recipes = _recipes(6)
+    for r in recipes:
+        r.update(time_total=10, servings=2, steps=["s"])
+    _shard(tmp_path / "a.json", recipes[:3])
+    _shard(tmp_path / "b.json", recipes[3:])
+    monkeypatch.setattr(loader_mod, "DATA_FILE", tmp_path)
+    monkeypatch.setattr(loader_mod, "CUISINES_FILE", None)
+    monkeypatch.setattr(loader_mod, "_SHARDS", None)
+    monkeypatch.setattr(loader_mod, "_LAST_SHARDS", None)
+    assert loader_mod.reload_catalog().total == 6
+    assert set(loader_mod._sources()) == {"recipes/a.json", "recipes/b.json", "cuisines"}
+
+    parsed = []
+    real = shards.parse_shard
+    monkeypatch.setattr(shards, "parse_shard", lambda p, o: parsed.append(p) or real(p, o))
+    watcher = CatalogWatcher([tmp_path], loader_mod.reload_catalog, interval=0)
+    recipes[4]["ingredients"].append("ghee")
+    _shard(tmp_path / "b.json", recipes[3:])
+    assert watcher.check() is False and watcher.check() is True
+    assert parsed == [str(tmp_path / "b.json")]
+    assert [r.slug for r in loader_mod.basic_search("ghee")] == ["r4"]
+
+    (tmp_path / "b.json").write_text('{"recipes": [', encoding="utf-8")
+    with pytest.raises(ValueError, match="b.json"):
+        loader_mod.reload_catalog()
+    assert len(loader_mod.get_snapshot().recipes) == 6     # old catalog stays live
+
+
+def test_compile_cli_builds_from_a_shard_directory(tmp_path, capsys):
+    from app.utils import catalog_file
+
+    shards = tmp_path / "recipes"
+    shards.mkdir()
+    full = {"cuisine": "X", "time_total": 10, "servings": 2, "ingredients": ["salt"], "steps": ["s"]}
+    _shard(shards / "a.json", [{**full, "slug": "a", "title": "A"}])
+    _shard(shards / "b.ndjson", [{**full, "slug": "b", "title": "B"}], ndjson=True)
+    cuisines = tmp_path / "cuisines.json"
+    cuisines.write_text("{}", encoding="utf-8")
+    out = tmp_path / "catalog.snap"
+
+    assert catalog_file.main(["build", "--recipes", str(shards), "--cuisines", str(cuisines), "--out", str(out)]) == 0
+    assert "2 recipes" in capsys.readouterr().out
+    sources = loader_mod.data_sources(shards, cuisines)
+    assert set(sources) == {"recipes/a.json", "recipes/b.ndjson", "cuisines"}
+
+    def rebuild():
+        raise AssertionError("compiled catalog should still be fresh")
+    snap = catalog_file.load_or_build(out, sources, rebuild, loader_mod.normalizer_salt())
+    assert [r.slug for r in snap.recipes] == ["a", "b"]
+
+
+def test_shard_pool_runs_from_a_background_thread(tmp_path, monkeypatch):
+    import threading
+    from app.utils import shards
+
+    full = {"cuisine": "X", "time_total": 10, "servings": 2, "ingredients": ["salt"], "steps": ["s"]}
+    for k in range(3):
+        _shard(tmp_path / f"{k}.json", [{**full, "slug": f"r{k}-{i}", "title": "T"} for i in range(50)])
+    monkeypatch.setattr(shards, "PARALLEL_MIN_BYTES", 0)
+    assert shards._MP_CONTEXT.get_start_method() == "spawn"
+
+    out = {}
+    # like the lifespan startup pipeline: not the main thread, event loop elsewhere
+    t = threading.Thread(target=lambda: out.update(load=shards.ShardedCatalog(tmp_path, {}, workers=3).load()))
+    t.start()
+    t.join(60)
+    assert len(out["load"].records) == 150 and [s.loaded for s in out["load"].shards] == [50, 50, 50]
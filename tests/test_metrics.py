@@ -0,0 +1,36 @@
+from app.utils.metrics import Counter, Histogram, REGISTRY
+
+
+def test_metrics_endpoint_reports_routes_search_and_caches(client):
+    assert client.get("/recipes/masala-dosa").status_code == 200
+    client.get("/search", params={"q": "dosa"})
+    client.get("/no/such/page")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    # labelled by route template, not the raw path
+    assert 'dishcovery_http_requests_total{method="GET",route="/recipes/{slug}",status="200"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'dishcovery_http_request_duration_seconds_bucket{method="GET",route="/search",le="+Inf"}' in body
+    assert 'dishcovery_http_requests_in_flight{method="GET"} 1' in body  # the scrape itself
+    assert "dishcovery_search_candidates_count" in body
+    assert 'dishcovery_template_render_seconds_count{template="recipe_detail.html"}' in body
+    assert 'dishcovery_cache_hits_total{cache="results"}' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("test_latency_seconds", "t", ("op",), buckets=(0.1, 1.0))
+    REGISTRY.remove(h)
+    for v in (0.05, 0.5, 0.5, 3):
+        h.observe(v, "x")
+    lines = h.render()
+    assert 'test_latency_seconds_bucket{op="x",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{op="x",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{op="x",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_sum{op="x"} 4.05' in lines and h.count("x") == 4
+
+    c = Counter("test_total", "t", ("q",))
+    REGISTRY.remove(c)
+    c.inc('a"b')
+    assert 'test_total{q="a\\"b"} 1' in c.render()
@@ -16,3 +16,80 @@ def test_pantry_route_exists_or_skip(client):
     assert r.status_code == 200
     # just a light sanity check on content
     assert "pantry" in r.text.lower() or "ingredients" in r.text.lower()
+
+
+def test_pantry_ranks_by_fewest_missing(client):
+    r = client.get("/pantry", params={"items": "pav, potatoes, tomato, butter"})
+    assert r.status_code == 200
+    body = r.text.lower()
+    assert body.index("pav bhaji") < body.index("butter chicken")
+    assert "you have everything" in body
+
+
+def test_normalize_ingredient():
+    from app.utils.pantry import normalize_ingredient
+
+    assert normalize_ingredient("2 onions (sliced)") == "onion"
+    assert normalize_ingredient("500g boneless chicken") == "boneless chicken"
+    assert normalize_ingredient("2 tbsp oil or ghee") == "oil ghee"
+    assert normalize_ingredient("2 green chilies") == "green chili"
+    assert normalize_ingredient("Curry leaves") == "curry leaf"
+    assert normalize_ingredient("knives") == "knife" and normalize_ingredient("olives") == "olive"
+    # a parenthesised list is part of the ingredient, a parenthesised note isn't
+    assert normalize_ingredient("Dal tadka (toor dal, turmeric, ghee)") == "dal tadka toor turmeric ghee"
+
+
+def test_pantry_matches_plurals_and_listed_contents():
+    from app.utils.pantry import PantryIndex
+    from app.utils.records import Recipe
+
+    recipes = [
+        Recipe("a", "A", ingredients=["2 green chilies", "Curry leaves"]),
+        Recipe("b", "B", ingredients=["Dal tadka (toor dal, turmeric, ghee)"]),
+    ]
+    index = PantryIndex(recipes)
+    assert [m.id for m in index.rank(["chili", "curry leaf"])] == [0]
+    assert [(m.id, m.missing) for m in index.rank(["green chili"])] == [(0, ("Curry leaves",))]
+    assert [m.id for m in index.rank(["turmeric"])] == [1]
+
+
+def test_substitution_closure_and_batch_check():
+    from app import crud
+    from app.utils.substitutions import SubstitutionGraph
+
+    g = SubstitutionGraph(
+        equivalents=[["yogurt", "curd"]],
+        substitutes={"butter": ["ghee"], "ghee": ["oil"], "sugar": ["jaggery"]},
+    )
+    have = g.pantry_bitmap(["Oil", "2 cups curd"])
+    # chains are followed (oil -> ghee -> butter), but only in the listed direction
+    assert g.substitute("50g unsalted butter", have) == "oil"
+    assert g.substitute("1 cup yogurt", have) == "curd"
+    assert g.substitute("oil", g.pantry_bitmap(["butter"])) is None
+
+    recipes = [
+        {"slug": "a", "ingredients": ["butter", "sugar", "salt"]},
+        {"slug": "b", "ingredients": ["ghee", "salt"]},
+    ]
+    got = crud.ingredients_missing_batch(recipes, ["salt", "oil", "jaggery"], graph=g)
+    assert got == [
+        {"slug": "a", "missing": ["butter", "sugar"], "substitutes": {"butter": "oil", "sugar": "jaggery"}},
+        {"slug": "b", "missing": ["ghee"], "substitutes": {"ghee": "oil"}},
+    ]
+    # the single-recipe check keeps its literal matching
+    assert crud.ingredients_missing(recipes[0], ["salt", "oil"]) == ["butter", "sugar"]
+
+
+def test_pantry_page_suggests_substitutes(client):
+    body = client.get("/pantry", params={"items": "pav, potato, tomato, ghee"}).text
+    assert "Swap in: ghee for butter" in body
+
+
+def test_bitmap_helpers_round_trip():
+    from app.utils.bitmaps import bitmap_ids, iter_bits, keep_ids, to_bitmap
+
+    ids = [0, 3, 8, 9, 63, 64, 199]
+    bm = to_bitmap(ids, 200)
+    assert bm.bit_count() == len(ids)
+    assert list(iter_bits(bm)) == list(bitmap_ids(bm, 200)) == ids
+    assert keep_ids([199, 5, 8, 0], bm, 200) == (199, 8, 0)
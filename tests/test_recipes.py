@@ -40,3 +40,114 @@ def test_reload_and_stats(client):
     assert data["total"] >= 4
     # must count cuisines
     assert "North Indian" in data["cuisines"]
+
+
+def test_snapshot_buckets_and_swap(monkeypatch_loader):
+    import app.utils.loader as loader_mod
+    from app.utils.catalog import build_snapshot
+
+    snap = loader_mod.get_snapshot()
+    assert [r["slug"] for r in loader_mod.get_recipes_by_cuisine("south indian")] == ["masala-dosa", "ragi-ball"]
+    # partial fallback keeps catalog order across buckets
+    assert [r["slug"] for r in loader_mod.get_recipes_by_cuisine("indian")] == [r["slug"] for r in snap.recipes]
+    assert loader_mod.get_all_cuisines() == ["North Indian", "South Indian", "West Indian"]
+    assert loader_mod.cuisine_counts()["South Indian"] == 2
+
+    newer = build_snapshot(snap.recipes[:1])
+    loader_mod._install(newer)
+    assert newer.version > snap.version
+    assert loader_mod.get_recipe("masala-dosa") is None
+    assert snap.recipe("masala-dosa") is not None  # old readers keep a consistent view
+
+
+def test_pages_are_cached_with_etags(client):
+    from app.utils.page_cache import PAGES
+
+    r = client.get("/recipes/masala-dosa")
+    etag = r.headers["etag"]
+    assert r.status_code == 200 and etag.startswith('"')
+    assert "max-age" in r.headers["cache-control"]
+
+    hits = PAGES.hits
+    again = client.get("/recipes/masala-dosa")
+    assert PAGES.hits == hits + 1 and again.headers["etag"] == etag and again.text == r.text
+
+    nm = client.get("/recipes/masala-dosa", headers={"If-None-Match": etag})
+    assert nm.status_code == 304 and nm.content == b""
+    assert client.get("/recipes/pav-bhaji", headers={"If-None-Match": etag}).status_code == 200
+
+    # browse page is big enough to get a pre-gzipped variant with its own tag
+    gz = client.get("/recipes", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/recipes", headers={"Accept-Encoding": "identity"})
+    assert gz.headers.get("content-encoding") == "gzip" and "content-encoding" not in plain.headers
+    assert gz.text == plain.text and gz.headers["etag"] != plain.headers["etag"]
+    assert client.get("/recipes", headers={"If-None-Match": plain.headers["etag"]}).status_code == 304
+
+    assert client.get("/recipes/not-a-slug/cook").status_code == 404
+
+
+def test_one_precompiled_template_env():
+    from pathlib import Path
+    import app.main as main_mod
+    import app.routes.recipes as recipes_routes
+    import app.routes.search as search_routes
+    from app.templating import TEMPLATE_DIR, precompile_templates, templates
+
+    assert main_mod.templates is recipes_routes.templates is search_routes.templates is templates
+    assert templates.env.auto_reload is False and templates.env.bytecode_cache is not None
+    assert precompile_templates() == len(list(Path(TEMPLATE_DIR).glob("*.html")))
+    assert len(templates.env.cache) >= len(list(Path(TEMPLATE_DIR).glob("*.html")))
+
+
+def test_browse_pages_with_opaque_cursors(client):
+    import re
+
+    seen, url = [], "/recipes?limit=3"
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        seen += re.findall(r'href="/recipes/([a-z0-9-]+)" class="card"', r.text)
+        nxt = re.search(r'href="(\?cursor=[^"]+)"', r.text)
+        url = "/recipes" + nxt.group(1).replace("&amp;", "&") if nxt else None
+    assert seen == ["butter-chicken", "masala-dosa", "ragi-ball", "pav-bhaji"]
+
+    first = client.get("/recipes/cuisine/south%20indian?limit=1")
+    cursor = re.search(r"cursor=([\w-]+)", first.text).group(1)
+    second = client.get(f"/recipes/cuisine/south%20indian?limit=1&cursor={cursor}")
+    assert "Masala Dosa" in first.text and "Ragi Ball" in second.text and "cursor=" not in second.text
+
+    assert client.get("/recipes?cursor=not-a-cursor").status_code == 400
+    assert client.get("/recipes?limit=100000").status_code == 422
+    assert "cursor=" in client.get("/search", params={"q": "a", "limit": 1}).text
+
+
+def test_facet_index_filters_and_live_counts(monkeypatch_loader):
+    from app import crud
+    from app.utils.facets import normalize_filters
+
+    snap = monkeypatch_loader
+    fi = snap.facets
+    slugs = lambda bm: [snap.recipes[i].slug for i in fi.ids(bm)]
+    # "quick South Indian for 3": fields AND, values within a field OR
+    assert slugs(fi.select(normalize_filters(region=["South"], servings=["3"]), max_time=30)) == ["ragi-ball"]
+    assert slugs(fi.select(normalize_filters(time=["30", "120"]))) == ["masala-dosa", "ragi-ball"]
+    assert fi.select(normalize_filters(cuisine=["nope"])) == 0
+
+    counts = fi.counts(normalize_filters(region=["south"]))
+    # a field's own filter doesn't shrink its counts; other fields' counts do
+    assert {r["value"]: r["count"] for r in counts["region"]} == {"north": 1, "south": 2, "west": 1}
+    assert {r["value"]: r["count"] for r in counts["servings"]} == {"3": 1, "4": 1}
+    assert [r["value"] for r in counts["time"]] == ["30", "60", "120"]  # bucket order, empty ones absent
+
+    # region map comes from the snapshot, in cuisines.json order
+    assert [r.slug for r in crud.list_for_region("south")] == ["ragi-ball", "masala-dosa"]
+    assert fi.keep([3, 1, 2, 0], fi.select(normalize_filters(region=["south", "west"]))) == (3, 1, 2)
+
+
+def test_browse_facets_filter_and_link(client):
+    r = client.get("/recipes", params={"region": "south", "max_time": 30})
+    assert r.status_code == 200
+    assert "Ragi Ball" in r.text and "Masala Dosa" not in r.text and "Pav Bhaji" not in r.text
+    # selected facet links back to the page without it
+    assert 'href="?max_time=30"' in r.text
+    assert client.get("/recipes", params={"servings": "4", "limit": 1}).text.count('class="card"') == 1
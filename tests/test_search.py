@@ -14,3 +14,165 @@ def test_search_with_cuisine_filter(client):
     body = r.text.lower()
     assert "masala dosa" in body
     assert "butter chicken" not in body
+
+
+def test_search_index_matches_substring_scan(fake_data):
+    from app.utils.search_index import SearchIndex, search_text
+
+    index = SearchIndex.build(fake_data)
+    for q in ["butter", "b", "to", "potato", "r chicken", "dosa batter", "nothing", ""]:
+        expected = [r["slug"] for r in fake_data if q in search_text(r)]
+        assert [r["slug"] for r in index.search_records(q)] == expected
+
+
+def test_rank_returns_top_k_best_first(monkeypatch_loader):
+    import pytest
+    pytest.importorskip("rapidfuzz")
+    from app.utils.ranking import rank
+
+    snap = monkeypatch_loader
+    ids = snap.search("butter")
+    ranked = rank(snap, "butter", ids, limit=1)
+    assert len(ranked) == 1
+    assert snap.recipes[ranked[0][1]]["slug"] == "butter-chicken"
+    assert rank(snap, "qqqq", snap.search("")) == []
+
+
+def test_fts_backend_ranks_filters_and_tracks_writes(client, monkeypatch, fake_data, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import app.routes.search as search_routes
+    from app import crud, fts, schemas
+    from app.seed import import_records
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'recipes.db'}")
+    if not fts.install_fts(engine):
+        import pytest
+        pytest.skip("SQLite built without FTS5")
+    fusion = {"slug": "dosa-pizza", "title": "Dosa Pizza", "cuisine": "South Indian Fusion", "time_total": 30,
+              "servings": 2, "ingredients": ["dosa batter", "potato", "cheese"], "steps": ["s1"]}
+    import_records(fake_data + [fusion], engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        assert [r.slug for r in fts.search(db, "butt")] == ["butter-chicken", "pav-bhaji"]  # title hit first
+        # cuisine: exact match when one exists (like the in-memory catalog), contains otherwise
+        assert [r.slug for r in fts.search(db, "potato", " south indian ")] == ["masala-dosa"]
+        assert sorted(r.slug for r in fts.search(db, "potato", "south")) == ["dosa-pizza", "masala-dosa"]
+        assert [r.slug for r in fts.search(db, "potato", limit=1, offset=1)] == [r.slug for r in fts.search(db, "potato")][1:2]
+        assert fts.search(db, '"; drop table recipes') == []
+        with monkeypatch.context() as m:
+            m.setattr(fts, "MAX_PAGE_SIZE", 2)
+            assert len(fts.search(db, "", limit=10_000)) == 3    # capped page + the next-page probe
+        crud.update_recipe(db, "pav-bhaji", schemas.RecipeUpdate(ingredients=["pav", "ghee"]))
+        crud.delete_recipe(db, "butter-chicken")
+        assert fts.search(db, "butter") == [] and [r.slug for r in fts.search(db, "ghee")] == ["pav-bhaji"]
+
+    monkeypatch.setattr(fts, "_ACTIVE", True)
+    monkeypatch.setattr(search_routes, "SessionLocal", Session)
+    r = client.get("/search", params={"q": "dos", "cuisine": "South Indian"})
+    assert r.status_code == 200 and "Masala Dosa" in r.text and "Pav Bhaji" not in r.text
+
+
+def test_suggest_completes_titles_cuisines_and_ingredients(client):
+    r = client.get("/search/suggest", params={"q": "Ma"})
+    assert r.status_code == 200
+    texts = [s["text"] for s in r.json()["suggestions"]]
+    assert "Masala Dosa" in texts
+    # word starts inside a title match too; titles link straight to the recipe
+    hit = client.get("/search/suggest", params={"q": "dos"}).json()["suggestions"]
+    assert {"text": "Masala Dosa", "kind": "title", "count": 1, "slug": "masala-dosa"} in hit
+    assert any(s["kind"] == "ingredient" and s["text"] == "dosa batter" for s in hit)
+
+    south = client.get("/search/suggest", params={"q": "south  in"}).json()["suggestions"]
+    assert south[0] == {"text": "South Indian", "kind": "cuisine", "count": 2}
+    assert client.get("/search/suggest", params={"q": "  "}).json()["suggestions"] == []
+    assert len(client.get("/search/suggest", params={"q": "c", "limit": 1}).json()["suggestions"]) == 1
+
+
+def test_suggest_prefix_table_matches_a_scan(monkeypatch):
+    import heapq
+    from bisect import bisect_left
+
+    from app.utils import suggest
+    from app.utils.records import Recipe
+
+    monkeypatch.setattr(suggest, "SCAN_MAX", 2)
+    recipes = [Recipe(f"r{i}", f"Dish {i % 7} Curry", ingredients=["curry leaf"] if i % 3 == 0 else ["Curry leaves", "chilies"])
+               for i in range(30)]
+    s = suggest.Suggester(recipes)
+    assert "cu" in s._top
+    for prefix in ("c", "cu", "curry", "curry l", "d", "dish 3", "ch", "x"):
+        lo = bisect_left(s.keys, prefix)
+        hi = bisect_left(s.keys, prefix + "\uffff")
+        for limit in (1, 8):
+            assert s._best(prefix, limit) == tuple(heapq.nsmallest(limit, set(s.terms[lo:hi])))
+    # merged by normalized name, shown as most recipes spell it, typeable either way
+    leaves = {"text": "curry leaves", "kind": "ingredient", "count": 30}
+    assert leaves in s.complete("curry leaves") and leaves in s.complete("curry leaf")
+
+
+def test_search_facets_narrow_hits_and_keep_cuisine_choices(client):
+    r = client.get("/search", params={"q": "potato", "region": "west"})
+    assert "Pav Bhaji" in r.text and "Masala Dosa" not in r.text
+    # potato hits: dosa (south indian) + pav bhaji (west indian); picking a cuisine keeps the other listed
+    r = client.get("/search", params={"q": "potato", "cuisine": "south indian"})
+    assert "Masala Dosa" in r.text and "Pav Bhaji" not in r.text
+    assert "West Indian (1)" in r.text
+
+
+def _dal_snapshot(n):
+    from app.utils.catalog import build_snapshot
+    from app.utils.loader import _normalize_list
+
+    raw = [{"slug": f"dal-{i}", "title": f"Dal {i}", "cuisine": "North Indian" if i % 2 else "South Indian",
+            "time_total": 10 if i % 3 else 50, "servings": 2, "ingredients": ["toor dal", "salt"], "steps": ["s"]}
+           for i in range(n)]
+    return build_snapshot(_normalize_list(raw), regions={"north": [f"dal-{i}" for i in range(1, n, 2)]})
+
+
+def test_rank_keeps_every_hit_above_the_cutoff():
+    import pytest
+    pytest.importorskip("rapidfuzz")
+    from app.utils.ranking import rank
+
+    snap = _dal_snapshot(120)
+    ranked = rank(snap, "dal", snap.search("dal"))
+    assert len(ranked) == 120
+    assert ranked == sorted(ranked, key=lambda p: (-p[0], p[1]))
+    assert rank(snap, "dal", snap.search("dal"), limit=7) == ranked[:7]
+
+
+def test_search_pages_walk_past_fifty_hits(client, monkeypatch):
+    import re
+    import app.utils.loader as loader_mod
+
+    snap = _dal_snapshot(130)
+    monkeypatch.setattr(loader_mod, "_SNAPSHOT", snap)
+    seen, cursor = [], None
+    for _ in range(10):
+        params = {"q": "dal", "limit": 40, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/search", params=params)
+        assert r.status_code == 200
+        seen += re.findall(r'class="card" href="/recipes/([\w-]+)"', r.text)
+        m = re.search(r"cursor=([\w-]+)&limit=40", r.text)
+        if not m:
+            break
+        cursor = m.group(1)
+    assert len(seen) == len(set(seen)) == 130
+
+
+def test_search_facets_filter_and_count_every_hit():
+    import app.routes.search as search_routes
+
+    snap = _dal_snapshot(130)
+    quick = [i for i in range(130) if i % 3]    # 10 minutes; the rest take 50
+    ids = search_routes._filtered_ids(snap, "dal", "", {"time": ("15",)}, None)
+    assert sorted(snap.recipes[i].slug for i in ids) == sorted(f"dal-{i}" for i in quick)
+
+    counts = search_routes._facet_counts(snap, "dal", "", {"time": ("15",)}, None)
+    assert {row["value"]: row["count"] for row in counts["time"]} == {"15": len(quick), "60": 130 - len(quick)}
+    north = sum(1 for i in quick if i % 2)
+    assert {row["value"]: row["count"] for row in counts["region"]} == {"north": north}
+    assert search_routes._filtered_ids(snap, "dal", "", {"time": ("15",), "region": ("north",)}, None) \
+        == tuple(i for i in search_routes.ranked_ids(snap, "dal", "") if i in quick and i % 2)
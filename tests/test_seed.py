@@ -0,0 +1,72 @@
+import json
+
+from sqlalchemy import create_engine, text
+
+from app.seed import import_records, import_recipes
+
+
+def test_bulk_import_upserts_and_reports(tmp_path):
+    raw = [
+        {"slug": "poha", "title": "Poha", "cuisine": "Maharashtrian", "ingredients": ["poha"], "steps": ["cook"]},
+        {"slug": "dosa", "title": "Dosa", "time_total": 30},
+        {"title": "no slug"},
+        {"slug": "bad", "title": "Bad", "servings": "two"},
+        {"slug": "dosa", "title": "Masala Dosa", "time_total": 30},
+    ]
+    src = tmp_path / "recipes.json"
+    src.write_text(json.dumps(raw), encoding="utf-8")
+    engine = create_engine(f"sqlite:///{tmp_path / 'recipes.db'}")
+
+    first = import_recipes(src, engine, batch_size=2, batches_per_txn=1)
+    # the duplicate "dosa" lands in a later batch, so it shows up as an update
+    assert (first.inserted, first.updated, first.unchanged, first.skipped) == (2, 1, 0, 2)
+    with engine.connect() as c:
+        rows = dict(c.execute(text("select slug, title from recipes")).all())
+    # same outcome as the loader: last duplicate wins
+    assert rows == {"poha": "Poha", "dosa": "Masala Dosa"}
+
+    raw[0]["steps"] = ["soak", "cook"]
+    src.write_text(json.dumps(raw), encoding="utf-8")
+    again = import_recipes(src, engine)
+    assert (again.inserted, again.updated, again.unchanged) == (0, 1, 1)
+    assert again.as_dict()["rows_per_sec"] > 0
+
+
+def test_keyset_pages_cover_the_table_once(tmp_path):
+    from sqlalchemy.orm import Session
+
+    from app import crud
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'recipes.db'}")
+    raw = [{"slug": f"r{i}", "title": f"R{i}", "cuisine": "AB"[i % 2]} for i in range(7)]
+    import_records(raw, engine)
+    with engine.begin() as c:   # rows written outside the importer can lack a cuisine
+        for i in (7, 8, 9):
+            c.execute(text(f"insert into recipes (slug, title, cuisine) values ('r{i}', 'R{i}', NULL)"))
+    with Session(engine) as db:
+        for order, expected in (("id", [f"r{i}" for i in range(10)]),
+                                ("cuisine", ["r7", "r8", "r9", "r0", "r2", "r4", "r6", "r1", "r3", "r5"])):
+            seen, cursor = [], None
+            while True:
+                rows, cursor = crud.get_recipes_page(db, cursor, limit=3, order=order)
+                seen += [r.slug for r in rows]
+                if cursor is None:
+                    break
+            assert seen == expected
+
+
+def test_import_from_a_shard_directory(tmp_path):
+    shards = tmp_path / "recipes"
+    shards.mkdir()
+    full = {"cuisine": "X", "time_total": 10, "servings": 2, "ingredients": ["salt"], "steps": ["s"]}
+    (shards / "10-base.json").write_text(json.dumps([
+        {**full, "slug": "poha", "title": "Poha"},
+        {**full, "slug": "Not A Slug", "title": "bad"},
+    ]), encoding="utf-8")
+    (shards / "20-edits.ndjson").write_text(json.dumps({**full, "slug": "poha", "title": "Kanda Poha"}), encoding="utf-8")
+    engine = create_engine(f"sqlite:///{tmp_path / 'recipes.db'}")
+
+    report = import_recipes(shards, engine)
+    assert (report.inserted, report.skipped) == (1, 1)
+    with engine.connect() as c:
+        assert c.execute(text("select slug, title, cuisine from recipes")).all() == [("poha", "Kanda Poha", "West Indian")]
@@ -0,0 +1,65 @@
+import pytest
+
+from app.utils import similar
+from app.utils.records import Recipe
+
+
+def _recipes():
+    rows = [
+        ("dal-tadka", "Dal Tadka", ["toor dal", "ghee", "cumin seeds", "salt"]),
+        ("dal-fry", "Dal Fry", ["toor dal", "onion", "cumin seeds", "salt"]),
+        ("moong-dal", "Moong Dal", ["moong dal", "ghee", "cumin seeds", "salt"]),
+        ("paneer-tikka", "Paneer Tikka", ["paneer", "yogurt", "chili powder", "salt"]),
+        ("paneer-butter-masala", "Paneer Butter Masala", ["paneer", "butter", "cream", "tomato"]),
+        ("kheer", "Kheer", ["rice", "milk", "sugar", "cardamom"]),
+    ]
+    return [Recipe(slug, title, ingredients=ing) for slug, title, ing in rows]
+
+
+def _lists(index, recipes):
+    return {recipes[i].slug: [(recipes[j].slug, round(s, 4)) for j, s in index.neighbours(i)]
+            for i in range(len(recipes))}
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_neighbours_match_across_backends(monkeypatch, numpy):
+    if numpy and not similar.HAVE_NUMPY:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(similar, "HAVE_NUMPY", numpy)
+    recipes = _recipes()
+    got = _lists(similar.SimilarIndex.build(recipes, k=3), recipes)
+    assert [s for s, _ in got["dal-tadka"][:2]] == ["dal-fry", "moong-dal"]
+    assert got["paneer-tikka"][0][0] == "paneer-butter-masala"
+    # nothing in common -> no neighbours rather than zero-score filler
+    assert got["kheer"] == []
+    assert all(0 < score <= 1 for rows in got.values() for _, score in rows)
+
+
+def test_patch_touches_only_what_changed():
+    recipes = _recipes()
+    index = similar.SimilarIndex.build(recipes, k=3)
+    edited = list(recipes)
+    # kheer becomes a dal, paneer-tikka goes away (in place, like hot_reload does)
+    edited[5] = Recipe("kheer", "Kheer Dal", ingredients=["toor dal", "ghee", "salt"])
+    del edited[3]
+    edited.append(Recipe("rice-kheer", "Rice Kheer", ingredients=["rice", "milk", "sugar"]))
+
+    got = _lists(index.patched(recipes, edited, ["kheer"], ["paneer-tikka"]), edited)
+    assert got["kheer"][0][0] in {"dal-tadka", "dal-fry"}
+    assert "kheer" in [s for s, _ in got["dal-tadka"]]
+    assert got["paneer-butter-masala"] == []         # its only neighbour was removed
+    assert [s for s, _ in got["rice-kheer"]] == ["kheer"]     # shared title word only
+    assert all(s != "paneer-tikka" for rows in got.values() for s, _ in rows)
+
+
+def test_similar_on_detail_page_and_api(client):
+    r = client.get("/api/recipes/pav-bhaji/similar", params={"fields": "slug"})
+    assert r.status_code == 200 and r.json()["ready"] is True
+    items = r.json()["items"]
+    # potato + tomato + butter overlap; ragi ball shares nothing
+    assert items[0]["slug"] in {"masala-dosa", "butter-chicken"} and 0 < items[0]["score"] <= 1
+    assert "ragi-ball" not in [i["slug"] for i in items]
+    assert client.get("/api/recipes/nope/similar").status_code == 404
+
+    page = client.get("/recipes/pav-bhaji").text
+    assert "More like this" in page and 'href="/recipes/masala-dosa"' in page
@@ -0,0 +1,41 @@
+import threading
+
+import app.main as main_mod
+from app.utils.startup import Startup
+
+
+def test_readyz_waits_for_background_startup_and_healthz_does_not(client, monkeypatch):
+    release = threading.Event()
+    ran = []
+    startup = Startup([("catalog", lambda: ran.append("catalog")), ("indexes", release.wait)])
+    monkeypatch.setattr(main_mod, "STARTUP", startup)
+
+    startup.start(background=True)
+    assert client.get("/healthz").json() == {"status": "ok"}
+    r = client.get("/readyz")
+    assert r.status_code == 503 and r.json()["status"] == "running" and r.json()["phase"] == "indexes"
+
+    release.set()
+    assert startup.wait(5)
+    r = client.get("/readyz")
+    body = r.json()
+    assert r.status_code == 200 and body["status"] == "ready" and body["recipes"] == 4
+    assert list(body["phases"]) == ["catalog", "indexes"] and ran == ["catalog"]
+    assert 'dishcovery_startup_phase_seconds{phase="indexes"}' in client.get("/metrics").text
+
+    startup.start(background=False)     # runs once per process
+    assert ran == ["catalog"]
+
+
+def test_failed_phase_stops_startup_and_stays_unready(client, monkeypatch):
+    later = []
+
+    def broken():
+        raise ValueError("bad shard")
+    startup = Startup([("catalog", broken), ("watcher", lambda: later.append(1))])
+    monkeypatch.setattr(main_mod, "STARTUP", startup)
+
+    assert startup.run() is False and later == []
+    r = client.get("/readyz")
+    assert r.status_code == 503 and r.json()["error"] == "catalog: bad shard"
+    assert "catalog" in r.json()["phases"]